@@ -1,6 +1,18 @@
 import os
+import re
+import ast
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import compileall
 import subprocess
 import datetime
+import sysconfig
+import importlib.util
+import importlib.metadata
 
 # İkon ayarları
 ICON_DIR = os.path.join("assets")
@@ -11,6 +23,63 @@ ICON_PATH = os.path.join(ICON_DIR, "book.ico")
 ANA_DOSYA = "kutuphane.py"
 # Exe dosyasının temel adı
 EXE_ADI = "kutuphane"
+# Uygulamanın tembel yüklediği modüller (kutuphane.py'deki LazyModule tanımlarıyla aynı)
+TEMBEL_MODULLER = [
+    "openpyxl",
+    "reportlab.pdfgen.canvas",
+    "reportlab.pdfbase.pdfmetrics",
+    "reportlab.pdfbase.ttfonts",
+    "reportlab.lib.pagesizes",
+    "reportlab.lib.units",
+]
+# Excel/PDF dağıtımları; "cekirdek" profilinde EXE'ye gömülmez, ek_paketler/ klasörüne konur
+TEMBEL_DAGITIMLAR = ["openpyxl", "reportlab"]
+
+# --optimize seçeneği PyInstaller 6.6 ile geldi ("hizli" ve "cekirdek" profilleri)
+PYINSTALLER_OPTIMIZE_SURUM = (6, 6)
+
+# Uygulama yalnızca QtCore, QtGui ve QtWidgets kullanır
+KULLANILMAYAN_QT = [
+    "PyQt5.QtBluetooth", "PyQt5.QtDBus", "PyQt5.QtDesigner", "PyQt5.QtHelp", "PyQt5.QtLocation",
+    "PyQt5.QtMultimedia", "PyQt5.QtMultimediaWidgets", "PyQt5.QtNetwork", "PyQt5.QtNfc",
+    "PyQt5.QtOpenGL", "PyQt5.QtPositioning", "PyQt5.QtPrintSupport", "PyQt5.QtQml", "PyQt5.QtQuick",
+    "PyQt5.QtQuickWidgets", "PyQt5.QtRemoteObjects", "PyQt5.QtSensors", "PyQt5.QtSerialPort",
+    "PyQt5.QtSql", "PyQt5.QtSvg", "PyQt5.QtTest", "PyQt5.QtTextToSpeech", "PyQt5.QtWebChannel",
+    "PyQt5.QtWebEngine", "PyQt5.QtWebEngineCore", "PyQt5.QtWebEngineWidgets", "PyQt5.QtWebSockets",
+    "PyQt5.QtXml", "PyQt5.QtXmlPatterns",
+]
+KULLANILMAYAN_STDLIB = ["tkinter", "lib2to3", "pydoc_data", "test", "xmlrpc"]
+
+# Klasör profillerinde derleme sonrası tutulan Qt eklentileri (klasör -> dosya adı kökleri;
+# None: klasörün tamamı). Listede olmayan eklenti klasörleri ve Qt çevirileri silinir.
+QT_EKLENTI_TUT = {
+    "platforms": {"qwindows", "qxcb", "qoffscreen", "qminimal", "qcocoa"},
+    "styles": None,
+    "platformthemes": None,
+    "imageformats": {"qico"},  # pencere ikonu
+}
+
+# Derleme profilleri:
+#   onefile        tek EXE mi (her açılışta geçici klasöre açılır) yoksa klasör (onedir) mi
+#   haric          --exclude-module ile dışarıda bırakılan modüller
+#   optimize       PyInstaller --optimize (PYZ içindeki bayt kodu bu düzeyde derlenir)
+#   eklenti_ayikla derleme sonrası kullanılmayan Qt eklentilerini siler (yalnız klasörde)
+#   yan_paket      Excel/PDF bağımlılıklarını ek_paketler/ klasörüne derlenmiş olarak koyar
+PROFILLER = {
+    "tekdosya": {"aciklama": "Tek EXE (önceki davranış)", "onefile": True, "haric": [],
+                 "optimize": 0, "eklenti_ayikla": False, "yan_paket": False},
+    "klasor": {"aciklama": "Klasör, kullanılmayan Qt modülleri ve eklentileri çıkarılmış", "onefile": False,
+               "haric": KULLANILMAYAN_QT + KULLANILMAYAN_STDLIB, "optimize": 0,
+               "eklenti_ayikla": True, "yan_paket": False},
+    "hizli": {"aciklama": "klasor + optimize edilmiş bayt kodu", "onefile": False,
+              "haric": KULLANILMAYAN_QT + KULLANILMAYAN_STDLIB, "optimize": 1,
+              "eklenti_ayikla": True, "yan_paket": False},
+    "cekirdek": {"aciklama": "hizli + Excel/PDF bağımlılıkları ayrı ek_paketler/ klasöründe",
+                 "onefile": False, "haric": KULLANILMAYAN_QT + KULLANILMAYAN_STDLIB, "optimize": 1,
+                 "eklenti_ayikla": True, "yan_paket": True},
+}
+# Uygulamanın EXE yanında oluşturduğu veri klasörleri; ölçüm kopyasına alınmaz
+UYGULAMA_VERI_KLASORLERI = ["db", "yedek", "disa_aktar", "ice_aktar", "raporlar"]
 
 
 def ensure_book_icon() -> str:
@@ -84,23 +153,194 @@ def ensure_book_icon() -> str:
     except Exception:
         return ""
 
-def build_executable_with_timestamp():
+def dagitim_kapanisi(adlar) -> list:
+    """Dağıtımlar ve (ekstralar hariç) tüm bağımlılıkları."""
+    gorulen, sira = [], list(adlar)
+    while sira:
+        ad = re.sub(r"[-_.]+", "-", sira.pop()).lower()
+        if ad in gorulen:
+            continue
+        gorulen.append(ad)
+        for gereksinim in importlib.metadata.requires(ad) or []:
+            if "extra ==" in gereksinim:
+                continue
+            sira.append(re.split(r"[\s;<>=!~\[(]", gereksinim, maxsplit=1)[0])
+    return gorulen
+
+def ust_duzey_adlar(dagitim_adi) -> set:
+    """
+    Dağıtımın site-packages'a kurduğu üst düzey paket/modül adları. Kurulu
+    dosya listesinden çıkarılır ki tekerleğin yanında gelen yerel kütüphane
+    klasörleri (ör. pillow.libs) de dahil olsun; liste yoksa top_level.txt.
     """
-    Ana Python dosyasını PyInstaller ile derler,
+    dagitim = importlib.metadata.distribution(dagitim_adi)
+    adlar = set()
+    for dosya in dagitim.files or []:
+        ilk = dosya.parts[0]
+        if ilk.endswith((".dist-info", ".egg-info", ".data")) or ilk in ("..", "__pycache__"):
+            continue
+        adlar.add(ilk[:-3] if ilk.endswith(".py") else ilk)
+    if not adlar:
+        adlar = set((dagitim.read_text("top_level.txt") or "").split())
+    return adlar
+
+def stdlib_modulu_mu(ad) -> bool:
+    kok = ad.split(".")[0]
+    adlar = getattr(sys, "stdlib_module_names", None)  # Python 3.10+
+    if adlar is not None:
+        return kok in adlar
+    try:
+        spec = importlib.util.find_spec(kok)
+    except (ImportError, ValueError):
+        return False
+    if spec is None or not spec.origin:
+        return False
+    if spec.origin in ("built-in", "frozen"):
+        return True
+    yol = os.path.abspath(spec.origin)
+    return yol.startswith(os.path.abspath(sysconfig.get_paths()["stdlib"])) and "site-packages" not in yol
+
+def modul_var_mi(ad) -> bool:
+    """ad bu platformda içe aktarılabilir bir modül mü (from X import Y'deki Y bir nesne olabilir)."""
+    try:
+        return importlib.util.find_spec(ad) is not None
+    except (ImportError, ValueError, AttributeError):
+        return False
+
+def yan_paket_stdlib() -> list:
+    """
+    Excel/PDF dağıtımlarının içe aktardığı standart kütüphane modülleri.
+    "cekirdek" profilinde bu paketler PyInstaller analizine girmez; EXE'ye
+    yalnız kutuphane.py'nin ulaştığı stdlib modülleri konur. Paketlerin
+    ihtiyaç duyduğu diğerleri (ör. openpyxl için xml.etree.ElementTree,
+    reportlab için urllib.request) --hidden-import ile eklenir ki ek_paketler/
+    ilk kullanımda ModuleNotFoundError vermesin. Fonksiyon içindekiler dahil
+    bütün import ifadeleri ast ile taranır.
+    """
+    gerekenler = set()
+    for dagitim_adi in dagitim_kapanisi(TEMBEL_DAGITIMLAR):
+        for dosya in importlib.metadata.distribution(dagitim_adi).files or []:
+            if dosya.suffix != ".py":
+                continue
+            try:
+                agac = ast.parse(dosya.read_text(encoding="utf-8"))
+            except (OSError, ValueError, SyntaxError):
+                continue
+            for dugum in ast.walk(agac):
+                if isinstance(dugum, ast.Import):
+                    gerekenler.update(a.name for a in dugum.names)
+                elif isinstance(dugum, ast.ImportFrom) and dugum.module and not dugum.level:
+                    gerekenler.add(dugum.module)
+                    gerekenler.update(f"{dugum.module}.{a.name}" for a in dugum.names if a.name != "*")
+    return sorted(ad for ad in gerekenler if stdlib_modulu_mu(ad) and modul_var_mi(ad))
+
+def pyinstaller_surumu():
+    """Kurulu PyInstaller sürümü (büyük, küçük); kurulu değilse None."""
+    try:
+        surum = importlib.metadata.version("pyinstaller")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+    return tuple(int(p) for p in re.findall(r"\d+", surum)[:2])
+
+def yan_paketleri_kopyala(hedef, optimize=1) -> list:
+    """
+    Excel/PDF dağıtımlarını bağımlılıklarıyla hedef klasöre kopyalar ve bayt
+    koduna derler. Uygulama bu klasörü ilk Excel/PDF işleminde sys.path'e ekler.
+    Kopyalanan üst düzey adları döndürür (PyInstaller'dan hariç tutulur).
+    """
+    os.makedirs(hedef, exist_ok=True)
+    kopyalanan = []
+    for dagitim_adi in dagitim_kapanisi(TEMBEL_DAGITIMLAR):
+        kok = importlib.metadata.distribution(dagitim_adi).locate_file("")
+        for ad in sorted(ust_duzey_adlar(dagitim_adi)):
+            kaynak = os.path.join(kok, ad)
+            if os.path.isdir(kaynak):
+                shutil.copytree(kaynak, os.path.join(hedef, ad), dirs_exist_ok=True,
+                                ignore=shutil.ignore_patterns("__pycache__", "tests", "test"))
+            elif os.path.isfile(kaynak + ".py"):
+                shutil.copy2(kaynak + ".py", hedef)
+            elif os.path.isfile(kaynak):  # ör. mypyc ile derlenmiş üst düzey .so/.pyd
+                shutil.copy2(kaynak, hedef)
+            else:
+                continue
+            kopyalanan.append(ad)
+    compileall.compile_dir(hedef, quiet=1, optimize=optimize)
+    return kopyalanan
+
+def qt_eklentilerini_ayikla(klasor) -> int:
+    """Derlenmiş klasördeki kullanılmayan Qt eklentilerini ve çevirilerini siler; kazanılan bayt."""
+    kazanc = 0
+
+    def sil(yol):
+        nonlocal kazanc
+        kazanc += klasor_boyutu(yol)
+        if os.path.isdir(yol):
+            shutil.rmtree(yol)
+        else:
+            os.remove(yol)
+
+    for kok, klasorler, _ in os.walk(klasor):
+        if os.path.basename(kok) not in ("Qt5", "Qt"):
+            continue
+        if "translations" in klasorler:
+            sil(os.path.join(kok, "translations"))
+            klasorler.remove("translations")
+        eklentiler = os.path.join(kok, "plugins")
+        if not os.path.isdir(eklentiler):
+            continue
+        for tur in os.listdir(eklentiler):
+            yol = os.path.join(eklentiler, tur)
+            if tur not in QT_EKLENTI_TUT:
+                sil(yol)
+                continue
+            tutulan = QT_EKLENTI_TUT[tur]
+            if tutulan is None:
+                continue
+            for dosya in os.listdir(yol):
+                kok_ad = os.path.splitext(dosya)[0]
+                if kok_ad.startswith("lib"):
+                    kok_ad = kok_ad[3:]
+                if kok_ad not in tutulan:
+                    sil(os.path.join(yol, dosya))
+    return kazanc
+
+def klasor_boyutu(yol) -> int:
+    if os.path.isfile(yol):
+        return os.path.getsize(yol)
+    return sum(os.path.getsize(os.path.join(kok, f)) for kok, _, dosyalar in os.walk(yol) for f in dosyalar)
+
+def exe_yolu(ad, profil) -> str:
+    uzanti = ".exe" if os.name == "nt" else ""
+    if PROFILLER[profil]["onefile"]:
+        return os.path.join("dist", ad + uzanti)
+    return os.path.join("dist", ad, ad + uzanti)
+
+def build_executable_with_timestamp(profil="tekdosya"):
+    """
+    Ana Python dosyasını PyInstaller ile seçilen profile göre derler,
     oluşturulan EXE dosyasına tarih ve saat damgası ekler ve
-    terminal penceresinin açılmasını engeller.
+    terminal penceresinin açılmasını engeller. EXE yolunu (hata varsa None) döndürür.
     """
     if not os.path.exists(ANA_DOSYA):
         print(f"Hata: '{ANA_DOSYA}' dosyası bulunamadı.")
-        return
+        return None
+    ayar = PROFILLER[profil]
+    if ayar["optimize"]:
+        surum = pyinstaller_surumu()
+        if surum is not None and surum < PYINSTALLER_OPTIMIZE_SURUM:
+            gerekli = ".".join(map(str, PYINSTALLER_OPTIMIZE_SURUM))
+            print(f"Hata: '{profil}' profili PyInstaller {gerekli} veya üstünü gerektirir "
+                  f"(kurulu: {'.'.join(map(str, surum))}).")
+            print(f'Güncellemek için: pip install -U "pyinstaller>={gerekli}"')
+            return None
 
     # Geçerli tarih ve saati YYYY-MM-DD_HH-MM formatında al
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M")
     
     # Yeni EXE dosyasının adını oluştur
-    yeni_exe_adi = f"{EXE_ADI}_{timestamp}"
+    yeni_exe_adi = f"{EXE_ADI}_{timestamp}" if profil == "tekdosya" else f"{EXE_ADI}_{profil}_{timestamp}"
     
-    print(f"Derleme işlemi başlatılıyor: {ANA_DOSYA}")
+    print(f"Derleme işlemi başlatılıyor: {ANA_DOSYA} (profil: {profil} - {ayar['aciklama']})")
     print(f"Oluşturulacak EXE adı: {yeni_exe_adi}.exe")
     print("Not: Bu işlem sırasında terminal penceresi açılmayacaktır.")
 
@@ -114,15 +354,38 @@ def build_executable_with_timestamp():
     # PyInstaller komutunu oluştur
     command = [
         "pyinstaller",
-        "--onefile",  # Tek bir EXE dosyası oluşturur
+        "--onefile" if ayar["onefile"] else "--onedir",  # Tek EXE ya da açılışta paket açmayan klasör
         "--windowed", # veya "--noconsole" Terminal penceresini engeller
+        "--noconfirm",
         f"--name={yeni_exe_adi}",
     ]
+    if ayar["optimize"]:
+        command.append(f"--optimize={ayar['optimize']}")
 
     # İkon parametresi
     if icon_path:
         command.append(f"--icon={icon_path}")
 
+    haric = list(ayar["haric"])
+    if ayar["yan_paket"]:
+        # Excel/PDF dağıtımları EXE'ye girmez; derleme sonrası ek_paketler/ klasörüne kopyalanır
+        for dagitim_adi in dagitim_kapanisi(TEMBEL_DAGITIMLAR):
+            haric += sorted(ad for ad in ust_duzey_adlar(dagitim_adi) if ad.isidentifier())
+        # ...ama ihtiyaç duydukları standart kütüphane modülleri EXE'de olmalı
+        # (KULLANILMAYAN_STDLIB yine dışarıda kalır; ör. reportlab'ın isteğe bağlı tkinter kullanımı)
+        stdlib = [ad for ad in yan_paket_stdlib()
+                  if not any(ad == m or ad.startswith(m + ".") for m in KULLANILMAYAN_STDLIB)]
+        for module in stdlib:
+            command.append(f"--hidden-import={module}")
+        print(f"Ek paketlerin kullandığı standart kütüphane modülleri: {len(stdlib)}")
+    else:
+        # kutuphane.py openpyxl ve reportlab'ı ilk kullanımda importlib ile yükler
+        # (LazyModule); PyInstaller bunları kendiliğinden bulamaz
+        for module in TEMBEL_MODULLER:
+            command.append(f"--hidden-import={module}")
+    for module in haric:
+        command.append(f"--exclude-module={module}")
+
     # Veri klasörlerini ekle
     command += [
         f"--add-data={os.path.join('.', 'db')}{os.pathsep}db",
@@ -136,14 +399,123 @@ def build_executable_with_timestamp():
     try:
         # Komutu çalıştır ve çıktıyı göster
         subprocess.run(command, check=True)
-        print("\nDerleme başarıyla tamamlandı!")
-        print(f"Çıktı dosyası: dist/{yeni_exe_adi}.exe")
     except subprocess.CalledProcessError as e:
         print("\nDerleme hatası oluştu:")
         print(e)
+        return None
     except FileNotFoundError:
         print("\nHata: PyInstaller bulunamadı.")
         print("Lütfen 'pip install pyinstaller' komutu ile kurduğunuzdan emin olun.")
+        return None
+
+    if not ayar["onefile"]:
+        klasor = os.path.join("dist", yeni_exe_adi)
+        if ayar["eklenti_ayikla"]:
+            kazanc = qt_eklentilerini_ayikla(klasor)
+            print(f"Kullanılmayan Qt eklentileri silindi: {kazanc / 1024 / 1024:.1f} MB")
+        if ayar["yan_paket"]:
+            adlar = yan_paketleri_kopyala(os.path.join(klasor, "ek_paketler"), ayar["optimize"])
+            print(f"Ek paketler: {', '.join(adlar)}")
+    cikti = exe_yolu(yeni_exe_adi, profil)
+    print("\nDerleme başarıyla tamamlandı!")
+    print(f"Çıktı dosyası: {cikti}")
+    return cikti
+
+def soguk_onbellek() -> bool:
+    """Linux'ta sayfa önbelleğini boşaltır (root gerekir); başarılıysa True."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+def acilis_olc(exe, tekrar=5, tek_dosya=True) -> dict:
+    """
+    EXE'yi --startup-probe ile tekrar tekrar çalıştırır: süreç başlatmadan
+    çıkışa kadarki duvar saati süresi (tek dosyada paket açma dahil) ve
+    uygulamanın kendi ölçtüğü ilk etkileşim süresi. İlk (hazırlık)
+    çalıştırma veritabanını oluşturur ve sayılmaz. Root ise her ölçümden önce
+    önbellek boşaltılır (soğuk açılış), değilse ölçümler sıcak açılıştır.
+    Uygulama verisini EXE'nin yanına yazdığından ölçüm, EXE'nin (klasör
+    profillerinde bütün klasörün) geçici bir kopyasında yapılır; dist/
+    altındaki gerçek veriye dokunulmaz.
+    """
+    env = dict(os.environ)
+    if sys.platform.startswith("linux") and not env.get("DISPLAY"):
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    gecici = tempfile.mkdtemp(prefix="acilis_olc_")
+    if tek_dosya:
+        calisma = gecici
+        shutil.copy2(exe, calisma)
+    else:
+        kaynak = os.path.dirname(os.path.abspath(exe))
+        calisma = os.path.join(gecici, os.path.basename(kaynak))
+        shutil.copytree(kaynak, calisma, symlinks=True,
+                        ignore=lambda yol, adlar: UYGULAMA_VERI_KLASORLERI if yol == kaynak else [])
+    kopya = os.path.join(calisma, os.path.basename(exe))
+
+    def calistir():
+        t0 = time.perf_counter()
+        cikti = subprocess.run([kopya, "--startup-probe"], cwd=calisma, env=env,
+                               capture_output=True, text=True, timeout=300)
+        duvar = (time.perf_counter() - t0) * 1000
+        for satir in cikti.stdout.splitlines():
+            if satir.startswith("STARTUP_PROBE "):
+                return duvar, json.loads(satir[len("STARTUP_PROBE "):])
+        raise RuntimeError(f"Ölçüm çıktısı alınamadı (çıkış kodu {cikti.returncode}):\n{cikti.stderr[-2000:]}")
+
+    try:
+        calistir()  # hazırlık: veritabanı oluşturulur, geçişler uygulanır
+        soguk = False
+        duvar, etkilesim = [], []
+        for _ in range(tekrar):
+            soguk = soguk_onbellek()
+            ms, sonuc = calistir()
+            duvar.append(ms)
+            etkilesim.append(sonuc["ilk_etkilesim_ms"])
+    finally:
+        shutil.rmtree(gecici, ignore_errors=True)
+    duvar.sort()
+    etkilesim.sort()
+    return {"soguk": soguk, "tekrar": tekrar, "duvar_ms_medyan": round(duvar[len(duvar) // 2], 1),
+            "duvar_ms_en_iyi": round(duvar[0], 1), "ilk_etkilesim_ms_medyan": etkilesim[len(etkilesim) // 2]}
+
+def profilleri_karsilastir(profiller, tekrar):
+    """Profilleri derler, boyut ve açılış süresini tablo ve JSON olarak raporlar."""
+    sonuclar = {}
+    for profil in profiller:
+        exe = build_executable_with_timestamp(profil)
+        if exe is None:
+            continue
+        cikti = exe if PROFILLER[profil]["onefile"] else os.path.dirname(exe)
+        sonuc = {"exe": exe, "boyut_mb": round(klasor_boyutu(cikti) / 1024 / 1024, 1)}
+        sonuc.update(acilis_olc(exe, tekrar, PROFILLER[profil]["onefile"]))
+        sonuclar[profil] = sonuc
+
+    print(f"\n{'Profil':10s} {'Boyut':>9s} {'Açılış (medyan)':>16s} {'En iyi':>9s} {'İlk etkileşim':>14s}")
+    for profil, r in sonuclar.items():
+        print(f"{profil:10s} {r['boyut_mb']:7.1f}MB {r['duvar_ms_medyan']:14.0f}ms "
+              f"{r['duvar_ms_en_iyi']:7.0f}ms {r['ilk_etkilesim_ms_medyan']:12.0f}ms")
+    if sonuclar and not any(r["soguk"] for r in sonuclar.values()):
+        print("Not: önbellek boşaltılamadı (root gerekir); süreler sıcak açılıştır.")
+    rapor = os.path.join("dist", f"acilis_olcumu_{datetime.datetime.now():%Y-%m-%d_%H-%M}.json")
+    with open(rapor, "w", encoding="utf-8") as f:
+        json.dump({"platform": sys.platform, "profiller": sonuclar}, f, ensure_ascii=False, indent=1)
+    print(f"Rapor: {rapor}")
         
 if __name__ == "__main__":
-    build_executable_with_timestamp()
+    ap = argparse.ArgumentParser(description="Kütüphane uygulamasını PyInstaller ile derler.")
+    ap.add_argument("--profil", choices=list(PROFILLER) + ["hepsi"], default="tekdosya",
+                    help="; ".join(f"{ad}: {p['aciklama']}" for ad, p in PROFILLER.items()))
+    ap.add_argument("--olc", action="store_true",
+                    help="derlenen her profilin boyutunu ve açılış süresini ölçüp karşılaştırır")
+    ap.add_argument("--tekrar", type=int, default=5, help="ölçümde açılış tekrarı")
+    args = ap.parse_args()
+    secilen = list(PROFILLER) if args.profil == "hepsi" else [args.profil]
+    if args.olc:
+        profilleri_karsilastir(secilen, args.tekrar)
+    else:
+        for profil in secilen:
+            build_executable_with_timestamp(profil)
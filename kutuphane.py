@@ -1,19 +1,37 @@
 # -*- coding: utf-8 -*-
-import os, sys, sqlite3, datetime, re, shutil, random, string, unicodedata
-from PyQt5 import QtWidgets, QtCore, QtGui
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout,
-    QFormLayout, QLineEdit, QPushButton, QMessageBox, QTableWidget, QTableWidgetItem,
-    QLabel, QSpinBox, QDateEdit, QComboBox, QFileDialog, QGroupBox, QListWidget, QDialog
-)
-from PyQt5.QtCore import QDate, Qt
-from openpyxl import Workbook, load_workbook
-from reportlab.pdfgen import canvas as pdfcanvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-import hashlib
+import os, sys, time
+from contextlib import contextmanager
+
+APP_START = time.perf_counter()  # açılış süresi ölçümleri bu andan itibaren
+IMPORT_TIMES = []  # (grup, ms, yüklenen modül sayısı); setup_perf_log perf.log'a yazar
+
+@contextmanager
+def timed_import(group):
+    """
+    -X importtime benzeri döküm: bir içe aktarma grubunun süresini ve
+    sys.modules'a eklediği modül sayısını kaydeder. Pencereli EXE'de stderr
+    olmadığından döküm uygulamanın kendi günlüğüne yazılır.
+    """
+    t0, n0 = time.perf_counter(), len(sys.modules)
+    yield
+    IMPORT_TIMES.append((group, (time.perf_counter() - t0) * 1000, len(sys.modules) - n0))
+
+with timed_import("stdlib"):
+    import sqlite3, datetime, re, unicodedata, csv
+    import threading, atexit, logging, bisect, heapq
+    import multiprocessing, concurrent.futures
+    import json, zlib, lzma, importlib, hashlib, tempfile
+    from functools import lru_cache
+with timed_import("PyQt5"):
+    from PyQt5 import QtWidgets, QtCore, QtGui
+    from PyQt5.QtWidgets import (
+        QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout,
+        QFormLayout, QLineEdit, QPushButton, QMessageBox, QTableWidget, QTableWidgetItem,
+        QLabel, QSpinBox, QDateEdit, QComboBox, QFileDialog, QGroupBox, QListWidget, QDialog,
+        QTableView, QAbstractItemView
+    )
+    from PyQt5.QtCore import QDate, Qt
+# openpyxl ve reportlab ilk Excel/PDF işleminde yüklenir (bkz. Tembel Modüller)
 
 PRIMARY_BUTTON_STYLE = """
 QPushButton {
@@ -111,26 +129,6 @@ IMPORT_DIR = os.path.join(APP_DIR, "ice_aktar")
 REPORT_DIR = os.path.join(APP_DIR, "raporlar")
 # -------------------------------------------------------------------------
 
-# Türkçe karakter desteği için font tanımlaması
-try:
-    FONT_PATH = "C:\\Windows\\Fonts\\Arial.ttf" # Windows için varsayılan yol
-    if not os.path.exists(FONT_PATH):
-        # MacOS için varsayılan yol
-        FONT_PATH = "/Library/Fonts/Arial.ttf"
-        if not os.path.exists(FONT_PATH):
-            FONT_PATH = None
-            print("Uyarı: Arial.ttf fontu bulunamadı. PDF'lerde Türkçe karakter sorunu yaşanabilir.")
-            print("Lütfen FONT_PATH değişkenini sisteminizdeki bir fontun yoluyla güncelleyin.")
-    if FONT_PATH:
-        pdfmetrics.registerFont(TTFont('Arial', FONT_PATH))
-        pdfmetrics.registerFont(TTFont('Arial-Bold', FONT_PATH)) # Aynı fontu kalın font için de kullanabiliriz
-        pdfmetrics.registerFontFamily('Arial', normal='Arial', bold='Arial-Bold', italic='Arial', boldItalic='Arial')
-        DEFAULT_FONT = 'Arial'
-    else:
-        DEFAULT_FONT = 'Helvetica' # Varsayılan olarak Helvetica'ya dön
-except Exception as e:
-    DEFAULT_FONT = 'Helvetica'
-    print(f"PDF font hatası: {e}. Helvetica'ya geçiliyor.")
 
 
 def hash_password(password):
@@ -140,61 +138,1308 @@ def ensure_dirs():
     for d in [DB_DIR, BACKUP_DIR, EXPORT_DIR, IMPORT_DIR, REPORT_DIR]:
         os.makedirs(d, exist_ok=True)
 
-def auto_backup():
+# -------------------- Yedekleme --------------------
+BACKUP_PAGES_PER_STEP = 512   # her adımda kopyalanan sayfa
+BACKUP_STEP_SLEEP = 0.005     # günlük (rollback) kipinde adımlar arası bekleme (sn); kilit bu arada boştadır
+BACKUP_MAX_RESTARTS = 20      # günlük kipinde bu kadar yeniden başlamadan sonra görüntü sabitlenir
+MAX_BACKUPS = 20
+
+def backup_file_name() -> str:
+    ts = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return os.path.join(BACKUP_DIR, f"{ts}_kutuphane.db")
+
+class _BackupRestarting(Exception):
+    """Günlük kipinde yazmalar kopyayı art arda baştan başlattı."""
+
+def copy_database(conn, dst, task=None, pages=BACKUP_PAGES_PER_STEP) -> int:
     """
-    Uygulama başladığında mevcut veritabanını yedekler ve
-    yedek dosya sayısını belirlenen limitte tutar.
+    SQLite çevrimiçi yedekleme API'siyle conn'un tutarlı bir anlık görüntüsünü
+    dst bağlantısına parça parça kopyalar. task verilmişse ilerleme yüzde
+    olarak bildirilir ve task.cancelled ile durdurulabilir. Kopyalanan sayfa
+    sayısını döndürür.
+
+    WAL kipinde kopya boyunca kaynakta tek bir okuma işlemi açık tutulur:
+    yazıcılar beklemez, başka bağlantıların yazması kopyayı baştan başlatmaz.
+    Günlük (rollback) kipinde açık okuma işlemi her yazıcıyı kopya bitene
+    kadar bekletirdi; orada okuma kilidi yalnız adım süresince tutulur ve
+    adımlar arasında BACKUP_STEP_SLEEP beklenir. Araya giren yazma kopyayı
+    baştan başlatır; BACKUP_MAX_RESTARTS aşılırsa kalan tek deneme için
+    görüntü sabitlenir.
     """
-    ensure_dirs()
-    if not os.path.exists(DB_PATH):
-        print("Veritabanı dosyası bulunamadı, yedekleme atlandı.")
-        return
-
-    # Yedekleme işlemini yap
+    wal = conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
     try:
-        ts = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        dst = os.path.join(BACKUP_DIR, f"{ts}_kutuphane.db")
-        shutil.copy2(DB_PATH, dst)
-        print("Otomatik yedekleme tamamlandı:", dst)
-    except Exception as e:
-        print("Otomatik yedekleme hatası:", e)
-        return
+        return _copy_database(conn, dst, task, pages, pin=wal)
+    except _BackupRestarting:
+        perf_log("yedekleme %d kez yeniden başladı; anlık görüntü sabitleniyor", BACKUP_MAX_RESTARTS)
+        return _copy_database(conn, dst, task, pages, pin=True)
+
+def _copy_database(conn, dst, task, pages, pin):
+    copied = [0]
+    restarts = [0]
+
+    def progress(status, remaining, total):
+        done = total - remaining
+        if done < copied[0]:
+            restarts[0] += 1
+            if not pin and restarts[0] > BACKUP_MAX_RESTARTS:
+                raise _BackupRestarting()
+        copied[0] = done
+        if task is not None:
+            if task.cancelled:
+                raise QueryCancelled()
+            task.report(copied[0] * 100 // max(total, 1))
+        if not pin and remaining:
+            # CPython yalnız BUSY/LOCKED dönen adımdan sonra uyur; kilit boşken
+            # yazıcılar işlemlerini bu aralıkta tamamlar
+            time.sleep(BACKUP_STEP_SLEEP)
+
+    if not pin:
+        conn.backup(dst, pages=pages, progress=progress)
+        return copied[0]
+    conn.execute("BEGIN")
+    conn.execute("SELECT count(*) FROM sqlite_master").fetchone()  # anlık görüntüyü sabitle
+    try:
+        conn.backup(dst, pages=pages, progress=progress, sleep=BACKUP_STEP_SLEEP)
+    finally:
+        conn.rollback()
+    return copied[0]
 
-    # --- Yedekleme temizleme politikası ---
+def backup_database(conn, dst_path, task=None, pages=BACKUP_PAGES_PER_STEP):
+    """
+    copy_database ile tek dosyalık, taşınabilir bir yedek yazar. Yedek önce
+    geçici adla yazılır; iptal ya da hatada yarım dosya kalmaz.
+    """
+    t0 = time.perf_counter()
+    tmp_path = dst_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    dst = sqlite3.connect(tmp_path)
     try:
-        max_backups = 20
-        
-        backup_files = [f for f in os.listdir(BACKUP_DIR) if f.endswith("_kutuphane.db")]
-        
-        backup_files.sort(key=lambda f: os.path.getmtime(os.path.join(BACKUP_DIR, f)))
+        copied = copy_database(conn, dst, task, pages)
+        # Yedek tek dosya olarak taşınabilsin; WAL başlığını kaynaktan devralmasın
+        dst.execute("PRAGMA journal_mode = DELETE")
+        dst.close()
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        dst.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    perf_log("yedekleme %s: %d sayfa, %.2f sn", os.path.basename(dst_path), copied,
+             time.perf_counter() - t0)
+    return copied
+
+def prune_backups(max_backups=MAX_BACKUPS):
+    """
+    Tek dosyalık yedeklerin sayısını belirlenen limitte tutar; en eskiler
+    silinir. Sıra dosya saatinden değil katalogdaki zaman damgasından gelir.
+    """
+    try:
+        catalog = backup_catalog()
+        backup_files = catalog.entries_of("dosya")
         
         if len(backup_files) > max_backups:
-            files_to_delete = backup_files[:-max_backups]
-            for file_name in files_to_delete:
-                file_path = os.path.join(BACKUP_DIR, file_name)
-                os.remove(file_path)
-                print(f"Eski yedek silindi: {file_name}")
+            files_to_delete = backup_files[max_backups:]
+            for entry in files_to_delete:
+                file_path = os.path.join(BACKUP_DIR, entry["name"])
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                print(f"Eski yedek silindi: {entry['name']}")
+            catalog.remove(entry["id"] for entry in files_to_delete)
 
     except Exception as e:
         print("Eski yedekleri silme hatası:", e)
 
-def normalize(s: str) -> str:
-    if s is None: return ""
-    t = str(s).strip().lower()
+# -------------------- Artımlı Yedek Deposu --------------------
+# Otomatik yedekler yedek/depo altında tutulur. Anlık görüntü sayfa sınırına
+# hizalı parçalara bölünür; her parça içeriğinin sha256'sıyla adlandırılıp
+# sıkıştırılarak bir kez saklanır. Değişmeyen parçalar önceki yedeklerle
+# paylaşılır, her yedek yalnızca parça listesini tutan bir manifest dosyasıdır.
+# Parça klasörü süreç başına bir kez listelenir; çöp toplama işaret dosyasına
+# dokunur ve diğer terminaller listelerini yeniler.
+BACKUP_CHUNK_SIZE = 64 * 1024
+BACKUP_COMPRESSORS = {
+    "zlib": (".z", lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (".xz", lzma.compress, lzma.decompress),
+}
+BACKUP_DECOMPRESSORS = {ext: decompress for ext, _, decompress in BACKUP_COMPRESSORS.values()}
+# Büyükbaba-baba-oğul saklama: son N yedek, sonra günde/haftada/ayda birer yedek
+BACKUP_KEEP_LAST = 5
+BACKUP_KEEP_DAILY = 7
+BACKUP_KEEP_WEEKLY = 4
+BACKUP_KEEP_MONTHLY = 12
+BACKUP_GC_GRACE = 3600  # başka terminalin yazmakta olduğu yedeğin parçaları silinmesin (sn)
+BACKUP_GC_MARKER = ".temizlik"
+SNAPSHOT_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+def gfs_keep(snapshot_ids, keep_last=BACKUP_KEEP_LAST, daily=BACKUP_KEEP_DAILY,
+             weekly=BACKUP_KEEP_WEEKLY, monthly=BACKUP_KEEP_MONTHLY) -> set:
+    """
+    Saklanacak yedeklerin kimliklerini döndürür: en yeni keep_last yedek ile
+    son `daily` günün, `weekly` haftanın ve `monthly` ayın her birinin en yeni
+    yedeği. Kimlikler SNAPSHOT_TIME_FORMAT ile başlar.
+    """
+    ordered = sorted(snapshot_ids, reverse=True)
+    keep = set(ordered[:keep_last])
+    buckets = (
+        (daily, lambda t: t.date()),
+        (weekly, lambda t: t.isocalendar()[:2]),
+        (monthly, lambda t: (t.year, t.month)),
+    )
+    for limit, bucket_of in buckets:
+        seen = []
+        for snap_id in ordered:
+            bucket = bucket_of(datetime.datetime.strptime(snap_id[:19], SNAPSHOT_TIME_FORMAT))
+            if bucket in seen:
+                continue
+            if len(seen) == limit:
+                break
+            seen.append(bucket)
+            keep.add(snap_id)
+    return keep
+
+class BackupStore:
+    """
+    İçerik adresli, sıkıştırılmış yedek deposu. snapshot() çalışan
+    veritabanının tutarlı bir görüntüsünü alıp yalnızca yeni parçaları yazar;
+    restore() herhangi bir yedeği parçalarından yeniden kurar. Saklama
+    politikası BackupCatalog.prune() ile katalog üzerinden uygulanır.
+    """
+    def __init__(self, root, compression="zlib"):
+        if compression not in BACKUP_COMPRESSORS:
+            compression = "zlib"
+        self.root = root
+        self.compression = compression
+        self.chunk_dir = os.path.join(root, "parcalar")
+        self.manifest_dir = os.path.join(root, "manifestler")
+        self._known = None  # digest -> uzantı
+        self._known_stamp = None
+
+    def _chunk_path(self, digest, ext):
+        return os.path.join(self.chunk_dir, digest[:2], digest + ext)
+
+    def _gc_stamp(self):
+        try:
+            return os.stat(os.path.join(self.chunk_dir, BACKUP_GC_MARKER)).st_mtime_ns
+        except OSError:
+            return None
+
+    def known_chunks(self) -> dict:
+        """
+        Depodaki parçalar (digest -> uzantı). Klasör ilk kullanımda adlarıyla
+        bir kez listelenir, parça başına stat yapılmaz. Bir terminal çöp
+        toplayınca işaret dosyasının zamanı değişir ve liste yeniden okunur.
+        """
+        stamp = self._gc_stamp()
+        known = self._known
+        if known is None or stamp != self._known_stamp:
+            known = {}
+            if os.path.isdir(self.chunk_dir):
+                for entry in os.scandir(self.chunk_dir):
+                    if not entry.is_dir():
+                        continue
+                    for name in os.listdir(entry.path):
+                        digest, _, ext = name.partition(".")
+                        if "." + ext in BACKUP_DECOMPRESSORS:  # yarım kalmış .tmp yazımları sayılmaz
+                            known[digest] = "." + ext
+            self._known, self._known_stamp = known, stamp
+        return known
+
+    def _find_chunk(self, digest):
+        known = self.known_chunks()
+        ext = known.get(digest)
+        if ext is None:
+            # Listelemeden sonra başka bir terminal yazmış olabilir
+            ext = next((e for e in BACKUP_DECOMPRESSORS if os.path.exists(self._chunk_path(digest, e))), None)
+            if ext is None:
+                return None, None
+            known[digest] = ext
+        return self._chunk_path(digest, ext), BACKUP_DECOMPRESSORS[ext]
+
+    @staticmethod
+    def _write_atomic(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def snapshot(self, conn, task=None, written=None) -> dict:
+        """
+        Tutarlı görüntüyü çevrimiçi yedekleme API'siyle yerel bir geçici
+        dosyaya alır, dosyayı sayfa sınırına hizalı parçalar halinde okuyup
+        özetler ve depoda olmayan parçaları sıkıştırarak yazar. Bellek
+        kullanımı bir parça kadardır. Okuma ve sha256 veritabanı boyutuyla,
+        sıkıştırma ve depoya yazma değişen parça sayısıyla büyür. Manifesti
+        döndürür; written listesi verilirse yeni yazılan parçalar eklenir.
+        """
+        t0 = time.perf_counter()
+        fd, tmp_path = tempfile.mkstemp(prefix="kutuphane_yedek_", suffix=".db")
+        os.close(fd)
+        try:
+            dst = sqlite3.connect(tmp_path)
+            try:
+                copy_database(conn, dst, task)
+                # Kurulan yedek tek dosyalık (DELETE) veritabanı olsun
+                dst.execute("PRAGMA journal_mode = DELETE")
+                page_size = dst.execute("PRAGMA page_size").fetchone()[0]
+            finally:
+                dst.close()
+            # Parçalar sayfa sınırına hizalı olsun; tek sayfa değişince tek parça değişir
+            chunk_size = max(BACKUP_CHUNK_SIZE // page_size, 1) * page_size
+            ext, compress, _ = BACKUP_COMPRESSORS[self.compression]
+            known = self.known_chunks()
+            whole = hashlib.sha256()
+            chunks, size, new_chunks, new_bytes = [], 0, 0, 0
+            with open(tmp_path, "rb") as f:
+                for block in iter(lambda: f.read(chunk_size), b""):
+                    if size == 0:
+                        # Başlıktaki WAL işareti (18-19. baytlar) kalmışsa kaldır:
+                        # sha256 kurulan dosyayla aynı olsun
+                        block = block[:18] + b"\x01\x01" + block[20:]
+                    size += len(block)
+                    whole.update(block)
+                    digest = hashlib.sha256(block).hexdigest()
+                    chunks.append(digest)
+                    if digest not in known:
+                        packed = compress(block)
+                        self._write_atomic(self._chunk_path(digest, ext), packed)
+                        known[digest] = ext
+                        if written is not None:
+                            written.append(digest)
+                        new_chunks += 1
+                        new_bytes += len(packed)
+        finally:
+            os.remove(tmp_path)
+        now = datetime.datetime.now()
+        manifest = {
+            "id": f"{now.strftime(SNAPSHOT_TIME_FORMAT)}_{os.getpid()}",
+            "created": now.isoformat(timespec="seconds"),
+            "size": size,
+            "sha256": whole.hexdigest(),
+            "page_size": page_size,
+            "chunk_size": chunk_size,
+            "chunks": chunks,
+        }
+        self._write_atomic(os.path.join(self.manifest_dir, manifest["id"] + ".json"),
+                           json.dumps(manifest).encode("utf-8"))
+        perf_log("yedek deposu %s: %d parça, %d yeni (%d KB), %.2f sn", manifest["id"],
+                 len(chunks), new_chunks, new_bytes // 1024, time.perf_counter() - t0)
+        return manifest
+
+    def snapshot_ids(self) -> list:
+        if not os.path.isdir(self.manifest_dir):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.manifest_dir) if name.endswith(".json"))
+
+    def manifest(self, snapshot_id) -> dict:
+        with open(os.path.join(self.manifest_dir, snapshot_id + ".json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def restore(self, snapshot_id, dst_path, task=None):
+        """
+        Yedeği parçalarından dst_path'e kurar ve sha256 ile doğrular. Dosya
+        geçici adla yazılır; doğrulama başarısızsa hedefe dokunulmaz.
+        """
+        manifest = self.manifest(snapshot_id)
+        tmp_path = dst_path + ".tmp"
+        h = hashlib.sha256()
+        try:
+            with open(tmp_path, "wb") as f:
+                for n, digest in enumerate(manifest["chunks"], 1):
+                    path, decompress = self._find_chunk(digest)
+                    if path is None:
+                        raise ValueError(f"Yedek parçası eksik: {digest}")
+                    with open(path, "rb") as chunk_file:
+                        block = decompress(chunk_file.read())
+                    h.update(block)
+                    f.write(block)
+                    if task is not None:
+                        if task.cancelled:
+                            raise QueryCancelled()
+                        task.report(n * 100 // len(manifest["chunks"]))
+            if h.hexdigest() != manifest["sha256"]:
+                raise ValueError(f"Yedek doğrulanamadı (sha256 uyuşmuyor): {snapshot_id}")
+            os.replace(tmp_path, dst_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return manifest
+
+    def verify_chunks(self, digests) -> list:
+        """Parçaları diskten okuyup açar ve sha256'larını denetler; bozukları döndürür."""
+        bad = []
+        for digest in digests:
+            path, decompress = self._find_chunk(digest)
+            try:
+                if path is None:
+                    raise OSError("eksik")
+                with open(path, "rb") as f:
+                    ok = hashlib.sha256(decompress(f.read())).hexdigest() == digest
+            except (OSError, zlib.error, lzma.LZMAError):
+                ok = False
+            if not ok:
+                bad.append(digest)
+        return bad
+
+    def remove_snapshots(self, snapshot_ids, dead_chunks) -> int:
+        """
+        Manifestleri ve artık hiçbir yedeğin kullanmadığı parçaları siler.
+        Hangi parçaların öldüğünü çağıran (katalog) belirler; klasör taranmaz.
+        """
+        for snap_id in snapshot_ids:
+            try:
+                os.remove(os.path.join(self.manifest_dir, snap_id + ".json"))
+            except FileNotFoundError:
+                pass
+        known = self.known_chunks()
+        deleted = 0
+        for digest in dead_chunks:
+            ext = known.pop(digest, None)
+            if ext is None:
+                continue
+            try:
+                os.remove(self._chunk_path(digest, ext))
+                deleted += 1
+            except FileNotFoundError:
+                pass
+        if deleted:
+            self._touch_gc_marker()
+        return deleted
+
+    def _touch_gc_marker(self):
+        # Diğer terminallerin parça listeleri eskidi
+        self._write_atomic(os.path.join(self.chunk_dir, BACKUP_GC_MARKER), b"")
+        self._known_stamp = self._gc_stamp()
+
+    def collect_garbage(self) -> int:
+        """
+        Tam çöp toplama: bütün manifestler okunur, hiçbirinin kullanmadığı ve
+        BACKUP_GC_GRACE'ten eski parçalar silinir. Her parçaya stat yaptığı
+        için yalnız komut satırı aracından elle çalıştırılır.
+        """
+        live = set()
+        for snap_id in self.snapshot_ids():
+            live.update(self.manifest(snap_id)["chunks"])
+        cutoff = time.time() - BACKUP_GC_GRACE
+        deleted = 0
+        for entry in os.scandir(self.chunk_dir) if os.path.isdir(self.chunk_dir) else ():
+            if not entry.is_dir():  # BACKUP_GC_MARKER gibi klasör olmayan girdiler
+                continue
+            for chunk in os.scandir(entry.path):
+                digest = chunk.name.split(".", 1)[0]
+                if digest not in live and chunk.stat().st_mtime < cutoff:
+                    os.remove(chunk.path)
+                    if self._known is not None:
+                        self._known.pop(digest, None)
+                    deleted += 1
+        if deleted:
+            self._touch_gc_marker()
+        return deleted
+
+_BACKUP_STORES = {}
+
+def backup_store(root=None) -> BackupStore:
+    """Depo başına tek nesne; bilinen parça listesi yedekler arasında korunur."""
+    root = root or os.path.join(BACKUP_DIR, "depo")
+    try:
+        compression = get_setting("backup_compression", "zlib")
+    except sqlite3.OperationalError:
+        compression = "zlib"  # geçiş öncesi yedek: settings tablosu henüz olmayabilir
+    store = _BACKUP_STORES.setdefault(root, BackupStore(root, compression))
+    store.compression = compression if compression in BACKUP_COMPRESSORS else "zlib"
+    return store
+
+# -------------------- Yedek Kataloğu --------------------
+BACKUP_CATALOG_NAME = "katalog.json"
+BACKUP_CATALOG_LOCK_TIMEOUT = 10  # sn
+BACKUP_CATALOG_LOCK_STALE = 60    # sn; bundan eski kilit çökmüş bir terminalden kalmıştır
+BACKUP_KINDS = {"dosya": "Tek dosya", "depo": "Artımlı depo"}
+
+def _snapshot_time(name):
+    """Dosya/manifest adındaki zaman damgası; bizim yedeğimiz değilse None."""
+    try:
+        return datetime.datetime.strptime(name[:19], SNAPSHOT_TIME_FORMAT).isoformat(timespec="seconds")
+    except ValueError:
+        return None
+
+class BackupCatalog:
+    """
+    yedek/ altındaki tüm yedeklerin kaydı: kimlik, tür, zaman, boyut, sha256
+    ve son doğrulama sonucu. Zaman dosya saatinden değil addaki damgadan
+    gelir; saati kaymış terminaller sırayı bozmaz. Listeleme, saklama ve geri
+    yükleme kayıt üzerinden, dosya başına stat yapmadan çalışır. Katalog
+    veritabanında değil yedek klasöründe tutulur ki veritabanı bozulsa da
+    okunabilsin. Klasörü paylaşan terminaller her değişikliği kilit dosyası
+    altında, dosyayı yeniden okuyup kendi değişikliğini ekleyerek yazar.
+    """
+    def __init__(self, backup_dir):
+        self.backup_dir = backup_dir
+        self.path = os.path.join(backup_dir, BACKUP_CATALOG_NAME)
+        self.lock_path = self.path + ".lock"
+        self.store = backup_store(os.path.join(backup_dir, "depo"))
+        self._lock = threading.RLock()
+        self.entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return {e["id"]: e for e in json.load(f)}
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _save(self):
+        data = json.dumps(sorted(self.entries.values(), key=lambda e: e["id"]), ensure_ascii=False, indent=1)
+        BackupStore._write_atomic(self.path, data.encode("utf-8"))
+
+    @contextmanager
+    def _file_lock(self):
+        """Terminaller arası kilit: kilit dosyası O_EXCL ile oluşturulabilene kadar bekler."""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        deadline = time.monotonic() + BACKUP_CATALOG_LOCK_TIMEOUT
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.stat(self.lock_path).st_mtime > BACKUP_CATALOG_LOCK_STALE:
+                        os.remove(self.lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Yedek kataloğu kilitli: {self.lock_path}")
+                time.sleep(0.05)
+        try:
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            os.close(fd)
+            yield
+        finally:
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+
+    def _update(self, change):
+        """Kilit altında diskteki kataloğu okur, change(entries) uygular ve yazar."""
+        with self._lock, self._file_lock():
+            self.entries = self._load()
+            result = change(self.entries)
+            self._save()
+            return result
+
+    def reconcile(self):
+        """
+        Tek tarama geçişiyle kataloğu diskle eşitler: yedek klasörü bir kez
+        os.scandir ile, depo manifestleri bir kez listelenir. Kayıtsız yedekler
+        eklenir (boyut DirEntry'den, sha256 ilk doğrulamada hesaplanır).
+        Taramada görülmeyen kayıtlar yalnız dosyaları gerçekten yoksa düşer;
+        tarama sırasında başka terminalin eklediği yedek silinmez.
+        """
+        t0 = time.perf_counter()
+        found = {}
+        if os.path.isdir(self.backup_dir):
+            with os.scandir(self.backup_dir) as it:
+                for entry in it:
+                    if entry.name.endswith("_kutuphane.db") and entry.is_file():
+                        found[entry.name[:-3]] = ("dosya", entry)
+        for snap_id in self.store.snapshot_ids():
+            found[snap_id] = ("depo", None)
+
+        def change(entries):
+            added = 0
+            for entry_id, entry in list(entries.items()):
+                if entry_id not in found and not os.path.exists(self._entry_path(entry)):
+                    del entries[entry_id]
+            for entry_id, (kind, dir_entry) in found.items():
+                if entry_id in entries:
+                    continue
+                created = _snapshot_time(entry_id)
+                if created is None:
+                    continue
+                if kind == "dosya":
+                    size, sha = dir_entry.stat().st_size, None
+                    name = dir_entry.name
+                else:
+                    try:
+                        manifest = self.store.manifest(entry_id)
+                    except (OSError, ValueError):
+                        continue
+                    size, sha, name = manifest["size"], manifest["sha256"], entry_id
+                entries[entry_id] = {"id": entry_id, "kind": kind, "name": name, "created": created,
+                                     "size": size, "sha256": sha, "verified": None}
+                added += 1
+            return added
+
+        added = self._update(change)
+        perf_log("yedek kataloğu: %d kayıt, %d eklendi, %.1f ms", len(self.entries), added,
+                 (time.perf_counter() - t0) * 1000)
+
+    def _entry_path(self, entry):
+        if entry["kind"] == "dosya":
+            return os.path.join(self.backup_dir, entry["name"])
+        return os.path.join(self.store.manifest_dir, entry["id"] + ".json")
+
+    def add(self, kind, name, size, sha256):
+        entry_id = name[:-3] if kind == "dosya" else name
+        entry = {"id": entry_id, "kind": kind, "name": name, "created": _snapshot_time(entry_id),
+                 "size": size, "sha256": sha256, "verified": None}
+        self._update(lambda entries: entries.__setitem__(entry_id, entry))
+        return entry
+
+    def remove(self, entry_ids):
+        entry_ids = list(entry_ids)
+
+        def change(entries):
+            for entry_id in entry_ids:
+                entries.pop(entry_id, None)
+        self._update(change)
+
+    def entries_of(self, kind=None) -> list:
+        """Kayıtlar en yeniden eskiye; diğer terminallerin eklediklerini görmek için dosya yeniden okunur."""
+        with self._lock:
+            self.entries = self._load()
+            entries = [dict(e) for e in self.entries.values() if kind is None or e["kind"] == kind]
+        return sorted(entries, key=lambda e: e["created"], reverse=True)
+
+    def prune(self) -> list:
+        """
+        Depo yedeklerine büyükbaba-baba-oğul saklamasını katalog kayıtları
+        üzerinden uygular. Silinen ve kalan yedeklerin manifestlerinden ölü
+        parçalar bulunur; parça klasörü taranmaz, parçalara stat yapılmaz.
+        Silinen yedeklerin kimliklerini döndürür.
+        """
+        def change(entries):
+            ids = [e["id"] for e in entries.values() if e["kind"] == "depo"]
+            keep = gfs_keep(ids)
+            removed = [snap_id for snap_id in ids if snap_id not in keep]
+            if not removed:
+                return []
+            dead = set()
+            for snap_id in removed:
+                try:
+                    dead.update(self.store.manifest(snap_id)["chunks"])
+                except (OSError, ValueError):
+                    pass
+            for snap_id in keep:
+                try:
+                    dead.difference_update(self.store.manifest(snap_id)["chunks"])
+                except (OSError, ValueError):
+                    dead.clear()  # kalan bir yedeğin parçaları bilinmiyor; parça silinmez
+                    break
+            self.store.remove_snapshots(removed, dead)
+            for snap_id in removed:
+                del entries[snap_id]
+            return removed
+        return self._update(change)
+
+    def _open_copy(self, entry_id, task=None):
+        """Yedeğin okunabilir bir dosya yolunu ve geçiciyse silinmesi gerektiğini döndürür."""
+        with self._lock:
+            if entry_id not in self.entries:
+                self.entries = self._load()  # başka terminalin eklediği yedek
+            entry = self.entries[entry_id]
+        if entry["kind"] == "dosya":
+            return os.path.join(self.backup_dir, entry["name"]), False
+        fd, tmp_path = tempfile.mkstemp(prefix="kutuphane_dogrulama_", suffix=".db")
+        os.close(fd)
+        try:
+            self.store.restore(entry_id, tmp_path, task)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path, True
+
+    def verify(self, entry_id, task=None):
+        """
+        Yedeği doğrular: sha256 (kayıtlıysa karşılaştırılır, değilse kaydedilir)
+        ve PRAGMA integrity_check. Sonuç katalogda saklanır; (tamam, mesaj) döner.
+        """
+        path, temporary = None, False
+        try:
+            path, temporary = self._open_copy(entry_id, task)
+            ok, message = self._check(entry_id, path)
+        except QueryCancelled:
+            raise
+        except Exception as e:
+            ok, message = self._record(entry_id, None, str(e))
+        finally:
+            if temporary and path and os.path.exists(path):
+                os.remove(path)
+        return ok, message
+
+    def _check(self, entry_id, path):
+        sha = file_sha256(path)
+        expected = self.entries[entry_id]["sha256"]
+        if expected and sha != expected:
+            return self._record(entry_id, None, "sha256 uyuşmuyor, dosya değişmiş ya da bozulmuş")
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        except sqlite3.DatabaseError as e:
+            result = str(e)
+        finally:
+            conn.close()
+        return self._record(entry_id, sha, result)
+
+    def _record(self, entry_id, sha, result):
+        def change(entries):
+            if entry_id in entries:
+                entry = entries[entry_id]
+                entry.update(sha256=sha or entry["sha256"], verified=result,
+                             verified_at=datetime.datetime.now().isoformat(timespec="seconds"))
+        self._update(change)
+        perf_log("yedek doğrulama %s: %s", entry_id, result)
+        return result == "ok", result
+
+    def restore_into(self, conn, entry_id, task=None):
+        """
+        Yedeği çalışan veritabanına çevrimiçi yedekleme API'siyle geri yükler
+        (dosya değiştirilmez; diğer terminaller yeni içeriği görür). Önce
+        mevcut durum depoya yedeklenir, yedek bütünlük denetiminden geçmezse
+        geri yükleme yapılmaz. Eski şemalı yedeklerde geçişler yeniden çalışır.
+        """
+        path, temporary = self._open_copy(entry_id, task)
+        try:
+            ok, message = self._check(entry_id, path)
+            if not ok:
+                raise ValueError(f"Yedek doğrulanamadı: {message}")
+            manifest = self.store.snapshot(conn)
+            self.add("depo", manifest["id"], manifest["size"], manifest["sha256"])
+            src = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                src.backup(conn, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+            finally:
+                src.close()
+        finally:
+            if temporary and os.path.exists(path):
+                os.remove(path)
+        run_migrations(conn)
+        return manifest["id"]
+
+_BACKUP_CATALOG = None
+_BACKUP_CATALOG_LOCK = threading.Lock()
+
+def backup_catalog() -> BackupCatalog:
+    """Katalog ilk kullanımda yüklenir ve bir kez diskle eşitlenir."""
+    global _BACKUP_CATALOG
+    with _BACKUP_CATALOG_LOCK:
+        if _BACKUP_CATALOG is None or _BACKUP_CATALOG.backup_dir != BACKUP_DIR:
+            _BACKUP_CATALOG = BackupCatalog(BACKUP_DIR)
+            _BACKUP_CATALOG.reconcile()
+        return _BACKUP_CATALOG
+
+def _auto_backup_job():
+    background = threading.current_thread() is not threading.main_thread()
+    with STARTUP.phase("otomatik yedekleme", background=background):
+        _auto_backup()
+
+def _auto_backup():
+    try:
+        store = backup_store()
+        catalog = backup_catalog()
+        written = []
+        manifest = store.snapshot(db_conn(), written=written)
+        catalog.add("depo", manifest["id"], manifest["size"], manifest["sha256"])
+        # Tam doğrulama (geri kurma + integrity_check) Yedekler penceresinden
+        # istenir; burada yalnız bu yedeğin yazdığı parçalar geri okunur
+        bad = store.verify_chunks(written)
+        if bad:
+            catalog._record(manifest["id"], None, f"{len(bad)} yeni parça okunamadı")
+        print("Otomatik yedekleme tamamlandı:", manifest["id"],
+              f"(DOĞRULANAMADI: {len(bad)} parça)" if bad else "")
+        for snap_id in catalog.prune():
+            print(f"Eski yedek silindi: {snap_id}")
+    except Exception as e:
+        print("Otomatik yedekleme hatası:", e)
+    finally:
+        # Bu iş parçacığının bağlantısı bir daha kullanılmayacak
+        DB_MANAGER.close_current()
+
+def auto_backup(background=True):
+    """
+    Uygulama başladığında mevcut veritabanını artımlı yedek deposuna yedekler
+    ve saklama politikasını uygular. background=True ise
+    yedek ayrı bir iş parçacığında alınır ve o iş parçacığı döndürülür;
+    kapanışta bağlantılar kapatılmadan önce join() edilmelidir.
+    """
+    ensure_dirs()
+    if not os.path.exists(DB_PATH):
+        print("Veritabanı dosyası bulunamadı, yedekleme atlandı.")
+        return None
+    if not background:
+        _auto_backup_job()
+        return None
+    thread = threading.Thread(target=_auto_backup_job, name="otomatik-yedek")
+    thread.start()
+    return thread
+
+# -------------------- Metin Normalizasyonu --------------------
+_WS_RE = re.compile(r"\s+")
+
+# Türkçe metinde en sık görülen aksanlı harfler: NFKD + birleşik işaret silme
+# işleminin bu harfler için sonucu. "i̇", İ.lower() sonucudur (i + U+0307).
+_FOLD_REPLACEMENTS = (
+    ("i\u0307", "i"), ("ç", "c"), ("ğ", "g"), ("ö", "o"), ("ş", "s"), ("ü", "u"),
+    ("â", "a"), ("î", "i"), ("û", "u"), ("é", "e"),
+)
+
+@lru_cache(maxsize=None)
+def _combining_re():
+    """
+    BMP'deki birleşik işaretleri ve BMP dışındaki tüm karakterleri yakalayan
+    karakter sınıfı; eşleşme varsa tam yola gidilir (ilk kullanımda kurulur).
+    """
+    ranges, start, prev = [], None, None
+    for cp in range(0x10000):
+        if unicodedata.combining(chr(cp)):
+            if start is None:
+                start = cp
+            prev = cp
+        elif start is not None:
+            ranges.append(f"{re.escape(chr(start))}-{re.escape(chr(prev))}")
+            start = None
+    ranges.append("\U00010000-\U0010ffff")
+    return re.compile("[" + "".join(ranges) + "]")
+
+def _normalize_slow(t: str) -> str:
     t = unicodedata.normalize("NFKD", t)
     t = ''.join(ch for ch in t if not unicodedata.combining(ch))
-    t = re.sub(r"\s+", " ", t)
-    return t
+    return _WS_RE.sub(" ", t)
+
+@lru_cache(maxsize=8192)
+def _normalize_str(s: str) -> str:
+    t = s.strip().lower()
+    if not t.isascii():
+        for src, dst in _FOLD_REPLACEMENTS:
+            if src in t:
+                t = t.replace(src, dst)
+        # Kalan ASCII dışı karakterler (ör. noktasız ı) NFKD'de değişmiyor ve
+        # birleşik işaret içermiyorsa sonuç hazırdır; aksi halde tam yol.
+        if not t.isascii() and (not unicodedata.is_normalized("NFKD", t)
+                                or _combining_re().search(t)):
+            return _normalize_slow(t)
+    # strip() sonrası baş/son boşluk kalmadığından split/join, \s+ → " " ile aynıdır
+    return " ".join(t.split())
+
+def normalize(s: str) -> str:
+    """
+    Arama için metni küçük harfe çevirir, aksanları atar ve boşlukları
+    sadeleştirir. Sonuç, NFKD + birleşik işaret silme yöntemiyle birebir
+    aynıdır; tekrar eden değerler (yazar, sınıf) önbellekten döner.
+    """
+    if s is None: return ""
+    if not isinstance(s, str):
+        s = str(s)
+    return _normalize_str(s)
+
+# -------------------- Performans Günlüğü --------------------
+PERF_LOG_PATH = os.path.join(DB_DIR, "perf.log")
+_perf_logger = logging.getLogger("kutuphane.perf")
+
+def setup_perf_log():
+    """
+    Performans ölçümlerini db/perf.log dosyasına yazar. Pencereli EXE'de
+    konsol olmadığından print çıktıları kaybolur; ölçümler burada toplanır.
+    """
+    if _perf_logger.handlers:
+        return
+    try:
+        os.makedirs(os.path.dirname(PERF_LOG_PATH), exist_ok=True)
+        handler = logging.FileHandler(PERF_LOG_PATH, encoding="utf-8")
+    except OSError as e:
+        print("Performans günlüğü açılamadı:", e)
+        return
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    _perf_logger.addHandler(handler)
+    _perf_logger.setLevel(logging.INFO)
+    _perf_logger.propagate = False
+    for group, ms, modules in IMPORT_TIMES:
+        perf_log("içe aktarma %s: %.1f ms, %d modül", group, ms, modules)
+    perf_log("modül yüklendi: %.0f ms, %d modül", MODULE_READY_MS, len(sys.modules))
+
+def perf_log(msg, *args):
+    _perf_logger.info(msg, *args)
+
+# -------------------- Açılış Ölçümü --------------------
+class StartupTimer:
+    """
+    Açılış aşamalarının süresini ölçer; her aşama bitince perf.log'a yazılır.
+    Arka plan aşamaları (yedekleme) kendi iş parçacığından kaydedilir.
+    waiting=True aşamalar (giriş penceresinde kullanıcıyı beklemek) toplam
+    açılış süresinden düşülür.
+    """
+    def __init__(self):
+        self.phases = []
+        self.waiting_ms = 0.0
+        self.reported = False
+        self.interactive_ms = None
+
+    @contextmanager
+    def phase(self, name, background=False, waiting=False):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.phases.append((name, ms, background))
+            if waiting:
+                self.waiting_ms += ms
+            perf_log("açılış aşaması %s: %.1f ms%s", name, ms, " (arka planda)" if background else "")
+
+    def report(self):
+        """İlk etkileşimde bir kez: modül yükleme dahil, giriş beklemesi hariç toplam süre."""
+        if self.reported:
+            return self.interactive_ms
+        self.reported = True
+        self.interactive_ms = (time.perf_counter() - APP_START) * 1000 - self.waiting_ms
+        perf_log("ilk etkileşim: %.0f ms (modül yükleme %.0f ms; giriş beklemesi %.0f ms hariç)",
+                 self.interactive_ms, MODULE_READY_MS, self.waiting_ms)
+        return self.interactive_ms
+
+STARTUP = StartupTimer()
+
+# -------------------- Tembel Modüller --------------------
+class LazyModule:
+    """
+    Ağır bir modülün vekili; modül ilk öznitelik erişiminde içe aktarılır ve
+    süresi perf.log'a yazılır. Oturumların çoğu Excel/PDF kullanmadığından
+    openpyxl ve reportlab açılışta yüklenmez. PyInstaller bu içe aktarmaları
+    göremez; build.py bunları --hidden-import ile ekler ya da "cekirdek"
+    profilinde EXE'nin yanındaki ek_paketler/ klasörüne ayrı paket olarak koyar.
+    """
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            if os.path.isdir(SIDE_PACKAGES_DIR) and SIDE_PACKAGES_DIR not in sys.path:
+                sys.path.append(SIDE_PACKAGES_DIR)
+            with timed_import(self._name):
+                module = importlib.import_module(self._name)
+            _, ms, modules = IMPORT_TIMES[-1]
+            perf_log("tembel içe aktarma %s: %.1f ms, %d modül", self._name, ms, modules)
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+SIDE_PACKAGES_DIR = os.path.join(APP_DIR, "ek_paketler")
+openpyxl = LazyModule("openpyxl")
+pdfcanvas = LazyModule("reportlab.pdfgen.canvas")
+pdfmetrics = LazyModule("reportlab.pdfbase.pdfmetrics")
+pdf_ttfonts = LazyModule("reportlab.pdfbase.ttfonts")
+pdf_pagesizes = LazyModule("reportlab.lib.pagesizes")
+pdf_units = LazyModule("reportlab.lib.units")
+
+@lru_cache(maxsize=None)
+def pdf_font() -> str:
+    """
+    Türkçe karakter desteği için fontu ilk PDF'te kaydeder ve adını döndürür;
+    Arial bulunamazsa Helvetica'ya döner.
+    """
+    try:
+        FONT_PATH = "C:\\Windows\\Fonts\\Arial.ttf" # Windows için varsayılan yol
+        if not os.path.exists(FONT_PATH):
+            # MacOS için varsayılan yol
+            FONT_PATH = "/Library/Fonts/Arial.ttf"
+            if not os.path.exists(FONT_PATH):
+                FONT_PATH = None
+                print("Uyarı: Arial.ttf fontu bulunamadı. PDF'lerde Türkçe karakter sorunu yaşanabilir.")
+                print("Lütfen FONT_PATH değişkenini sisteminizdeki bir fontun yoluyla güncelleyin.")
+        if not FONT_PATH:
+            return 'Helvetica' # Varsayılan olarak Helvetica'ya dön
+        t0 = time.perf_counter()
+        TTFont = pdf_ttfonts.TTFont
+        pdfmetrics.registerFont(TTFont('Arial', FONT_PATH))
+        pdfmetrics.registerFont(TTFont('Arial-Bold', FONT_PATH)) # Aynı fontu kalın font için de kullanabiliriz
+        pdfmetrics.registerFontFamily('Arial', normal='Arial', bold='Arial-Bold', italic='Arial', boldItalic='Arial')
+        perf_log("PDF fontu kaydedildi: %.1f ms", (time.perf_counter() - t0) * 1000)
+        return 'Arial'
+    except Exception as e:
+        print(f"PDF font hatası: {e}. Helvetica'ya geçiliyor.")
+        return 'Helvetica'
+
+# -------------------- Veritabanı Bağlantı Yöneticisi --------------------
+# Bağlantı profili: settings anahtarı -> varsayılan değer. Her bağlantı
+# açılırken uygulanır. WAL okuyucularla tek yazıcının birbirini beklemesini
+# önler; ancak veritabanı ağ paylaşımındaysa (SMB) WAL'ın paylaşımlı belleği
+# çalışmaz, o durumda günlük kipi 'delete' seçilmelidir.
+DB_PROFILE_DEFAULTS = {
+    "db_journal_mode": "wal",
+    "db_synchronous": "normal",
+    "db_cache_mb": "32",
+    "db_mmap_mb": "256",
+    "db_temp_store": "memory",
+    "db_busy_timeout_ms": "5000",
+    "db_checkpoint_pages": "1000",
+    "db_checkpoint_interval_s": "300",
+}
+DB_PROFILE_CHOICES = {
+    "db_journal_mode": ("wal", "delete"),
+    "db_synchronous": ("normal", "full"),
+    "db_temp_store": ("memory", "file"),
+}
+
+def parse_db_profile(values) -> dict:
+    """settings değerlerini doğrular; eksik ya da hatalı olanlar varsayılana döner."""
+    profile = {}
+    for key, default in DB_PROFILE_DEFAULTS.items():
+        value = str(values.get(key, default)).strip().lower()
+        choices = DB_PROFILE_CHOICES.get(key)
+        valid = value in choices if choices else value.isdigit()
+        profile[key] = value if valid else default
+    return profile
+
+def profile_pragmas(profile) -> list:
+    return [
+        f"PRAGMA busy_timeout = {int(profile['db_busy_timeout_ms'])}",
+        f"PRAGMA journal_mode = {profile['db_journal_mode']}",
+        f"PRAGMA synchronous = {profile['db_synchronous']}",
+        f"PRAGMA cache_size = {-int(profile['db_cache_mb']) * 1024}",
+        f"PRAGMA mmap_size = {int(profile['db_mmap_mb']) * 1024 * 1024}",
+        f"PRAGMA temp_store = {profile['db_temp_store']}",
+        f"PRAGMA wal_autocheckpoint = {int(profile['db_checkpoint_pages'])}",
+    ]
+
+class ConnectionManager:
+    """
+    Her iş parçacığı için tek ve uzun ömürlü bir SQLite bağlantısı tutar.
+    Klasörler ilk açılışta bir kez oluşturulur, normalize fonksiyonu her
+    bağlantıya yalnızca açılırken kaydedilir ve close_all() kapanışta tüm
+    bağlantıları kapatır. Açılış/yeniden kullanım sayaçları stats() ile okunur.
+    PRAGMA profili açılışta uygulanır; reload_profile() sonrası her bağlantı
+    kendi iş parçacığında bir sonraki get() çağrısında profili yeniden alır.
+    """
+    def __init__(self, cached_statements=256):
+        self.cached_statements = cached_statements
+        # İş parçacığı kimliği -> (bağlantı, yol). threading.local yerine kimlik
+        # kullanılır: QThreadPool gibi Python dışı iş parçacıklarında her geri
+        # çağrı yeni bir Python iş parçacığı durumu alır ve local veri kaybolur.
+        self._by_thread = {}
+        self._lock = threading.Lock()
+        self._conns = []
+        self._readers = set()
+        self._dirs_ready = False
+        self.profile = None
+        self.profile_version = 0
+        self._applied = {}
+        self.opens = 0
+        self.reuses = 0
+        self.closes = 0
+
+    def _open(self, path):
+        if not self._dirs_ready:
+            ensure_dirs()
+            self._dirs_ready = True
+        # check_same_thread=False: bağlantı yine tek iş parçacığında kullanılır,
+        # ancak close_all() kapanışta başka bir iş parçacığından kapatabilsin.
+        conn = sqlite3.connect(path, cached_statements=self.cached_statements,
+                               check_same_thread=False)
+        conn.create_function("normalize", 1, normalize)
+        self._apply_profile(conn)
+        with self._lock:
+            self._conns.append(conn)
+            self.opens += 1
+        return conn
+
+    @staticmethod
+    def _read_profile(conn) -> dict:
+        try:
+            values = dict(conn.execute("SELECT key, value FROM settings WHERE key LIKE 'db_%'"))
+        except sqlite3.OperationalError:
+            values = {}  # settings tablosu henüz yok (ilk kurulum)
+        return parse_db_profile(values)
+
+    def _apply_profile(self, conn):
+        version = self.profile_version
+        profile = self.profile
+        if profile is None:
+            profile = self.profile = self._read_profile(conn)
+        for pragma in profile_pragmas(profile):
+            try:
+                row = conn.execute(pragma).fetchone()
+            except sqlite3.OperationalError as e:
+                print("PRAGMA uygulanamadı:", pragma, e)
+                continue
+            if "journal_mode" in pragma and row and row[0] != profile["db_journal_mode"]:
+                # Başka bağlantılar açıkken WAL'dan çıkılamaz; yeniden başlatınca uygulanır
+                perf_log("günlük kipi %s istendi, %s kaldı", profile["db_journal_mode"], row[0])
+        self._applied[conn] = version
+
+    def reload_profile(self):
+        """Profil ayarları değişti; bağlantılar sıradaki get() ile yeniden uygular."""
+        with self._lock:
+            self.profile = None
+            self.profile_version += 1
+
+    def wal_enabled(self) -> bool:
+        return (self.profile or DB_PROFILE_DEFAULTS)["db_journal_mode"] == "wal"
+
+    def checkpoint(self, conn, mode="PASSIVE"):
+        """
+        WAL dosyasını ana veritabanına aktarır. PASSIVE okuyucu/yazıcı
+        beklemez; TRUNCATE kapanışta WAL dosyasını sıfırlar.
+        """
+        if not self.wal_enabled():
+            return None
+        t0 = time.perf_counter()
+        try:
+            busy, log_pages, done = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        except sqlite3.OperationalError as e:
+            print("WAL checkpoint hatası:", e)
+            return None
+        perf_log("checkpoint %s: meşgul=%d wal=%d aktarılan=%d, %.1f ms",
+                 mode, busy, log_pages, done, (time.perf_counter() - t0) * 1000)
+        return busy, log_pages, done
+
+    def get(self):
+        """Çağıran iş parçacığının bağlantısını döndürür, yoksa açar."""
+        ident = threading.get_ident()
+        with self._lock:
+            conn, path = self._by_thread.get(ident, (None, None))
+            reuse = conn is not None and path == DB_PATH
+            if reuse:
+                self.reuses += 1
+        if reuse:
+            if self._applied.get(conn) != self.profile_version:
+                self._apply_profile(conn)
+            return conn
+        if conn is not None:
+            self.close_current()
+        conn = self._open(DB_PATH)
+        with self._lock:
+            self._by_thread[ident] = (conn, DB_PATH)
+        return conn
+
+    def _close(self, conn):
+        with self._lock:
+            if conn not in self._conns:
+                return
+            self._conns.remove(conn)
+            self._readers.discard(conn)
+            self._applied.pop(conn, None)
+            self.closes += 1
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            print("Bağlantı kapatma hatası:", e)
+
+    def open_reader(self):
+        """
+        İş parçacığına bağlı olmayan ayrı bir okuma bağlantısı açar. Açık
+        imleci olan tablolar (RowTableModel.set_query) kullanır; paylaşılan
+        bağlantının okumaları imlecin anlık görüntüsüne takılmasın diye.
+        """
+        conn = self._open(DB_PATH)
+        with self._lock:
+            self._readers.add(conn)
+        return conn
+
+    def release(self, conn):
+        """open_reader() ile açılan bağlantıyı kapatır."""
+        self._close(conn)
+
+    def close_current(self):
+        """Yalnızca çağıran iş parçacığının bağlantısını kapatır."""
+        with self._lock:
+            conn, _ = self._by_thread.pop(threading.get_ident(), (None, None))
+        if conn is not None:
+            self._close(conn)
+
+    def close_all(self):
+        """Tüm açık bağlantıları kapatır ve sayaçları günlüğe yazar."""
+        with self._lock:
+            readers = list(self._readers)
+            self._by_thread.clear()
+        # Açık imleci olan okuyucular önce kapanır, yoksa TRUNCATE tamamlanamaz
+        for conn in readers:
+            self._close(conn)
+        with self._lock:
+            conns = list(self._conns)
+        if conns:
+            # Diğer terminaller açık kalsa da WAL dosyası büyümüş halde kalmasın
+            self.checkpoint(conns[0], "TRUNCATE")
+        for conn in conns:
+            self._close(conn)
+        if self.opens:
+            perf_log("db bağlantıları: açılış=%d yeniden_kullanım=%d kapanış=%d",
+                     self.opens, self.reuses, self.closes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"opens": self.opens, "reuses": self.reuses,
+                    "closes": self.closes, "open_now": len(self._conns)}
+
+DB_MANAGER = ConnectionManager()
+atexit.register(DB_MANAGER.close_all)
 
 def db_conn():
-    ensure_dirs()
-    conn = sqlite3.connect(DB_PATH)
-    conn.create_function("normalize", 1, normalize)
-    return conn
+    """
+    Paylaşılan bağlantıyı döndürür. `with db_conn() as conn:` bloğu
+    işlemi commit eder ancak bağlantıyı kapatmaz; kapanış DB_MANAGER'dadır.
+    """
+    return DB_MANAGER.get()
+
+# -------------------- Şema Geçişleri --------------------
+# Her geçiş bir kez çalışır; uygulanan son sürüm PRAGMA user_version'da tutulur.
+# Yeni geçişler listenin sonuna artan sürüm numarasıyla eklenmelidir.
+
+def _migrate_users_role(c):
+    # Kullanıcı tablosunda role sütunu yoksa ekle (eski veritabanı için)
+    cols = [r[1] for r in c.execute("PRAGMA table_info(users)")]
+    if "role" not in cols:
+        c.execute("ALTER TABLE users ADD COLUMN role TEXT DEFAULT 'staff'")
+        c.execute("UPDATE users SET role = 'admin' WHERE username = 'Admin'")
+
+def _migrate_loan_indexes(c):
+    # Üyenin aktif ödünç sayısı ve üye geçmişi
+    c.execute("CREATE INDEX IF NOT EXISTS idx_loans_member_return ON loans(member_id, return_date)")
+    # Kitap bazlı birleştirme ve en çok ödünç alınanlar raporu
+    c.execute("CREATE INDEX IF NOT EXISTS idx_loans_book ON loans(book_id)")
+    # Aktif ödünçler / gecikenler: yalnızca teslim edilmemiş satırlar
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_loans_active_due
+                 ON loans(due_date) WHERE return_date IS NULL""")
+    # Teslim edilenler geçmişi (return_date DESC sıralı)
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_loans_returned
+                 ON loans(return_date) WHERE return_date IS NOT NULL""")
+    c.execute("ANALYZE")
+
+# Katalog tam metin indeksi. unicode61 büyük/küçük harf ve aksanları katlar
+# (ş→s, ğ→g, İ→i); noktasız ı ise ayrışmadığı için SQL tarafında i'ye çevrilir.
+BOOKS_FTS_COLUMNS = ("title", "author", "publisher", "category", "barcode")
+BOOKS_FTS_WEIGHTS = (10.0, 5.0, 1.0, 1.0, 3.0)
+
+def _fts_values(prefix):
+    return ", ".join(f"replace(coalesce({prefix}.{col}, ''), 'ı', 'i')" for col in BOOKS_FTS_COLUMNS)
+
+def _migrate_books_fts(c):
+    try:
+        c.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+                        title, author, publisher, category, barcode,
+                        tokenize = 'unicode61 remove_diacritics 2')""")
+    except sqlite3.OperationalError as e:
+        # FTS5 olmadan derlenmiş SQLite: arama LIKE ile devam eder
+        print("FTS5 kullanılamıyor, katalog araması LIKE ile yapılacak:", e)
+        return
+    cols = ", ".join(BOOKS_FTS_COLUMNS)
+    c.execute(f"""CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+                    INSERT INTO books_fts(rowid, {cols}) VALUES (new.id, {_fts_values('new')});
+                  END""")
+    c.execute("""CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+                    DELETE FROM books_fts WHERE rowid = old.id;
+                  END""")
+    c.execute(f"""CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF {cols} ON books BEGIN
+                    DELETE FROM books_fts WHERE rowid = old.id;
+                    INSERT INTO books_fts(rowid, {cols}) VALUES (new.id, {_fts_values('new')});
+                  END""")
+    c.execute("DELETE FROM books_fts")
+    c.execute(f"INSERT INTO books_fts(rowid, {cols}) SELECT b.id, {_fts_values('b')} FROM books b")
+
+# Aramada kullanılan normalize edilmiş gölge sütunlar: tablo -> {gölge: kaynak}.
+# Değerler yazma anında tetikleyicilerle bir kez hesaplanır; bu yüzden tabloya
+# yazan her bağlantıda normalize fonksiyonu kayıtlı olmalıdır (db_conn() yapar).
+NORM_COLUMNS = {
+    "books": {"title_norm": "title", "author_norm": "author"},
+    "members": {"name_norm": "name", "surname_norm": "surname", "no_norm": "no"},
+}
+
+def _migrate_norm_columns(c):
+    for table, columns in NORM_COLUMNS.items():
+        existing = [r[1] for r in c.execute(f"PRAGMA table_info({table})")]
+        for shadow in columns:
+            if shadow not in existing:
+                c.execute(f"ALTER TABLE {table} ADD COLUMN {shadow} TEXT")
+        assignments = ", ".join(f"{shadow} = normalize(new.{src})" for shadow, src in columns.items())
+        sources = ", ".join(columns.values())
+        c.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_norm_ai AFTER INSERT ON {table} BEGIN
+                        UPDATE {table} SET {assignments} WHERE id = new.id;
+                      END""")
+        c.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_norm_au AFTER UPDATE OF {sources} ON {table} BEGIN
+                        UPDATE {table} SET {assignments} WHERE id = new.id;
+                      END""")
+        backfill = ", ".join(f"{shadow} = normalize({src})" for shadow, src in columns.items())
+        c.execute(f"UPDATE {table} SET {backfill}")
+        for shadow in columns:
+            c.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{shadow} ON {table}({shadow})")
+    c.execute("ANALYZE")
+
+def _migrate_paging_indexes(c):
+    # Üye listesi (name_norm, surname_norm, id) anahtarıyla sayfalanır
+    c.execute("CREATE INDEX IF NOT EXISTS idx_members_sort ON members(name_norm, surname_norm)")
+    c.execute("ANALYZE")
+
+def _migrate_import_files(c):
+    # Toplu içe aktarmada içerik özetiyle daha önce aktarılan dosyalar
+    c.execute("""CREATE TABLE IF NOT EXISTS import_files(
+        hash TEXT PRIMARY KEY,
+        name TEXT,
+        kind TEXT,
+        rows INTEGER,
+        imported_at TEXT
+    )""")
+
+def _migrate_barcode_seq(c):
+    # Otomatik barkod sayaçları (önek başına bir satır)
+    c.execute("""CREATE TABLE IF NOT EXISTS barcode_seq(
+        name TEXT PRIMARY KEY,
+        next INTEGER NOT NULL
+    )""")
+
+MIGRATIONS = [
+    (1, "users.role sütunu", _migrate_users_role),
+    (2, "ödünç tablosu indeksleri", _migrate_loan_indexes),
+    (3, "kitap tam metin indeksi (FTS5)", _migrate_books_fts),
+    (4, "normalize edilmiş gölge sütunlar", _migrate_norm_columns),
+    (5, "sayfalama indeksleri", _migrate_paging_indexes),
+    (6, "içe aktarılan dosyalar tablosu", _migrate_import_files),
+    (7, "barkod sayaçları", _migrate_barcode_seq),
+]
+
+def schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def run_migrations(conn):
+    """
+    Veritabanı sürümünden yeni olan geçişleri sırayla uygular. Her geçiş
+    kendi işlemi içinde çalışır; hata olursa geri alınır ve sürüm artmaz.
+    """
+    current = schema_version(conn)
+    for version, description, migrate in MIGRATIONS:
+        if version <= current:
+            continue
+        c = conn.cursor()
+        c.execute("BEGIN")
+        try:
+            migrate(c)
+            c.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Veritabanı geçişi uygulandı: {version} - {description}")
+        current = version
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def schema_is_current() -> bool:
+    """Veritabanı dosyası var ve tüm geçişler uygulanmış mı?"""
+    return os.path.exists(DB_PATH) and schema_version(db_conn()) >= LATEST_SCHEMA_VERSION
 
 def init_db():
     ensure_dirs()
     conn = db_conn()
+    # Şema güncelse tablo oluşturma ve geçişler atlanır; yalnız varsayılanlar denetlenir
+    if schema_version(conn) < LATEST_SCHEMA_VERSION:
+        create_schema(conn)
+    seed_defaults(conn)
+    SETTINGS.invalidate()
+
+def create_schema(conn):
     c = conn.cursor()
     # books table
     c.execute("""CREATE TABLE IF NOT EXISTS books(
@@ -249,18 +1494,18 @@ def init_db():
         value TEXT
     )""")
     
+    conn.commit()
+
+    # Eski veritabanlarını güncel şemaya taşı (PRAGMA user_version ile)
+    run_migrations(conn)
+
+def seed_defaults(conn):
+    c = conn.cursor()
     # Varsayılan kullanıcıyı ekle
     c.execute("SELECT COUNT(*) FROM users WHERE username = 'Admin'")
     if c.fetchone()[0] == 0:
         hashed_password = hash_password("12345")
         c.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", ('Admin', hashed_password, 'admin'))
-    
-    # Kullanıcı tablosunda role sütunu yoksa ekle (eski veritabanı için)
-    try:
-        c.execute("SELECT role FROM users LIMIT 1")
-    except sqlite3.OperationalError:
-        c.execute("ALTER TABLE users ADD COLUMN role TEXT DEFAULT 'staff'")
-        c.execute("UPDATE users SET role = 'admin' WHERE username = 'Admin'")
 
     # Ödünç alma sınırı ayarını ekle (varsayılan 3)
     c.execute("SELECT COUNT(*) FROM settings WHERE key = 'loan_limit'")
@@ -273,7 +1518,6 @@ def init_db():
         c.execute("INSERT INTO settings (key, value) VALUES (?, ?)", ('default_loan_days', '15'))
     
     conn.commit()
-    conn.close()
 
 TURKISH_HEADER_MAP = {
     "barkod":"barcode",
@@ -290,8 +1534,81 @@ TURKISH_HEADER_MAP = {
     "aciklama":"note","açiklama":"note","açıklama":"note",
 }
 
-def gen_barcode(n=8):
-    return "".join(random.choice(string.digits) for _ in range(n))
+# -------------------- Barkod Ayırıcı --------------------
+BARCODE_CHECK_FORMATS = {"none": "Yok", "luhn": "Luhn (mod 10)", "mod11": "Mod 11"}
+
+def luhn_digit(digits: str) -> str:
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = int(ch)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return str((10 - total % 10) % 10)
+
+def mod11_digit(digits: str) -> str:
+    # Ağırlıklar sağdan 2..7 döngüsü; 10 kalanı 'X' ile gösterilir
+    total = sum(int(ch) * (i % 6 + 2) for i, ch in enumerate(reversed(digits)))
+    r = (11 - total % 11) % 11
+    return "X" if r == 10 else str(r)
+
+class BarcodeAllocator:
+    """
+    Otomatik barkodları barcode_seq tablosundaki sayaçtan ayırır: önek,
+    sıfırla doldurulmuş sıra numarası ve isteğe bağlı kontrol hanesi.
+    reserve() bir aralığı tek UPDATE ile ayırır ve çağıranın işlemi içinde
+    çalışır; işlem geri alınırsa aralık da geri alınır. Bir önek ilk kez
+    kullanıldığında books tablosu bir kez taranıp sayaç mevcut en büyük
+    numaranın üstünden başlatılır, sonrasında books'a bakılmaz. Varsayılan
+    önek harf olduğundan eski rastgele sayısal barkodlarla çakışmaz.
+    """
+    def __init__(self, prefix="K", digits=7, check="none"):
+        self.prefix = prefix
+        self.digits = digits
+        self.check = check if check in BARCODE_CHECK_FORMATS else "none"
+
+    @classmethod
+    def from_settings(cls, conn):
+        values = dict(conn.execute("SELECT key, value FROM settings WHERE key LIKE 'barcode_%'"))
+        try:
+            digits = max(1, int(values.get("barcode_digits", "7")))
+        except ValueError:
+            digits = 7
+        return cls(values.get("barcode_prefix", "K"), digits, values.get("barcode_check", "none"))
+
+    def format(self, n: int) -> str:
+        body = str(n).zfill(self.digits)
+        if self.check == "luhn":
+            body += luhn_digit(body)
+        elif self.check == "mod11":
+            body += mod11_digit(body)
+        return self.prefix + body
+
+    def _seed(self, conn):
+        top = 0
+        n = len(self.prefix)
+        for (barcode,) in conn.execute("SELECT barcode FROM books WHERE substr(barcode, 1, ?) = ?",
+                                       (n, self.prefix)):
+            rest = barcode[n:]
+            if self.check != "none":
+                rest = rest[:-1]
+            if rest.isdigit():
+                top = max(top, int(rest))
+        conn.execute("INSERT OR IGNORE INTO barcode_seq(name, next) VALUES(?, ?)", (self.prefix, top + 1))
+
+    def reserve(self, conn, count: int) -> list:
+        """count adet ardışık barkod ayırır."""
+        if count <= 0:
+            return []
+        update = "UPDATE barcode_seq SET next = next + ? WHERE name = ?"
+        if conn.execute(update, (count, self.prefix)).rowcount == 0:
+            self._seed(conn)
+            conn.execute(update, (count, self.prefix))
+        # UPDATE yazma kilidini aldı; okunan değer bu işleme aittir
+        end = conn.execute("SELECT next FROM barcode_seq WHERE name = ?", (self.prefix,)).fetchone()[0]
+        return [self.format(n) for n in range(end - count, end)]
 
 def excel_val_to_iso(v):
     if v is None or v=="": return ""
@@ -310,27 +1627,1581 @@ def excel_val_to_iso(v):
             except: pass
     return s
 
-# YENİ EKLEME: Ayar değerlerini okumak için yardımcı fonksiyonlar
-def get_setting(key: str, default: str) -> str:
-    with db_conn() as conn:
-        c = conn.cursor()
-        c.execute("SELECT value FROM settings WHERE key = ?", (key,))
-        result = c.fetchone()
-        if result:
-            return result[0]
+# -------------------- Excel İçe Aktarma --------------------
+# books INSERT sütun sırası
+BOOK_IMPORT_COLUMNS = ("barcode", "title", "author", "publisher", "year", "pages",
+                       "category", "demirbas", "raf", "dolap", "adet", "note")
+IMPORT_BATCH_SIZE = 2000
+
+class ImportReport:
+    """İçe aktarma sonucu: okunan, eklenen, atlanan satırlar ve satır hataları."""
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.empty = 0
+        self.errors = []
+        self.elapsed = 0.0
+        # Yalnızca üye eşitlemesinde doldurulur
+        self.updated = None
+        self.unchanged = None
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        if self.updated is None:
+            text = f"{self.inserted} kayıt eklendi, {self.duplicates} mevcut kayıt atlandı, "
+        else:
+            text = (f"{self.inserted} kayıt eklendi, {self.updated} güncellendi, "
+                    f"{self.unchanged} değişmedi, {self.duplicates} tekrarlanan numara atlandı, ")
+        text += (f"{self.empty} boş satır atlandı, {len(self.errors)} satır hatalı.\n"
+                 f"{self.rows} satır {self.elapsed:.1f} sn'de işlendi ({self.rate:.0f} satır/sn).")
+        if self.errors:
+            shown = "\n".join(f"Satır {i}: {e}" for i, e in self.errors[:10])
+            more = f"\n... ve {len(self.errors) - 10} hata daha" if len(self.errors) > 10 else ""
+            text += "\n\nHatalı satırlar:\n" + shown + more
+        return text
+
+def _import_int(v, default=None):
+    if v is None or v == "":
         return default
+    return int(v)
 
-def get_loan_limit() -> int:
+def book_row_mapper(header):
+    """
+    Başlık satırından bir kez derlenen dönüştürücü döndürür; 'Kitap Adı'
+    başlığı yoksa None. Dönüştürücü ham satırı BOOK_IMPORT_COLUMNS sırasında
+    parametrelere çevirir, kitap adı boşsa None döndürür, hatalı değerde
+    ValueError fırlatır.
+    """
+    colmap = {}
+    for idx, value in enumerate(header):
+        field = TURKISH_HEADER_MAP.get(normalize(str(value)))
+        if field:
+            colmap[field] = idx
+    if "title" not in colmap:
+        return None
+    positions = [colmap.get(col) for col in BOOK_IMPORT_COLUMNS]
+
+    def convert(row):
+        n = len(row)
+        barcode, title, author, publisher, year, pages, category, demirbas, raf, dolap, adet, note = (
+            row[i] if i is not None and i < n else None for i in positions)
+        if not title:
+            return None
+        # Boş barkod yazılırken BarcodeAllocator ile doldurulur
+        barcode = str(barcode).strip() if barcode is not None else ""
+        return (barcode or None, str(title).strip(), author, publisher,
+                _import_int(year), _import_int(pages), category, demirbas, raf, dolap,
+                _import_int(adet, 1), note)
+    return convert
+
+# Dosyada gelen barkod zaten varsa satır tekrar sayılır. Ayırıcının verdiği
+# barkodun çakışması ise bir hatadır ve ON CONFLICT'siz sorguyla yakalanır.
+BOOK_INSERT_ALLOCATED_SQL = f"""INSERT INTO books({",".join(BOOK_IMPORT_COLUMNS)})
+                                VALUES({",".join("?" for _ in BOOK_IMPORT_COLUMNS)})"""
+BOOK_INSERT_SQL = BOOK_INSERT_ALLOCATED_SQL + " ON CONFLICT(barcode) DO NOTHING"
+
+def _import_cancelled(error, task):
+    """Hata kullanıcı iptalinden (conn.interrupt) mi geliyor?"""
+    return (task is not None and task.cancelled) or "interrupted" in str(error)
+
+def _insert_book_batch(c, batch, report, allocator, task=None):
+    """
+    Bir parçayı executemany ile yazar; hata olursa satır satır yazıp hatalı
+    satırı bulur. Barkodu boş satırlara parça başına tek ayırma yapılır;
+    ayrılan barkod mevcut bir kitapla çakışırsa satır hata olarak raporlanır.
+    İptal (interrupt) satır satır yazmaya düşmez, QueryCancelled olarak
+    yükselir; SQLite bu durumda işlemi zaten geri almıştır.
+    """
+    supplied = [(i, params, BOOK_INSERT_SQL) for i, params in batch if params[0] is not None]
+    allocated = [(i, params) for i, params in batch if params[0] is None]
+    if allocated:
+        codes = iter(allocator.reserve(c.connection, len(allocated)))
+        allocated = [(i, (next(codes),) + params[1:], BOOK_INSERT_ALLOCATED_SQL) for i, params in allocated]
     try:
-        return int(get_setting('loan_limit', '3'))
-    except (ValueError, IndexError):
-        return 3
+        c.execute("SAVEPOINT parca")
+        c.executemany(BOOK_INSERT_SQL, [params for _i, params, _sql in supplied])
+        inserted = c.rowcount if supplied else 0
+        if allocated:
+            c.executemany(BOOK_INSERT_ALLOCATED_SQL, [params for _i, params, _sql in allocated])
+            inserted += c.rowcount
+        c.execute("RELEASE parca")
+    except sqlite3.DatabaseError as e:
+        if _import_cancelled(e, task):
+            raise QueryCancelled() from e
+        c.execute("ROLLBACK TO parca")
+        c.execute("RELEASE parca")
+        inserted = failed = 0
+        for i, params, sql in supplied + allocated:
+            try:
+                c.execute(sql, params)
+                inserted += c.rowcount
+            except sqlite3.DatabaseError as e:
+                if _import_cancelled(e, task):
+                    raise QueryCancelled() from e
+                if sql is BOOK_INSERT_ALLOCATED_SQL and isinstance(e, sqlite3.IntegrityError):
+                    e = f"ayrılan barkod {params[0]} başka bir kitapta kullanılıyor"
+                report.errors.append((i, str(e)))
+                failed += 1
+    else:
+        failed = 0
+    report.inserted += inserted
+    report.duplicates += len(batch) - inserted - failed
+
+def read_sheet_rows(rows, convert, report, on_batch, task=None):
+    """
+    Ham satırları convert ile dönüştürür ve IMPORT_BATCH_SIZE'lık (satır no,
+    parametreler) parçalar halinde on_batch'e verir. Boş satırlar ve değer
+    hataları report'a yazılır. task verilirse her parçada okunan satır sayısı
+    bildirilir ve iptal kontrol edilir.
+    """
+    batch = []
+    for i, row in enumerate(rows, start=2):
+        report.rows += 1
+        try:
+            params = convert(row)
+        except (ValueError, TypeError) as e:
+            report.errors.append((i, str(e)))
+            continue
+        if params is None:
+            report.empty += 1
+            continue
+        batch.append((i, params))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            on_batch(batch)
+            batch = []
+            if task is not None:
+                if task.cancelled:
+                    raise QueryCancelled()
+                task.report(report.rows)
+    if batch:
+        on_batch(batch)
+
+def write_book_rows(c, rows, report, task=None):
+    """Ayrıştırılmış (satır no, parametreler) listesini parçalar halinde yazar."""
+    allocator = BarcodeAllocator.from_settings(c.connection)
+    for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+        _insert_book_batch(c, rows[start:start + IMPORT_BATCH_SIZE], report, allocator, task)
+
+def import_books_xlsx(conn, path, task=None):
+    """
+    Kitap listesini Excel'den akış kipinde (read_only) okuyup IMPORT_BATCH_SIZE
+    satırlık executemany parçalarıyla tek işlemde yazar. task verilirse
+    (QueryTask) okunan satır sayısı bildirilir ve iptal kontrol edilir.
+    Başlıklar eksikse ValueError fırlatır.
+    """
+    t0 = time.perf_counter()
+    report = ImportReport()
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        convert = book_row_mapper(next(rows, ()))
+        if convert is None:
+            raise ValueError("Excel başlıkları eksik (en azından 'Kitap Adı' gerekli).")
+        c = conn.cursor()
+        allocator = BarcodeAllocator.from_settings(conn)
+        c.execute("BEGIN")
+        read_sheet_rows(rows, convert, report,
+                        lambda batch: _insert_book_batch(c, batch, report, allocator, task), task)
+        conn.commit()
+    finally:
+        wb.close()
+    report.elapsed = time.perf_counter() - t0
+    perf_log("kitap içe aktarma %s: %d satır, %d eklendi, %d tekrar, %d hata, %.0f satır/sn",
+             os.path.basename(path), report.rows, report.inserted, report.duplicates,
+             len(report.errors), report.rate)
+    return report
+
+MEMBER_IMPORT_HEADERS = ["AD","SOYAD","SINIF","ŞUBE","NUMARA","CİNSİYET","TELEFON","KAYIT TARİHİ"]
+# Eşitlemede mevcut üyede güncellenen sütunlar (kayıt tarihi korunur)
+MEMBER_SYNC_COLUMNS = ("name", "surname", "class", "branch", "gender", "phone")
+
+def _cell_text(v):
+    """Hücre değerini metne çevirir; Excel'in 123.0 gibi tam sayılarını 123 yapar."""
+    if v is None:
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        v = int(v)
+    return str(v).strip()
+
+def _member_headers(header):
+    return [str(v).strip().upper() if v is not None else "" for v in header]
+
+def member_row_mapper(header):
+    """
+    Üye listesi başlıklarından dönüştürücü üretir; MEMBER_IMPORT_HEADERS'tan
+    biri eksikse None. Dönüştürücü ad, soyad veya numarası boş satırda None
+    döndürür.
+    """
+    headers = _member_headers(header)
+    if any(h not in headers for h in MEMBER_IMPORT_HEADERS):
+        return None
+    positions = [headers.index(h) for h in MEMBER_IMPORT_HEADERS]
+    today = datetime.date.today().isoformat()
+
+    def convert(row):
+        n = len(row)
+        name, surname, klass, branch, no, gender, phone, reg = (
+            row[p] if p < n else None for p in positions)
+        name, surname, no = _cell_text(name), _cell_text(surname), _cell_text(no)
+        if not (name and surname and no):
+            return None
+        return (name, surname, _cell_text(klass), _cell_text(branch), no,
+                _cell_text(gender), _cell_text(phone), excel_val_to_iso(reg) or today)
+    return convert
+
+MEMBER_STAGE_SQL = """INSERT OR REPLACE INTO member_stage(name,surname,class,branch,no,gender,phone,register_date)
+                      VALUES(?,?,?,?,?,?,?,?)"""
+
+def begin_member_stage(c):
+    """Geçici member_stage tablosunu hazırlayıp işlemi başlatır."""
+    c.execute("""CREATE TEMP TABLE IF NOT EXISTS member_stage(
+                    no TEXT PRIMARY KEY, name TEXT, surname TEXT, class TEXT,
+                    branch TEXT, gender TEXT, phone TEXT, register_date TEXT)""")
+    c.execute("BEGIN")
+    c.execute("DELETE FROM member_stage")
+
+def apply_member_stage(c, staged, update, report):
+    """
+    member_stage'i tek bir INSERT ... ON CONFLICT(no) deyimiyle members'a
+    uygular ve eklenen/güncellenen/değişmeyen sayılarını report'a yazar.
+    staged, sahneye gönderilen satır sayısıdır (tekrarlar dahil).
+    """
+    report.duplicates = staged - c.execute("SELECT COUNT(*) FROM member_stage").fetchone()[0]
+    cols = ",".join(MEMBER_SYNC_COLUMNS)
+    m_cols = ",".join(f"m.{col}" for col in MEMBER_SYNC_COLUMNS)
+    s_cols = ",".join(f"s.{col}" for col in MEMBER_SYNC_COLUMNS)
+    existing, same = c.execute(f"""SELECT COUNT(*), COALESCE(SUM(({m_cols}) IS ({s_cols})), 0)
+                                   FROM member_stage s JOIN members m ON m.no = s.no""").fetchone()
+    if update:
+        excluded = ",".join(f"excluded.{col}" for col in MEMBER_SYNC_COLUMNS)
+        conflict = f"""DO UPDATE SET ({cols}) = ({excluded})
+                       WHERE ({cols}) IS NOT ({excluded})"""
+    else:
+        conflict = "DO NOTHING"
+    # WHERE true: INSERT ... SELECT ... ON CONFLICT ayrıştırma belirsizliği için gerekli
+    c.execute(f"""INSERT INTO members(name,surname,class,branch,no,gender,phone,register_date)
+                  SELECT name,surname,class,branch,no,gender,phone,register_date
+                  FROM member_stage WHERE true
+                  ON CONFLICT(no) {conflict}""")
+    changed = c.rowcount
+    c.execute("DELETE FROM member_stage")
+    report.inserted = staged - report.duplicates - existing
+    report.updated = existing - same if update else 0
+    report.unchanged = same if update else existing
+    if changed != report.inserted + report.updated:
+        print("Üye eşitleme sayımı tutarsız:", changed, report.inserted, report.updated)
+
+def write_member_rows(c, rows, update, report):
+    """Ayrıştırılmış üye satırlarını sahneleyip tek deyimle uygular."""
+    begin_member_stage(c)
+    c.executemany(MEMBER_STAGE_SQL, [params for _i, params in rows])
+    apply_member_stage(c, len(rows), update, report)
+
+def sync_members_xlsx(conn, path, update=True, task=None):
+    """
+    Üye listesini Excel'den okuyup geçici member_stage tablosuna yazar, sonra
+    tek bir INSERT ... ON CONFLICT(no) deyimiyle members tablosuna uygular.
+    update True ise mevcut numaraların MEMBER_SYNC_COLUMNS alanları
+    güncellenir, değilse yalnızca yeni üyeler eklenir. Sayfada tekrarlanan
+    numaralardan sonuncusu geçerlidir.
+    """
+    t0 = time.perf_counter()
+    report = ImportReport()
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        convert = member_row_mapper(header)
+        if convert is None:
+            headers = _member_headers(header)
+            missing = [h for h in MEMBER_IMPORT_HEADERS if h not in headers]
+            raise ValueError("Excel başlıkları uygun değil: " + ", ".join(missing))
+        c = conn.cursor()
+        begin_member_stage(c)
+        staged = 0
+        def stage(batch):
+            nonlocal staged
+            c.executemany(MEMBER_STAGE_SQL, [params for _i, params in batch])
+            staged += len(batch)
+        read_sheet_rows(rows, convert, report, stage, task)
+        apply_member_stage(c, staged, update, report)
+        conn.commit()
+    finally:
+        wb.close()
+    report.elapsed = time.perf_counter() - t0
+    perf_log("üye eşitleme %s: %d satır, %d eklendi, %d güncellendi, %d değişmedi, %.2f sn",
+             os.path.basename(path), report.rows, report.inserted, report.updated,
+             report.unchanged, report.elapsed)
+    return report
+
+# -------------------- Klasörden Toplu İçe Aktarma --------------------
+def file_sha256(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def parse_import_file(path):
+    """
+    Süreç havuzunda çalışır: dosyanın türünü başlıklardan (kitap ya da üye)
+    bulur ve tüm satırlarını ayrıştırır. Veritabanına dokunmaz.
+    (tür, [(satır no, parametreler)], ImportReport) döndürür; tür tanınmazsa None.
+    """
+    t0 = time.perf_counter()
+    report = ImportReport()
+    parsed = []
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, ())
+        # Üye başlıkları daha katıdır; önce onlara bakılır
+        kind, convert = "members", member_row_mapper(header)
+        if convert is None:
+            kind, convert = "books", book_row_mapper(header)
+        if convert is None:
+            return None, parsed, report
+        read_sheet_rows(rows, convert, report, parsed.extend)
+    finally:
+        wb.close()
+    report.elapsed = time.perf_counter() - t0
+    return kind, parsed, report
+
+class FolderImportReport:
+    """Toplu içe aktarma sonucu: dosya başına rapor, atlanan ve başarısız dosyalar."""
+    def __init__(self):
+        self.files = []
+        self.skipped = []
+        self.failed = []
+        self.workers = 0
+        self.elapsed = 0.0
+
+    def summary(self):
+        kinds = {"books": "kitap", "members": "üye"}
+        lines = [f"{len(self.files)} dosya içe aktarıldı, {len(self.skipped)} dosya daha önce "
+                 f"aktarıldığı için atlandı, {len(self.failed)} dosya aktarılamadı "
+                 f"({self.elapsed:.1f} sn, {self.workers} işlem)."]
+        for name, kind, report in self.files:
+            lines.append(f"\n{name} ({kinds[kind]}):\n{report.summary()}")
+        for name, error in self.failed:
+            lines.append(f"\n{name}: {error}")
+        return "\n".join(lines)
+
+def import_folder(conn, folder, task=None, update=True):
+    """
+    Klasördeki .xlsx dosyalarını ProcessPoolExecutor ile paralel ayrıştırır,
+    sonuçları bu bağlantı üzerinden (tek yazıcı) dosya başına bir işlemle
+    yazar. Dosyalar içerik özetiyle import_files tablosuna kaydedilir; aynı
+    içerik tekrar aktarılmaz. Üye listeleri update ile eşitlenir.
+    """
+    t0 = time.perf_counter()
+    result = FolderImportReport()
+    names = sorted(e.name for e in os.scandir(folder)
+                   if e.is_file() and e.name.lower().endswith(".xlsx") and not e.name.startswith("~$"))
+    known = {h for (h,) in conn.execute("SELECT hash FROM import_files")}
+    todo = []
+    for name in names:
+        digest = file_sha256(os.path.join(folder, name))
+        if digest in known:
+            result.skipped.append(name)
+        else:
+            known.add(digest)
+            todo.append((name, digest))
+    if not todo:
+        return result
+
+    result.workers = min(len(todo), os.cpu_count() or 1)
+    c = conn.cursor()
+    if result.workers > 1:
+        # fork, Qt ve SQLite iş parçacıkları varken güvenli değil; EXE'de de spawn gerekir
+        ctx = multiprocessing.get_context("spawn")
+        pool = concurrent.futures.ProcessPoolExecutor(result.workers, mp_context=ctx)
+    else:
+        # Tek çekirdekte süreç başlatmak yalnızca maliyettir
+        pool = concurrent.futures.ThreadPoolExecutor(1)
+    with pool:
+        futures = {pool.submit(parse_import_file, os.path.join(folder, name)): (name, digest)
+                   for name, digest in todo}
+        try:
+            for done, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+                name, digest = futures[future]
+                try:
+                    kind, rows, report = future.result()
+                except Exception as e:
+                    result.failed.append((name, str(e)))
+                    continue
+                if kind is None:
+                    result.failed.append((name, "Başlıklar kitap ya da üye listesi olarak tanınmadı."))
+                    continue
+                t_write = time.perf_counter()
+                if kind == "books":
+                    c.execute("BEGIN")
+                    write_book_rows(c, rows, report, task)
+                else:
+                    write_member_rows(c, rows, update, report)
+                c.execute("""INSERT INTO import_files(hash, name, kind, rows, imported_at)
+                             VALUES(?,?,?,?,?)""",
+                          (digest, name, kind, report.inserted,
+                           datetime.datetime.now().isoformat(timespec="seconds")))
+                conn.commit()
+                report.elapsed += time.perf_counter() - t_write
+                result.files.append((name, kind, report))
+                if task is not None:
+                    if task.cancelled:
+                        raise QueryCancelled()
+                    task.report(done)
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    result.elapsed = time.perf_counter() - t0
+    perf_log("toplu içe aktarma: %d dosya, %d atlandı, %d hatalı, %d işlem, %.2f sn",
+             len(result.files), len(result.skipped), len(result.failed),
+             result.workers, result.elapsed)
+    return result
+
+# -------------------- Dışa Aktarma --------------------
+EXPORT_CHUNK = 1000
+EXPORT_FILTERS = "Excel (*.xlsx);;CSV (*.csv);;TSV (*.tsv)"
+
+BOOK_EXPORT_HEADERS = ["Barkod","Kitap Adı","Yazar","Yayınevi","Basım Yılı","Sayfa Sayısı","Tür","Demirbaş","Raf","Dolap","Adet","Açıklama"]
+BOOK_EXPORT_SQL = "SELECT barcode,title,author,publisher,year,pages,category,demirbas,raf,dolap,adet,note FROM books"
+MEMBER_EXPORT_HEADERS = ["AD","SOYAD","SINIF","ŞUBE","NUMARA","CİNSİYET","TELEFON","KAYIT TARİHİ"]
+MEMBER_EXPORT_SQL = "SELECT name,surname,class,branch,no,gender,phone,register_date FROM members"
+
+def export_target(path, selected_filter):
+    """Uzantısız dosya adına seçilen filtrenin uzantısını ekler."""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".csv", ".tsv"):
+        return path
+    ext = re.search(r"\*(\.\w+)", selected_filter or "")
+    return path + (ext.group(1) if ext else ".xlsx")
+
+def export_query(conn, sql, headers, path, task=None):
+    """
+    Sorgu sonucunu imleçten EXPORT_CHUNK satırlık parçalarla dosyaya yazar;
+    bellek kullanımı satır sayısından bağımsızdır. Biçim uzantıdan seçilir:
+    .xlsx openpyxl write_only, .csv ';' ayırıcılı (Türkçe Excel bunu bekler),
+    .tsv sekmeyle ayrılmış. Dosya önce geçici adla yazılır; iptal veya hatada
+    yarım dosya kalmaz. Yazılan satır sayısını döndürür.
+    """
+    t0 = time.perf_counter()
+    ext = os.path.splitext(path)[1].lower()
+    tmp_path = path + ".tmp"
+    c = conn.cursor()
+    c.execute(sql)
+    count = 0
+    try:
+        if ext == ".xlsx":
+            wb = openpyxl.Workbook(write_only=True)
+            ws = wb.create_sheet()
+            ws.append(headers)
+            write = ws.append
+        else:
+            f = open(tmp_path, "w", newline="", encoding="utf-8-sig")
+            writer = csv.writer(f, delimiter="\t" if ext == ".tsv" else ";")
+            writer.writerow(headers)
+            write = writer.writerow
+        try:
+            while True:
+                chunk = c.fetchmany(EXPORT_CHUNK)
+                if not chunk:
+                    break
+                for row in chunk:
+                    write(row)
+                count += len(chunk)
+                if task is not None:
+                    if task.cancelled:
+                        raise QueryCancelled()
+                    task.report(count)
+        finally:
+            # write_only sayfa da kendi geçici dosyasına yazar; iptalde kapatılmalı
+            (ws if ext == ".xlsx" else f).close()
+        if ext == ".xlsx":
+            wb.save(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        c.close()
+    perf_log("dışa aktarma %s: %d satır, %.2f sn", os.path.basename(path), count,
+             time.perf_counter() - t0)
+    return count
+
+def export_with_progress(parent, sql, headers, default_name):
+    """Dosya seçtirir ve export_query'yi ilerleme penceresiyle arka planda çalıştırır."""
+    path, selected = QFileDialog.getSaveFileName(parent, "Dışa aktar",
+                                                 os.path.join(EXPORT_DIR, default_name), EXPORT_FILTERS)
+    if not path: return
+    path = export_target(path, selected)
+
+    def done(count):
+        QMessageBox.information(parent, "Tamam", f"{count} kayıt dışa aktarıldı:\n{path}")
+
+    # Toplam için ayrı bir COUNT(*) geçişi yapılmaz; ilerleme belirsiz çubukla,
+    # yazılan kayıt sayısı metinle gösterilir
+    run_with_progress(parent, "Dışa aktarılıyor...", (parent, "export"),
+                      lambda conn, task: export_query(conn, sql, headers, path, task), done,
+                      fmt=lambda n: f"{n} kayıt yazıldı...")
+
+# -------------------- Katalog Araması --------------------
+def books_fts_ready(conn) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='books_fts'").fetchone()
+    return row is not None
+
+def fts_match_query(text: str) -> str:
+    """
+    Kullanıcı metnini FTS5 MATCH ifadesine çevirir: her kelime tırnak içinde
+    önek araması olur ("harry"* "pot"*), kelimeler VE ile bağlanır.
+    """
+    return " ".join(f'"{w}"*' for w in search_words(text))
+
+def search_words(text) -> list:
+    """FTS5 tokenlaştırıcısına denk gelecek şekilde normalize edilmiş kelimeler."""
+    return re.findall(r"\w+", normalize(text).replace("ı", "i"))
+
+def book_row_matches(fields, text: str, fts: bool) -> bool:
+    """
+    book_search_sql kuralını bellekte uygular. fields BOOKS_FTS_COLUMNS
+    sırasındadır. FTS ile her arama kelimesi alanlardaki bir kelimenin öneki
+    olmalı; FTS yoksa metin başlık, yazar ya da barkodun içinde geçmeli.
+    """
+    if fts:
+        words = set()
+        for value in fields:
+            words.update(search_words(value))
+        return all(any(w.startswith(q) for w in words) for q in search_words(text))
+    title, author, _publisher, _category, barcode = fields
+    q = normalize(text)
+    return any(q in normalize(v) for v in (title, author, barcode))
+
+def book_search_sql(conn, text: str):
+    """
+    Kitap araması için (FROM, WHERE, parametreler, ORDER BY) parçalarını döndürür.
+    FTS indeksi varsa sıralama ilgililiğe göre, yoksa başlığa göre yapılır.
+    Sorgularda kitap tablosu 'b' takma adıyla kullanılmalıdır.
+    """
+    match = fts_match_query(text)
+    if match and books_fts_ready(conn):
+        weights = ", ".join(str(w) for w in BOOKS_FTS_WEIGHTS)
+        return ("books b JOIN books_fts ON books_fts.rowid = b.id",
+                "books_fts MATCH ?", [match],
+                f"bm25(books_fts, {weights}), b.title")
+    q = normalize(text)
+    return ("books b",
+            "(b.title_norm LIKE ? OR b.author_norm LIKE ? OR b.barcode LIKE ?)",
+            [f"%{q}%", f"%{q}%", f"%{q}%"], "b.title")
+
+def prefix_bounds(q: str):
+    """
+    Önek araması için [alt, üst) aralığı. `col >= ? AND col < ?` biçimi,
+    LIKE 'q%' aksine harmanlamadan bağımsız olarak indeksi kullanır.
+    """
+    return q, q + "\U0010ffff"
+
+def member_search_sql(q: str, alias: str = ""):
+    """Normalize edilmiş üye sütunlarında önek araması için WHERE ve parametreler."""
+    lo, hi = prefix_bounds(normalize(q))
+    cols = [f"{alias}{col}" for col in NORM_COLUMNS["members"]]
+    clause = " OR ".join(f"({col} >= ? AND {col} < ?)" for col in cols)
+    return f"({clause})", [lo, hi] * len(cols)
+
+def member_row_matches(values, text: str) -> bool:
+    """member_search_sql kuralını bellekte uygular (no, ad, soyad önek araması)."""
+    q = normalize(text)
+    return any(normalize(v).startswith(q) for v in values)
+
+# -------------------- Ayarlar --------------------
+SETTINGS_RELOAD_MS = 60_000  # başka terminallerde yapılan ayar değişikliklerini yoklama aralığı
+
+class SettingsRegistry(QtCore.QObject):
+    """
+    settings tablosunun süreç içi önbelleği. Tablo ilk okunuşta bir kez
+    yüklenir; ödünç formu gibi sık çağrılan yerler ayarı bellekten alır.
+    Yazma set_many() ile yapılır: değerler kaydedilir ve değişen anahtarlar
+    changed sinyaliyle bildirilir; ayara bağlı durum tutan yerler bu sinyale
+    abone olur. Başka terminallerin değişiklikleri reload() ile alınır.
+    """
+    changed = QtCore.pyqtSignal(object)  # değişen anahtarların kümesi
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._values = None
+        self._db_path = None
+
+    def _read(self):
+        return dict(db_conn().execute("SELECT key, value FROM settings").fetchall())
+
+    def _replace(self, values):
+        """Önbelleği yeniler; değeri değişen anahtarları döndürür."""
+        with self._lock:
+            old = self._values if self._db_path == DB_PATH else None
+            self._values = values
+            self._db_path = DB_PATH
+        if old is None:
+            return set()
+        return {k for k in old.keys() | values.keys() if old.get(k) != values.get(k)}
+
+    def _loaded(self):
+        values = self._values
+        if values is None or self._db_path != DB_PATH:
+            values = self._read()
+            self._replace(values)
+        return values
+
+    def get(self, key: str, default: str) -> str:
+        return self._loaded().get(key, default)
+
+    def get_int(self, key: str, default: int, minimum=None) -> int:
+        try:
+            value = int(self.get(key, str(default)))
+        except (TypeError, ValueError):
+            return default
+        return value if minimum is None else max(minimum, value)
+
+    def set_many(self, values: dict):
+        """Değerleri tek işlemde yazar, önbelleği yeniler ve değişenleri bildirir."""
+        with db_conn() as conn:
+            conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                             [(k, str(v)) for k, v in values.items()])
+        return self.reload()
+
+    def reload(self):
+        """Tabloyu yeniden okur; değişen anahtar varsa changed yayınlanır."""
+        keys = self._replace(self._read())
+        if keys:
+            self.changed.emit(keys)
+        return keys
+
+    def invalidate(self):
+        """Önbelleği bırakır; bir sonraki okuma tabloyu yeniden yükler."""
+        with self._lock:
+            self._values = None
+
+SETTINGS = SettingsRegistry()
+
+def get_setting(key: str, default: str) -> str:
+    return SETTINGS.get(key, default)
+
+def get_loan_limit() -> int:
+    return SETTINGS.get_int('loan_limit', 3)
 
 def get_default_loan_days() -> int:
+    return SETTINGS.get_int('default_loan_days', 15)
+
+# -------------------- Ödünç Servisi --------------------
+class CirculationError(Exception):
+    """Ödünç/iade kurala takıldı; mesaj kullanıcıya gösterilir."""
+
+class NoCopyAvailable(CirculationError):
+    pass
+
+class LoanLimitReached(CirculationError):
+    pass
+
+class LoanAlreadyReturned(CirculationError):
+    pass
+
+# Kilit hatasında BEGIN IMMEDIATE yeniden deneme sayısı ve ilk bekleme (sn)
+WRITE_RETRIES = 5
+WRITE_BACKOFF = 0.05
+
+def write_transaction(conn, fn, retries=WRITE_RETRIES):
+    """
+    fn(conn)'u BEGIN IMMEDIATE ile açılan yazma işleminde çalışır ve commit
+    eder. Yazma kilidi işlemin başında alındığından okuma ile yazma arasına
+    başka bir masa giremez. Kilit alınamazsa (busy_timeout dolduysa) artan
+    beklemeyle yeniden denenir; fn hata verirse işlem geri alınır.
+    """
+    for attempt in range(retries + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            break
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or attempt == retries:
+                raise
+            time.sleep(WRITE_BACKOFF * (2 ** attempt))
     try:
-        return int(get_setting('default_loan_days', '15'))
-    except (ValueError, IndexError):
-        return 15
+        result = fn(conn)
+        conn.commit()
+        return result
+    except BaseException:
+        conn.rollback()
+        raise
+
+def lend_book(conn, book_id, member_id, loan_date, due_date, loan_limit):
+    """Kitabı üyeye tek yazma işleminde ödünç verir; yeni ödünç id'sini döndürür."""
+    def op(conn):
+        active = conn.execute("SELECT COUNT(*) FROM loans WHERE member_id=? AND return_date IS NULL",
+                              (member_id,)).fetchone()[0]
+        if active >= loan_limit:
+            raise LoanLimitReached(f"Bu üye, en fazla {loan_limit} kitap ödünç alabilir.")
+        # Koşullu tek deyim: son kopya iki kez verilemez
+        if conn.execute("UPDATE books SET adet = adet - 1 WHERE id=? AND adet > 0",
+                        (book_id,)).rowcount == 0:
+            raise NoCopyAvailable("Bu kitabın mevcut kopyası yok.")
+        cur = conn.execute("""INSERT INTO loans(book_id, member_id, loan_date, due_date, return_date)
+                              VALUES(?,?,?,?,NULL)""", (book_id, member_id, loan_date, due_date))
+        return cur.lastrowid
+    return write_transaction(conn, op)
+
+def return_loan(conn, loan_id, return_date):
+    """Ödüncü teslim alır ve kitabın adedini artırır; kitap id'sini döndürür."""
+    def op(conn):
+        # Koşullu tek deyim: aynı ödünç iki kez teslim alınamaz
+        if conn.execute("UPDATE loans SET return_date=? WHERE id=? AND return_date IS NULL",
+                        (return_date, loan_id)).rowcount == 0:
+            raise LoanAlreadyReturned("Bu ödünç kaydı zaten teslim alınmış.")
+        book_id = conn.execute("SELECT book_id FROM loans WHERE id=?", (loan_id,)).fetchone()[0]
+        conn.execute("UPDATE books SET adet = adet + 1 WHERE id=?", (book_id,))
+        return book_id
+    return write_transaction(conn, op)
+
+def get_suggest_debounce_ms() -> int:
+    return SETTINGS.get_int('suggest_debounce_ms', 150, minimum=0)
+
+# -------------------- Arka Plan Sorguları --------------------
+class QueryCancelled(Exception):
+    pass
+
+class QueryTask(QtCore.QRunnable):
+    """
+    QueryExecutor'ın çalıştırdığı tek iş. fn(conn) çağrılır; on_progress
+    verilmişse fn(conn, task) çağrılır ve iş task.report(...) ile ilerleme
+    bildirip task.cancelled ile iptali kontrol edebilir.
+    """
+    def __init__(self, executor, key, fn, on_done, on_error, on_progress):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.executor = executor
+        self.key = key
+        self.fn = fn
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.cancelled = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._conn is not None:
+                # Çalışan sorguyu durdur; iş OperationalError ile sonlanır
+                self._conn.interrupt()
+
+    def report(self, value):
+        if not self.cancelled:
+            self.executor._progress.emit(self, value)
+
+    def run(self):
+        result, error = None, None
+        with self._lock:
+            if self.cancelled:
+                self.executor._finished.emit(self, None, QueryCancelled())
+                return
+            conn = self._conn = DB_MANAGER.get()
+        try:
+            result = self.fn(conn, self) if self.on_progress else self.fn(conn)
+        except Exception as e:
+            error = QueryCancelled() if self.cancelled else e
+        finally:
+            with self._lock:
+                self._conn = None
+            if conn.in_transaction:
+                conn.rollback()
+        self.executor._finished.emit(self, result, error)
+
+class QueryExecutor(QtCore.QObject):
+    """
+    Veritabanı sorgularını QThreadPool üzerinde, GUI iş parçacığını
+    bloklamadan çalıştırır. Her iş parçacığı DB_MANAGER'dan kendi bağlantısını
+    alır. Aynı anahtarla yeni bir iş gönderilince önceki iptal edilir
+    (çalışıyorsa SQLite interrupt ile) ve sonucu teslim edilmez. Sonuçlar
+    sinyal üzerinden ana iş parçacığında geri çağrılara iletilir.
+    """
+    _finished = QtCore.pyqtSignal(object, object, object)
+    _progress = QtCore.pyqtSignal(object, object)
+
+    def __init__(self, max_threads=4, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        # İş parçacıkları (ve bağlantıları) kapanışa kadar yaşar
+        self.pool.setExpiryTimeout(-1)
+        self._latest = {}
+        self._tasks = set()
+        self._finished.connect(self._deliver)
+        self._progress.connect(self._deliver_progress)
+
+    def submit(self, key, fn, on_done=None, on_error=None, on_progress=None):
+        self.cancel(key)
+        task = QueryTask(self, key, fn, on_done, on_error, on_progress)
+        self._latest[key] = task
+        self._tasks.add(task)
+        self.pool.start(task)
+        return task
+
+    def cancel(self, key):
+        task = self._latest.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    @QtCore.pyqtSlot(object, object, object)
+    def _deliver(self, task, result, error):
+        self._tasks.discard(task)
+        if self._latest.get(task.key) is task:
+            del self._latest[task.key]
+        if task.cancelled or isinstance(error, QueryCancelled):
+            return
+        if error is None:
+            if task.on_done:
+                task.on_done(result)
+        elif task.on_error:
+            task.on_error(error)
+        else:
+            print(f"Arka plan sorgu hatası ({task.key}):", error)
+
+    @QtCore.pyqtSlot(object, object)
+    def _deliver_progress(self, task, value):
+        if not task.cancelled and task.on_progress:
+            task.on_progress(value)
+
+    def wait(self, timeout_ms=-1):
+        """Bekleyen tüm işler bitene kadar bekler ve sonuçlarını teslim eder."""
+        done = self.pool.waitForDone(timeout_ms)
+        QtCore.QCoreApplication.sendPostedEvents()
+        return done
+
+    def shutdown(self, timeout_ms=5000):
+        for key in list(self._latest):
+            self.cancel(key)
+        self.pool.clear()
+        self.pool.waitForDone(timeout_ms)
+
+_QUERY_EXECUTOR = None
+
+def query_executor() -> QueryExecutor:
+    global _QUERY_EXECUTOR
+    if _QUERY_EXECUTOR is None:
+        _QUERY_EXECUTOR = QueryExecutor()
+    return _QUERY_EXECUTOR
+
+def run_with_progress(parent, label, key, fn, on_done, total=0, fmt=None):
+    """
+    fn(conn, task) işini arka planda çalıştırır ve bir ilerleme penceresi
+    gösterir. İş task.report(n) ile ilerler; İptal düğmesi işi durdurur.
+    total bilinmiyorsa (0) pencere belirsiz ilerleme gösterir. Hata
+    durumunda pencere kapanır ve mesaj gösterilir.
+    """
+    dlg = QtWidgets.QProgressDialog(label, "İptal", 0, total, parent)
+    dlg.setWindowTitle("Lütfen bekleyin")
+    dlg.setWindowModality(Qt.WindowModal)
+    dlg.setMinimumDuration(300)
+    dlg.setAutoClose(False)
+    dlg.setAutoReset(False)
+    executor = query_executor()
+
+    def progress(n):
+        if total:
+            dlg.setValue(min(n, total))
+        if fmt:
+            dlg.setLabelText(fmt(n))
+
+    def done(result):
+        dlg.close()
+        on_done(result)
+
+    def failed(error):
+        dlg.close()
+        QMessageBox.critical(parent, "Hata", str(error))
+
+    dlg.canceled.connect(lambda: executor.cancel(key))
+    return executor.submit(key, fn, done, failed, progress)
+
+# -------------------- Canlı Öneriler --------------------
+MEMBER_SUGGEST_LIMIT = 50
+BOOK_SUGGEST_LIMIT = 80
+
+class SuggestionPipeline(QtCore.QObject):
+    """
+    Yazarken açılan öneri listeleri için ortak hat. Tuş vuruşları debounce
+    süresi boyunca biriktirilir ve yalnız son metin sorgulanır; yeni tuşta
+    bekleyen sorgu iptal edilir. Metin önceki sorgunun uzantısıysa ve önceki
+    sonuç sınıra takılmadıysa yeniden sorgulamak yerine o sonuç bellekte
+    süzülür. Son tuştan listenin dolmasına kadar geçen süre perf.log'a yazılır.
+
+    local(text): bellek içi indeksten satırlar ya da None (indeks hazır değil);
+    satır dönerse debounce beklenmeden hemen gösterilir.
+    fetch(conn, text): arka planda en fazla `limit` satır döndürür.
+    narrow(rows, prev_text, text): süzülmüş satırlar ya da None (süzülemez).
+    show(rows): listeyi ana iş parçacığında doldurur.
+    """
+    def __init__(self, name, fetch, narrow, show, limit, debounce_ms=None, local=None, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.fetch = fetch
+        self.local = local
+        self.narrow = narrow
+        self.show = show
+        self.limit = limit
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._run)
+        self.set_debounce(get_suggest_debounce_ms() if debounce_ms is None else debounce_ms)
+        if debounce_ms is None:
+            SETTINGS.changed.connect(self.on_settings_changed)
+        self._text = ""
+        self._typed_at = None
+        self.invalidate()
+
+    def set_debounce(self, ms):
+        self.timer.setInterval(max(0, int(ms)))
+
+    def on_settings_changed(self, keys):
+        if 'suggest_debounce_ms' in keys:
+            self.set_debounce(get_suggest_debounce_ms())
+
+    def invalidate(self):
+        """Bellekteki son sonucu unutur; veri değişince çağrılır."""
+        self._cached_text = None
+        self._cached_rows = None
+
+    def request(self, text):
+        self._text = text
+        self._typed_at = time.perf_counter()
+        query_executor().cancel((self, "fetch"))
+        rows = self.local(text) if self.local else None
+        if rows is not None:
+            self.timer.stop()
+            self._deliver(text, rows, "indeks")
+            return
+        self.timer.start()
+
+    def cancel(self):
+        self.timer.stop()
+        query_executor().cancel((self, "fetch"))
+        self._typed_at = None
+        self.invalidate()
+
+    def _run(self):
+        text, prev = self._text, self._cached_text
+        if prev is not None and normalize(text).startswith(normalize(prev)):
+            rows = self.narrow(self._cached_rows, prev, text)
+            if rows is not None:
+                self._deliver(text, rows, "bellek")
+                return
+        query_executor().submit((self, "fetch"), lambda conn: self.fetch(conn, text),
+                                lambda rows: self._fetched(text, rows))
+
+    def _fetched(self, text, rows):
+        # Sınıra takılan sonuç eksik olabilir; uzatılan metin için süzülemez
+        if len(rows) < self.limit:
+            self._cached_text, self._cached_rows = text, rows
+        else:
+            self.invalidate()
+        self._deliver(text, rows, "sorgu")
+
+    def _deliver(self, text, rows, source):
+        if self._typed_at is not None:
+            perf_log("öneri[%s] %r: %d satır, %.1f ms (%s, bekleme %d ms)",
+                     self.name, text, len(rows), (time.perf_counter() - self._typed_at) * 1000,
+                     source, self.timer.interval())
+            self._typed_at = None
+        self.show(rows)
+
+# -------------------- Katalog Bellek İndeksi --------------------
+class PrefixIndex:
+    """
+    Sıralı (anahtar, id) dizisi üzerinde bisect ile önek araması. Tek kayıt
+    ekleme/silme liste kaydırması gerektirir; birkaç bin kayıtta önemsizdir.
+    """
+    def __init__(self, pairs=()):
+        self.items = sorted(set(p for p in pairs if p[0]))
+
+    def add(self, key, rid):
+        if key:
+            bisect.insort(self.items, (key, rid))
+
+    def remove(self, key, rid):
+        i = bisect.bisect_left(self.items, (key, rid))
+        if i < len(self.items) and self.items[i] == (key, rid):
+            del self.items[i]
+
+    def span(self, prefix):
+        """Öneki taşıyan anahtarların [lo, hi) aralığı."""
+        lo, hi = prefix_bounds(prefix)
+        return bisect.bisect_left(self.items, (lo,)), bisect.bisect_left(self.items, (hi,))
+
+    def count(self, prefix):
+        lo, hi = self.span(prefix)
+        return hi - lo
+
+    def ids(self, prefix):
+        lo, hi = self.span(prefix)
+        return {rid for _key, rid in self.items[lo:hi]}
+
+class CatalogIndex:
+    """
+    Ödünç masasındaki seçiciler için üye ve kitapların bellek içi önek
+    indeksi. Üyeler normalize edilmiş no/ad/soyad önekiyle, kitaplar FTS ile
+    aynı kelimelerin (başlık, yazar, yayınevi, tür, barkod) önekiyle bulunur.
+    İlk yükleme arka planda yapılır; sonrasında ekleme/güncelleme/silme
+    noktaları update_books/update_members ile indeksi güncel tutar, toplu
+    işlemler reload() çağırır.
+    """
+    MEMBER_SQL = "SELECT id,no,name,surname,class,branch FROM members"
+    BOOK_SQL = "SELECT id,title,author,adet,publisher,category,barcode FROM books"
+
+    def __init__(self):
+        self.ready = False
+        self._loading = False
+        self._stale = False
+        self.members = {}
+        self.member_keys = PrefixIndex()
+        self.books = {}
+        self.book_words = {}
+        self.book_keys = PrefixIndex()
+        self.title_keys = PrefixIndex()
+
+    # --- anahtarlar ---
+    @staticmethod
+    def _member_keys(row):
+        return {normalize(v) for v in row[1:4]}
+
+    @staticmethod
+    def _book_words(row):
+        """(tüm kelimeler, başlık kelimeleri, sıralama için başlık)"""
+        title_words = frozenset(search_words(row[1]))
+        words = set(title_words)
+        for value in (row[2], row[4], row[5], row[6]):
+            words.update(search_words(value))
+        return frozenset(words), title_words, normalize(row[1])
+
+    # --- yükleme ---
+    @classmethod
+    def _build(cls, conn):
+        t0 = time.perf_counter()
+        members = {r[0]: r for r in conn.execute(cls.MEMBER_SQL)}
+        books = {r[0]: r for r in conn.execute(cls.BOOK_SQL)}
+        book_words = {bid: cls._book_words(r) for bid, r in books.items()}
+        member_keys = PrefixIndex((k, mid) for mid, r in members.items() for k in cls._member_keys(r))
+        book_keys = PrefixIndex((w, bid) for bid, ws in book_words.items() for w in ws[0])
+        title_keys = PrefixIndex((w, bid) for bid, ws in book_words.items() for w in ws[1])
+        return (members, member_keys, books, book_words, book_keys, title_keys,
+                time.perf_counter() - t0)
+
+    def load(self):
+        """İndeksi arka planda (yeniden) kurar; hazır olana kadar öneriler SQLite'tan gelir."""
+        if self._loading:
+            self._stale = True
+            return
+        self._loading = True
+        self._stale = False
+        query_executor().submit((self, "load"), self._build, self._loaded, self._load_failed)
+
+    def _loaded(self, result):
+        (self.members, self.member_keys, self.books, self.book_words,
+         self.book_keys, self.title_keys, elapsed) = result
+        self._loading = False
+        self.ready = True
+        perf_log("katalog indeksi: %d üye, %d kitap, %.1f ms",
+                 len(self.members), len(self.books), elapsed * 1000)
+        if self._stale:
+            self.load()
+
+    def _load_failed(self, error):
+        self._loading = False
+        print("Katalog indeksi yüklenemedi:", error)
+
+    def reload(self):
+        if self.ready or self._loading:
+            self.load()
+
+    # --- artımlı güncelleme ---
+    def update_books(self, ids):
+        """Verilen kitap id'lerini veritabanından yeniden okur (silinenler düşer)."""
+        if self._loading:
+            self._stale = True
+        if not self.ready or not ids:
+            return
+        ids = [int(i) for i in ids]
+        for bid in ids:
+            all_words, title_words, _title = self.book_words.pop(bid, ((), (), None))
+            for w in all_words:
+                self.book_keys.remove(w, bid)
+            for w in title_words:
+                self.title_keys.remove(w, bid)
+            self.books.pop(bid, None)
+        marks = ",".join("?" for _ in ids)
+        for row in db_conn().execute(f"{self.BOOK_SQL} WHERE id IN ({marks})", ids):
+            words = self._book_words(row)
+            self.books[row[0]] = row
+            self.book_words[row[0]] = words
+            for w in words[0]:
+                self.book_keys.add(w, row[0])
+            for w in words[1]:
+                self.title_keys.add(w, row[0])
+
+    def update_members(self, nos):
+        """Verilen üye numaralarını veritabanından yeniden okur (silinenler düşer)."""
+        if self._loading:
+            self._stale = True
+        if not self.ready or not nos:
+            return
+        nos = [str(n) for n in nos]
+        wanted = set(nos)
+        for mid in [mid for mid, r in self.members.items() if str(r[1]) in wanted]:
+            for k in self._member_keys(self.members.pop(mid)):
+                self.member_keys.remove(k, mid)
+        marks = ",".join("?" for _ in nos)
+        for row in db_conn().execute(f"{self.MEMBER_SQL} WHERE no IN ({marks})", nos):
+            self.members[row[0]] = row
+            for k in self._member_keys(row):
+                self.member_keys.add(k, row[0])
+
+    # --- arama ---
+    def suggest_members(self, text, limit=MEMBER_SUGGEST_LIMIT):
+        """member_search_sql ile aynı sonuç; hazır değilse None."""
+        if not self.ready:
+            return None
+        ids = self.member_keys.ids(normalize(text))
+        return heapq.nsmallest(limit, (self.members[i] for i in ids),
+                               key=lambda r: (str(r[1]), r[0]))
+
+    def suggest_books(self, text, limit=BOOK_SUGGEST_LIMIT):
+        """
+        FTS önek kuralıyla kitap önerileri; başlıkta eşleşenler önce gelir.
+        Hazır değilse ya da metinde kelime yoksa None (SQLite'a düşülür).
+        """
+        words = search_words(text)
+        if not self.ready or not words:
+            return None
+        # En dar aralıklı kelimeyle aday topla, kalanları kelime kümesinde doğrula
+        words = sorted(set(words), key=self.book_keys.count)
+        ids = self.book_keys.ids(words[0])
+        rest = words[1:]
+        # Başlıkta eşleşmeyen kelime sayısı, bm25'teki başlık ağırlığının yerini tutar
+        in_title = [self.title_keys.ids(q) for q in words]
+        hits = []
+        for bid in ids:
+            all_words, _title_words, title = self.book_words[bid]
+            if rest and not all(any(x.startswith(q) for x in all_words) for q in rest):
+                continue
+            misses = 0
+            for title_ids in in_title:
+                if bid not in title_ids:
+                    misses += 1
+            hits.append((misses, title, bid))
+        return [self.books[bid] for _m, _t, bid in heapq.nsmallest(limit, hits)]
+
+_CATALOG_INDEX = None
+
+def catalog_index() -> CatalogIndex:
+    global _CATALOG_INDEX
+    if _CATALOG_INDEX is None:
+        _CATALOG_INDEX = CatalogIndex()
+    return _CATALOG_INDEX
+
+# -------------------- Tablo Modeli --------------------
+# Sütun genişliği hesaplanırken bakılacak en fazla satır sayısı
+TABLE_SIZE_SAMPLE = 200
+
+class RowTableModel(QtCore.QAbstractTableModel):
+    """
+    Satırları sorgudan gelen demetler (tuple) olarak tutan salt okunur model.
+    Hücre başına nesne oluşturulmaz; görünüme satırlar FETCH_BATCH'lik
+    parçalar halinde canFetchMore/fetchMore ile açılır.
+
+    set_rows() hazır bir listeyi alır (sayfalı tablolar, sınırlı aramalar).
+    set_query() ise sorguyu modelin kendi okuma bağlantısında açık bir imleçle
+    tutar; ilk parça ve kaydırdıkça istenen sonrakiler query_executor'da
+    okunur, bellekte yalnız görülen satırlar bulunur. Açık imleç WAL'da bir
+    anlık görüntüyü tutup denetim noktasını bekletir: imleç bitince, model
+    sıfırlanınca, release_cursor() çağrılınca ya da CURSOR_IDLE_MS boyunca
+    kullanılmayınca kapanır; kalan satırlar gerekirse OFFSET'li yeni bir
+    imleçle okunur. WAL dışındaki kiplerde açık imleç yazıcıları
+    bekleteceğinden sonuç tek seferde alınır.
+    """
+    FETCH_BATCH = 256
+    CURSOR_IDLE_MS = 30_000
+
+    def __init__(self, headers, parent=None, none_text="", bold_none=False,
+                 center_numbers=False, row_foreground=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.none_text = none_text
+        self.bold_none = bold_none
+        self.center_numbers = center_numbers
+        # row_foreground(row) -> QColor veya None: satırın yazı rengi
+        self.row_foreground = row_foreground
+        self._rows = []
+        self._loaded = 0
+        self._reader = None
+        self._reader_lock = threading.Lock()  # okuma bağlantısı iş parçacıkları arasında sırayla kullanılır
+        self._cursor = None
+        self._query = None
+        self._more = False
+        self._loading = False
+        self._on_first = None
+        self._pending_sort = None
+        self._idle = QtCore.QTimer(self)
+        self._idle.setSingleShot(True)
+        self._idle.setInterval(self.CURSOR_IDLE_MS)
+        self._idle.timeout.connect(self.release_cursor)
+
+    def set_rows(self, rows):
+        self._drop_query()
+        self.beginResetModel()
+        self._rows = rows if isinstance(rows, list) else list(rows)
+        self._loaded = min(len(self._rows), self.FETCH_BATCH)
+        self.endResetModel()
+
+    def set_query(self, sql, params=(), on_first=None):
+        """Sorguyu bağlar; ilk parça arka planda okunur, gelince on_first() çağrılır."""
+        self.set_rows([])
+        self._query = (sql, tuple(params))
+        self._more = True
+        self._on_first = on_first
+        self._fetch()
+
+    def _fetch(self, everything=False):
+        sql, params = self._query
+        cursor, offset = self._cursor, len(self._rows)
+        self._cursor = None  # iş bitene kadar imleç yalnız iş parçacığında kullanılır
+        self._idle.stop()
+        self._loading = True
+
+        def job(conn):
+            with self._reader_lock:
+                cur = cursor
+                if cur is None:
+                    if offset:
+                        # İmleç boşta kapatılmıştı; kalan satırlardan devam
+                        cur = self._execute(f"SELECT * FROM ({sql}) LIMIT -1 OFFSET ?", params + (offset,))
+                    else:
+                        cur = self._execute(sql, params)
+                if everything or not DB_MANAGER.wal_enabled():
+                    rows = cur.fetchall()
+                    cur.close()
+                    return None, rows
+                return cur, cur.fetchmany(self.FETCH_BATCH)
+        query_executor().submit((self, "rows"), job, self._fetched, self._fetch_failed)
+
+    def _execute(self, sql, params):
+        try:
+            return self._reader.execute(sql, params)
+        except (AttributeError, sqlite3.ProgrammingError):
+            # İlk sorgu ya da bağlantı close_all ile kapatılmış
+            self._reader = DB_MANAGER.open_reader()
+            return self._reader.execute(sql, params)
+
+    def _fetched(self, result):
+        cursor, rows = result
+        self._loading = False
+        if cursor is not None and len(rows) == self.FETCH_BATCH:
+            self._cursor = cursor
+            self._idle.start()
+        else:
+            if cursor is not None:
+                self._close(cursor)
+            self._more = False
+        if rows:
+            self.beginInsertRows(QtCore.QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+            self._rows.extend(rows)
+            self._loaded = len(self._rows)
+            self.endInsertRows()
+        if self._on_first is not None:
+            on_first, self._on_first = self._on_first, None
+            on_first()
+        if self._pending_sort is not None:
+            self.sort(*self._pending_sort)
+
+    def _fetch_failed(self, error):
+        self._loading = False
+        self._more = False
+        self._pending_sort = None
+        print("Tablo sorgusu okunamadı:", error)
+
+    def _close(self, cursor):
+        with self._reader_lock:
+            try:
+                cursor.close()
+            except sqlite3.Error:
+                pass  # bağlantı kapanışta close_all ile kapatılmış olabilir
+
+    def release_cursor(self):
+        """Açık imleci kapatır (okuma işlemi biter); kalan satırlar gerekirse yeniden okunur."""
+        self._idle.stop()
+        if self._cursor is not None:
+            cursor, self._cursor = self._cursor, None
+            self._close(cursor)
+
+    def _drop_query(self):
+        if self._loading:
+            query_executor().cancel((self, "rows"))
+        self.release_cursor()
+        self._query = None
+        self._more = self._loading = False
+        self._on_first = self._pending_sort = None
+
+    def close_reader(self):
+        self._drop_query()
+        with self._reader_lock:
+            if self._reader is not None:
+                DB_MANAGER.release(self._reader)
+                self._reader = None
+
+    def row_at(self, r):
+        return self._rows[r]
+
+    def total_rows(self):
+        return len(self._rows)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and (self._loaded < len(self._rows) or (self._more and not self._loading))
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return
+        if self._loaded == len(self._rows):
+            if self._more and not self._loading:
+                self._fetch()
+            return
+        n = min(self.FETCH_BATCH, len(self._rows) - self._loaded)
+        if n <= 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self._loaded, self._loaded + n - 1)
+        self._loaded += n
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        val = row[index.column()]
+        if role == Qt.DisplayRole:
+            return self.none_text if val is None else str(val)
+        if role == Qt.TextAlignmentRole:
+            if self.center_numbers and isinstance(val, int):
+                return Qt.AlignCenter
+            return None
+        if role == Qt.ForegroundRole and self.row_foreground:
+            return self.row_foreground(row)
+        if role == Qt.FontRole and self.bold_none and val is None:
+            font = QtGui.QFont()
+            font.setBold(True)
+            return font
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self.headers):
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        def key(row):
+            val = row[column]
+            if val is None:
+                return (2, "")
+            if isinstance(val, (int, float)):
+                return (0, val)
+            return (1, normalize(val))
+        if self._more:
+            # Sıralama bütün sonucu ister; kalan satırlar okununca sıralanır
+            self._pending_sort = (column, order)
+            if not self._loading:
+                self._fetch(everything=True)
+            return
+        self._pending_sort = None
+        self.layoutAboutToBeChanged.emit()
+        self._rows.sort(key=key, reverse=(order == Qt.DescendingOrder))
+        self.layoutChanged.emit()
+
+def make_table_view(model, stretch=True, multi_select=False):
+    """RowTableModel için salt okunur, satır seçimli QTableView oluşturur."""
+    view = QTableView()
+    view.setModel(model)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    if multi_select:
+        view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+    header = view.horizontalHeader()
+    header.setResizeContentsPrecision(TABLE_SIZE_SAMPLE)
+    if stretch:
+        header.setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+    return view
+
+# -------------------- Sayfalama --------------------
+# Bir sayfada gösterilecek satır sayısı
+PAGE_SIZE = 500
+# Sıralı (ilgililik) kitap aramasında gösterilecek en fazla sonuç
+BOOK_SEARCH_LIMIT = 500
+JUMP_LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+class KeysetPager:
+    """
+    Anahtar kümesi (keyset) sayfalama. Her sayfa, önceki sayfanın ilk/son
+    satırının sıralama anahtarından devam eder (OFFSET kullanılmaz):
+    WHERE (k1, k2) > (?, ?) ORDER BY k1, k2 LIMIT n.
+
+    select_sql sütunlarının ardına anahtar sütunları eklenir; dönen
+    satırlardan çıkarılır. fetch() durumu değiştirmez, accept() günceller;
+    böylece sorgu başka bir iş parçacığında çalıştırılabilir.
+    """
+    def __init__(self, select_sql, from_sql, keys, page_size=PAGE_SIZE, descending=False):
+        self.select_sql = select_sql
+        self.from_sql = from_sql
+        self.keys = tuple(keys)
+        self.page_size = page_size
+        self.descending = descending
+        self.where = ""
+        self.params = []
+        self.first_key = None
+        self.last_key = None
+        self.has_next = False
+        self.has_prev = False
+        self.page_no = 0
+
+    def set_filter(self, where="", params=()):
+        self.where = where
+        self.params = list(params)
+        self.first_key = self.last_key = None
+
+    def _row_value(self):
+        return "(" + ", ".join(self.keys) + ")"
+
+    def build(self, direction, value=None):
+        """direction: first, next, prev, reload veya jump (value: ilk anahtarın başlangıcı)."""
+        clauses = [self.where] if self.where else []
+        params = list(self.params)
+        marks = "(" + ", ".join("?" for _ in self.keys) + ")"
+        forward = "<" if self.descending else ">"
+        backward = ">" if self.descending else "<"
+        backwards = direction == "prev" and self.first_key is not None
+        if direction == "next" and self.last_key is not None:
+            clauses.append(f"{self._row_value()} {forward} {marks}")
+            params.extend(self.last_key)
+        elif backwards:
+            clauses.append(f"{self._row_value()} {backward} {marks}")
+            params.extend(self.first_key)
+        elif direction == "reload" and self.first_key is not None:
+            clauses.append(f"{self._row_value()} {forward}= {marks}")
+            params.extend(self.first_key)
+        elif direction == "jump" and value is not None:
+            clauses.append(f"{self.keys[0]} {forward}= ?")
+            params.append(value)
+        desc = (not self.descending) if backwards else self.descending
+        order = ", ".join(f"{k} {'DESC' if desc else 'ASC'}" for k in self.keys)
+        sql = f"SELECT {self.select_sql}, {', '.join(self.keys)} FROM {self.from_sql}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(f"({c})" for c in clauses)
+        sql += f" ORDER BY {order} LIMIT {int(self.page_size) + 1}"
+        return sql, params
+
+    def fetch(self, conn, direction, value=None):
+        sql, params = self.build(direction, value)
+        return conn.execute(sql, params).fetchall()
+
+    def accept(self, direction, raw_rows):
+        """Sorgu sonucunu işler, sayfa durumunu günceller ve gösterilecek satırları döndürür."""
+        nkeys = len(self.keys)
+        more = len(raw_rows) > self.page_size
+        raw_rows = raw_rows[:self.page_size]
+        backwards = direction == "prev" and self.first_key is not None
+        if backwards:
+            raw_rows.reverse()
+        if direction in ("prev", "next") and not raw_rows:
+            # Bu yönde satır kalmadı: çağıran bulunulan sayfayı yeniden yüklemeli
+            if direction == "prev":
+                self.has_prev = False
+            else:
+                self.has_next = False
+            return None
+        if backwards:
+            self.has_prev = more
+            self.has_next = True
+            self.page_no = max(1, self.page_no - 1)
+        elif direction in ("next", "reload"):
+            self.has_next = more
+            if direction == "next":
+                self.has_prev = self.last_key is not None
+                self.page_no += 1
+        else:
+            self.has_next = more
+            self.has_prev = direction == "jump"
+            self.page_no = 1
+        if raw_rows:
+            self.first_key = tuple(raw_rows[0][-nkeys:])
+            self.last_key = tuple(raw_rows[-1][-nkeys:])
+        elif direction != "reload":
+            self.first_key = self.last_key = None
+        return [tuple(r[:-nkeys]) for r in raw_rows]
+
+    def load(self, conn, direction="first", value=None):
+        rows = self.accept(direction, self.fetch(conn, direction, value))
+        if rows is None:
+            fallback = "reload" if self.first_key is not None else "first"
+            rows = self.accept(fallback, self.fetch(conn, fallback))
+        return rows
+
+class PagerBar(QWidget):
+    """Önceki/sonraki düğmeleri ve isteğe bağlı 'atla' listesi olan sayfa çubuğu."""
+    navigate = QtCore.pyqtSignal(str, object)
+
+    def __init__(self, jump_label="Harfe git:", jump_items=None, parent=None):
+        super().__init__(parent)
+        lay = QHBoxLayout(self)
+        lay.setContentsMargins(0, 0, 0, 0)
+        self.btnPrev = QPushButton("◀ Önceki"); style_secondary(self.btnPrev)
+        self.btnNext = QPushButton("Sonraki ▶"); style_secondary(self.btnNext)
+        self.lblPage = QLabel()
+        lay.addWidget(self.btnPrev); lay.addWidget(self.lblPage); lay.addWidget(self.btnNext)
+        lay.addStretch(1)
+        self.cbJump = QComboBox()
+        self.lblJump = QLabel(jump_label)
+        lay.addWidget(self.lblJump); lay.addWidget(self.cbJump)
+        self.set_jump_items(jump_items or [])
+        self.btnPrev.clicked.connect(lambda: self.navigate.emit("prev", None))
+        self.btnNext.clicked.connect(lambda: self.navigate.emit("next", None))
+        self.cbJump.activated.connect(self._on_jump)
+
+    def set_jump_items(self, items):
+        self.cbJump.clear()
+        self.cbJump.addItem("—", None)
+        for label, value in items:
+            self.cbJump.addItem(label, value)
+        self.cbJump.setVisible(bool(items)); self.lblJump.setVisible(bool(items))
+
+    def _on_jump(self, index):
+        value = self.cbJump.itemData(index)
+        if value is not None:
+            self.navigate.emit("jump", value)
+
+    def update_state(self, pager, shown):
+        self.btnPrev.setEnabled(pager.has_prev)
+        self.btnNext.setEnabled(pager.has_next)
+        self.lblPage.setText(f"Sayfa {pager.page_no} ({shown} kayıt)")
+
+    def show_search(self, shown, limit):
+        self.btnPrev.setEnabled(False)
+        self.btnNext.setEnabled(False)
+        suffix = f", ilk {limit} gösteriliyor" if shown >= limit else ""
+        self.lblPage.setText(f"Arama sonuçları: {shown}{suffix}")
+
+def letter_jump_items():
+    return [(ch, normalize(ch)) for ch in JUMP_LETTERS]
 
 # -------------------- Books Tab --------------------
 class BooksTab(QWidget):
@@ -424,20 +3295,23 @@ class BooksTab(QWidget):
         file_ops_layout = QHBoxLayout()
         self.btnExport = QPushButton("Excel'e Aktar"); style_secondary(self.btnExport)
         self.btnImport = QPushButton("Excel'den Al"); style_secondary(self.btnImport)
+        self.btnImportFolder = QPushButton("Klasörden Toplu Al"); style_secondary(self.btnImportFolder)
+        self.btnImportFolder.setToolTip(f"{IMPORT_DIR} klasöründeki tüm kitap ve üye listelerini içe aktarır.")
         file_ops_layout.addWidget(self.btnExport); file_ops_layout.addWidget(self.btnImport)
+        file_ops_layout.addWidget(self.btnImportFolder)
         sh.addLayout(file_ops_layout)
         
         top_layout.addWidget(search_box)
         
         bottom_panel = QWidget()
         bottom_layout = QVBoxLayout(bottom_panel)
-        self.tbl = QTableWidget(0, 8)
-        self.tbl.setHorizontalHeaderLabels(["ID","Barkod","Ad","Yazar","Yayınevi","Yıl","Adet","Tür"])
-        self.tbl.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.tbl.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tbl.setSelectionMode(QTableWidget.ExtendedSelection)
-        self.tbl.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.model = RowTableModel(["ID","Barkod","Ad","Yazar","Yayınevi","Yıl","Adet","Tür"], self, center_numbers=True)
+        self.tbl = make_table_view(self.model, multi_select=True)
+        self.pager = KeysetPager("b.id,b.barcode,b.title,b.author,b.publisher,b.year,b.adet,b.category",
+                                 "books b", ("b.title_norm", "b.id"))
+        self.pager_bar = PagerBar(jump_items=letter_jump_items())
         bottom_layout.addWidget(self.tbl)
+        bottom_layout.addWidget(self.pager_bar)
 
         splitter.addWidget(top_panel)
         splitter.addWidget(bottom_panel)
@@ -452,8 +3326,10 @@ class BooksTab(QWidget):
         self.btnFilter.clicked.connect(self.refresh)
         self.btnExport.clicked.connect(self.export_excel)
         self.btnImport.clicked.connect(self.import_excel)
-        self.tbl.itemSelectionChanged.connect(self.fill_form)
+        self.btnImportFolder.clicked.connect(self.import_folder)
+        self.tbl.selectionModel().selectionChanged.connect(self.fill_form)
         self.tbl.horizontalHeader().sectionClicked.connect(self.sort_table)
+        self.pager_bar.navigate.connect(self.load_page)
         
         self.load_filters()
         self.refresh()
@@ -464,21 +3340,25 @@ class BooksTab(QWidget):
         else:
             self.current_sort_column = column
             self.sort_order = QtCore.Qt.AscendingOrder
-        self.tbl.sortItems(self.current_sort_column, self.sort_order)
+        self.model.sort(self.current_sort_column, self.sort_order)
 
     def load_filters(self):
-        with db_conn() as conn:
+        def fetch(conn):
             c = conn.cursor()
             categories = c.execute("SELECT DISTINCT category FROM books WHERE category IS NOT NULL ORDER BY category").fetchall()
             authors = c.execute("SELECT DISTINCT author FROM books WHERE author IS NOT NULL ORDER BY author").fetchall()
-            self.cbFilterCategory.addItems([c[0] for c in categories])
-            self.cbFilterAuthor.addItems([a[0] for a in authors])
+            return [c[0] for c in categories], [a[0] for a in authors]
+        query_executor().submit((self, "filters"), fetch, self.apply_filters)
+
+    def apply_filters(self, result):
+        categories, authors = result
+        self.cbFilterCategory.addItems(categories)
+        self.cbFilterAuthor.addItems(authors)
 
     def current_row_id(self):
         rows = self.tbl.selectionModel().selectedRows()
         if not rows: return None
-        r = rows[0].row()
-        return int(self.tbl.item(r,0).text())
+        return int(self.model.row_at(rows[0].row())[0])
 
     def fill_form(self):
         rid = self.current_row_id()
@@ -545,6 +3425,7 @@ class BooksTab(QWidget):
                 c.execute("""INSERT INTO books(barcode,title,author,publisher,year,pages,category,demirbas,raf,dolap,adet,note)
                              VALUES(?,?,?,?,?,?,?,?,?,?,?,?)""", data)
                 conn.commit()
+            catalog_index().update_books([c.lastrowid])
             self.refresh(); self.clear_form()
             QMessageBox.information(self, "Başarılı", "Kitap başarıyla eklendi.")
         except sqlite3.IntegrityError:
@@ -583,7 +3464,8 @@ class BooksTab(QWidget):
                 c.execute("""UPDATE books SET barcode=?,title=?,author=?,publisher=?,year=?,pages=?,
                              category=?,demirbas=?,raf=?,dolap=?,adet=?,note=? WHERE id=?""", data)
                 conn.commit()
-            self.refresh()
+            catalog_index().update_books([rid])
+            self.reload_page()
             QMessageBox.information(self, "Başarılı", "Kitap bilgileri başarıyla güncellendi.")
         except sqlite3.IntegrityError:
             QMessageBox.warning(self, "Hata", "Güncelleme için girilen barkod/demirbaş numarası zaten mevcut.")
@@ -599,11 +3481,12 @@ class BooksTab(QWidget):
                                      QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            ids_to_delete = [int(self.tbl.item(r.row(), 0).text()) for r in selected_rows]
+            ids_to_delete = [int(self.model.row_at(r.row())[0]) for r in selected_rows]
             with db_conn() as conn:
                 c = conn.cursor()
                 c.execute("DELETE FROM books WHERE id IN ({})".format(','.join('?' for _ in ids_to_delete)), ids_to_delete)
                 conn.commit()
+            catalog_index().update_books(ids_to_delete)
             self.refresh()
             self.clear_form()
             QMessageBox.information(self, "Başarılı", f"{len(ids_to_delete)} kitap başarıyla silindi.")
@@ -621,106 +3504,104 @@ class BooksTab(QWidget):
                 c = conn.cursor()
                 c.execute("DELETE FROM books")
                 conn.commit()
+            catalog_index().reload()
             self.refresh()
             self.clear_form()
             QMessageBox.information(self, "Tamamlandı", "Tüm kitaplar başarıyla silindi.")
 
     def export_excel(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Excel'e aktar", os.path.join(EXPORT_DIR, "kitaplar.xlsx"), "Excel (*.xlsx)")
-        if not path: return
-        headers = ["Barkod","Kitap Adı","Yazar","Yayınevi","Basım Yılı","Sayfa Sayısı","Tür","Demirbaş","Raf","Dolap","Adet","Açıklama"]
-        with db_conn() as conn:
-            c = conn.cursor()
-            c.execute("""SELECT barcode,title,author,publisher,year,pages,category,demirbas,raf,dolap,adet,note FROM books""")
-            rows = c.fetchall()
-        wb = Workbook(); ws = wb.active; ws.append(headers)
-        for r in rows:
-            ws.append(list(r))
-        wb.save(path)
-        QMessageBox.information(self, "Tamam", "Excel dosyası oluşturuldu.")
+        export_with_progress(self, BOOK_EXPORT_SQL, BOOK_EXPORT_HEADERS, "kitaplar.xlsx")
 
     def import_excel(self):
         path, _ = QFileDialog.getOpenFileName(self, "Excel'den al", IMPORT_DIR, "Excel (*.xlsx)")
         if not path: return
-        wb = load_workbook(path); ws = wb.active
-        headers = [normalize(str(cell.value)) for cell in ws[1]]
-        colmap = {}
-        for idx, h in enumerate(headers):
-            if h in TURKISH_HEADER_MAP:
-                colmap[TURKISH_HEADER_MAP[h]] = idx+1
-        needed = ["title"]
-        if not all(n in colmap for n in needed):
-            QMessageBox.warning(self, "Hata", "Excel başlıkları eksik (en azından 'Kitap Adı' gerekli).")
+
+        def done(report):
+            for i, e in report.errors:
+                print("Satır", i, "hata:", e)
+            catalog_index().reload()
+            self.refresh()
+            QMessageBox.information(self, "Tamam", "Excel'den içe aktarma tamamlandı.\n" + report.summary())
+
+        run_with_progress(self, "Excel okunuyor...", (self, "import"),
+                          lambda conn, task: import_books_xlsx(conn, path, task), done,
+                          fmt=lambda n: f"{n} satır işlendi...")
+
+    def import_folder(self):
+        names = [n for n in os.listdir(IMPORT_DIR) if n.lower().endswith(".xlsx") and not n.startswith("~$")]
+        if not names:
+            QMessageBox.information(self, "Bilgi", f"{IMPORT_DIR} klasöründe Excel dosyası yok.")
+            return
+        if QMessageBox.question(self, "Toplu içe aktarma",
+                                f"{IMPORT_DIR} klasöründeki {len(names)} Excel dosyası içe aktarılacak. "
+                                "Daha önce aktarılan dosyalar atlanır, üye listelerindeki mevcut "
+                                "üyelerin bilgileri güncellenir. Devam edilsin mi?") != QMessageBox.Yes:
             return
-        count=0
-        with db_conn() as conn:
-            c = conn.cursor()
-            for i, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                title = row[colmap["title"]-1]
-                if not title: continue
-                barcode = row[colmap.get("barcode")-1] if colmap.get("barcode") else None
-                if not barcode or str(barcode).strip()=="" : barcode = gen_barcode()
-                author = row[colmap.get("author")-1] if colmap.get("author") else None
-                publisher = row[colmap.get("publisher")-1] if colmap.get("publisher") else None
-                year = row[colmap.get("year")-1] if colmap.get("year") else None
-                pages = row[colmap.get("pages")-1] if colmap.get("pages") else None
-                category = row[colmap.get("category")-1] if colmap.get("category") else None
-                demirbas = row[colmap.get("demirbas")-1] if colmap.get("demirbas") else None
-                raf = row[colmap.get("raf")-1] if colmap.get("raf") else None
-                dolap = row[colmap.get("dolap")-1] if colmap.get("dolap") else None
-                adet = row[colmap.get("adet")-1] if colmap.get("adet") else 1
-                note = row[colmap.get("note")-1] if colmap.get("note") else None
-                try:
-                    c.execute("""INSERT OR IGNORE INTO books(barcode,title,author,publisher,year,pages,category,demirbas,raf,dolap,adet,note)
-                                 VALUES(?,?,?,?,?,?,?,?,?,?,?,?)""",
-                             (str(barcode).strip(), str(title).strip(), author, publisher,
-                              int(year) if year not in (None,"") else None,
-                              int(pages) if pages not in (None,"") else None,
-                              category, demirbas, raf, dolap,
-                              int(adet) if adet not in (None,"") else 1,
-                              note))
-                    count += c.rowcount
-                except Exception as e:
-                    print("Satır", i, "hata:", e)
-            conn.commit()
-        self.refresh()
-        QMessageBox.information(self, "Tamam", f"Excel'den {count} kayıt eklendi (mevcut barkodlar atlandı).")
+
+        def done(result):
+            for name, _kind, report in result.files:
+                for i, e in report.errors:
+                    print(name, "satır", i, "hata:", e)
+            catalog_index().reload()
+            self.refresh()
+            for tab in self.window().findChildren(MembersTab):
+                tab.refresh()
+            QMessageBox.information(self, "Toplu içe aktarma", result.summary())
+
+        run_with_progress(self, "Dosyalar ayrıştırılıyor...", (self, "import"),
+                          lambda conn, task: import_folder(conn, IMPORT_DIR, task), done,
+                          total=len(names), fmt=lambda n: f"{n} dosya yazıldı...")
 
     def refresh(self):
-        q = normalize(self.edSearch.text())
+        """Arama/filtre alanlarını yeniden okur ve ilk sayfayı yükler."""
+        self.search_text = normalize(self.edSearch.text())
+        where_clauses, params = [], []
         filter_cat = self.cbFilterCategory.currentText()
         filter_auth = self.cbFilterAuthor.currentText()
-        
-        query = """SELECT id,barcode,title,author,publisher,year,adet,category FROM books """
-        params = []
-        where_clauses = []
-
-        if q:
-            where_clauses.append("(normalize(title) LIKE ? OR normalize(author) LIKE ? OR barcode LIKE ?)")
-            params.extend([f"%{q}%", f"%{q}%", f"%{q}%"])
         if filter_cat != "Tüm Kategoriler":
-            where_clauses.append("category = ?")
+            where_clauses.append("b.category = ?")
             params.append(filter_cat)
         if filter_auth != "Tüm Yazarlar":
-            where_clauses.append("author = ?")
+            where_clauses.append("b.author = ?")
             params.append(filter_auth)
-        
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        query += " ORDER BY title ASC"
-        
-        with db_conn() as conn:
-            c = conn.cursor()
-            c.execute(query, params)
-            rows = c.fetchall()
-        
-        self.tbl.setRowCount(len(rows))
-        for r, row in enumerate(rows):
-            for cidx, val in enumerate(row):
-                item = QTableWidgetItem("" if val is None else str(val))
-                if isinstance(val, int): item.setTextAlignment(Qt.AlignCenter)
-                self.tbl.setItem(r, cidx, item)
+        self.pager.set_filter(" AND ".join(where_clauses), params)
+        self.load_page("first")
+
+    def reload_page(self):
+        """Ekleme/güncelleme sonrası bulunulan sayfayı yeniler."""
+        self.load_page("reload")
+
+    def load_page(self, direction, value=None):
+        q = getattr(self, "search_text", "")
+        if q:
+            # Metin araması ilgililiğe göre sıralanır, sayfalanmaz
+            extra_where, extra_params = self.pager.where, list(self.pager.params)
+            def fetch(conn):
+                from_clause, match_clause, params, order_by = book_search_sql(conn, q)
+                where = match_clause
+                if extra_where:
+                    where += " AND " + extra_where
+                    params = params + extra_params
+                return conn.execute(f"""SELECT b.id,b.barcode,b.title,b.author,b.publisher,b.year,b.adet,b.category
+                                        FROM {from_clause} WHERE {where}
+                                        ORDER BY {order_by} LIMIT {BOOK_SEARCH_LIMIT}""", params).fetchall()
+            def done(rows):
+                self.show_rows(rows)
+                self.pager_bar.show_search(len(rows), BOOK_SEARCH_LIMIT)
+        else:
+            sql, params = self.pager.build(direction, value)
+            fetch = lambda conn: conn.execute(sql, params).fetchall()
+            def done(raw):
+                rows = self.pager.accept(direction, raw)
+                if rows is None:
+                    self.load_page("reload" if self.pager.first_key is not None else "first")
+                    return
+                self.show_rows(rows)
+                self.pager_bar.update_state(self.pager, len(rows))
+        query_executor().submit((self, "page"), fetch, done)
+
+    def show_rows(self, rows):
+        self.model.set_rows(rows)
         self.tbl.resizeColumnsToContents()
 
 # -------------------- Members Tab --------------------
@@ -797,13 +3678,13 @@ class MembersTab(QWidget):
         
         bottom_panel = QWidget()
         bottom_layout = QVBoxLayout(bottom_panel)
-        self.tbl = QTableWidget(0, 8)
-        self.tbl.setHorizontalHeaderLabels(["Numara","Ad","Soyad","Sınıf","Şube","Cinsiyet","Telefon","Kayıt Tarihi"])
-        self.tbl.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tbl.setSelectionMode(QTableWidget.ExtendedSelection)
-        self.tbl.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.tbl.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.model = RowTableModel(["Numara","Ad","Soyad","Sınıf","Şube","Cinsiyet","Telefon","Kayıt Tarihi"], self)
+        self.tbl = make_table_view(self.model, multi_select=True)
+        self.pager = KeysetPager("no, name, surname, class, branch, gender, phone, register_date",
+                                 "members", ("name_norm", "surname_norm", "id"))
+        self.pager_bar = PagerBar(jump_items=letter_jump_items())
         bottom_layout.addWidget(self.tbl)
+        bottom_layout.addWidget(self.pager_bar)
 
         splitter.addWidget(top_panel)
         splitter.addWidget(bottom_panel)
@@ -817,21 +3698,21 @@ class MembersTab(QWidget):
         self.btnSearch.clicked.connect(self.refresh)
         self.btnExport.clicked.connect(self.export_excel)
         self.btnImport.clicked.connect(self.import_excel)
-        self.tbl.itemSelectionChanged.connect(self.fill_form)
+        self.tbl.selectionModel().selectionChanged.connect(self.fill_form)
         self.tbl.horizontalHeader().sectionClicked.connect(self.sort_table)
+        self.pager_bar.navigate.connect(self.load_page)
 
         self.refresh()
 
     def sort_table(self, column):
-        self.tbl.sortItems(column, self.sort_order)
+        self.model.sort(column, self.sort_order)
         self.sort_order = QtCore.Qt.DescendingOrder if self.sort_order == QtCore.Qt.AscendingOrder else QtCore.Qt.AscendingOrder
 
     def current_row_no(self):
         rows = self.tbl.selectionModel().selectedRows()
         if not rows: return None
-        r = rows[0].row()
-        item = self.tbl.item(r,0)
-        return item.text() if item else None
+        no = self.model.row_at(rows[0].row())[0]
+        return None if no is None else str(no)
 
     def fill_form(self):
         no = self.current_row_no()
@@ -880,6 +3761,7 @@ class MembersTab(QWidget):
                 c.execute("""INSERT INTO members(name,surname,class,branch,no,gender,phone,register_date)
                              VALUES(?,?,?,?,?,?,?,?)""",data)
                 conn.commit()
+            catalog_index().update_members([no])
             self.refresh(); self.clear_form()
         except sqlite3.IntegrityError:
             QMessageBox.warning(self,"Hata","Bu numara zaten kayıtlı.")
@@ -895,7 +3777,8 @@ class MembersTab(QWidget):
             c=conn.cursor()
             c.execute("""UPDATE members SET name=?,surname=?,class=?,branch=?,gender=?,phone=?,register_date=? WHERE no=?""",data)
             conn.commit()
-        self.refresh()
+        catalog_index().update_members([no])
+        self.reload_page()
 
     def on_delete(self):
         selected_rows = self.tbl.selectionModel().selectedRows()
@@ -908,11 +3791,12 @@ class MembersTab(QWidget):
                                      QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
-            nos_to_delete = [self.tbl.item(r.row(), 0).text() for r in selected_rows]
+            nos_to_delete = [str(self.model.row_at(r.row())[0]) for r in selected_rows]
             with db_conn() as conn:
                 c = conn.cursor()
                 c.execute("DELETE FROM members WHERE no IN ({})".format(','.join('?' for _ in nos_to_delete)), nos_to_delete)
                 conn.commit()
+            catalog_index().update_members(nos_to_delete)
             self.refresh()
             self.clear_form()
             QMessageBox.information(self, "Başarılı", f"{len(nos_to_delete)} üye başarıyla silindi.")
@@ -931,72 +3815,59 @@ class MembersTab(QWidget):
                 c = conn.cursor()
                 c.execute("DELETE FROM members")
                 conn.commit()
+            catalog_index().reload()
             self.refresh()
             self.clear_form()
             QMessageBox.information(self, "Tamamlandı", "Tüm üyeler başarıyla silindi.")
 
     def export_excel(self):
-        path,_=QFileDialog.getSaveFileName(self,"Excel'e aktar",os.path.join(EXPORT_DIR,"uyeler.xlsx"),"Excel (*.xlsx)")
-        if not path: return
-        headers=["AD","SOYAD","SINIF","ŞUBE","NUMARA","CİNSİYET","TELEFON","KAYIT TARİHİ"]
-        with db_conn() as conn:
-            c=conn.cursor()
-            c.execute("SELECT name,surname,class,branch,no,gender,phone,register_date FROM members")
-            rows=c.fetchall()
-        wb=Workbook(); ws=wb.active; ws.append(headers)
-        for r in rows: ws.append(list(r))
-        wb.save(path); QMessageBox.information(self,"Tamam","Excel dosyası oluşturuldu.")
+        export_with_progress(self, MEMBER_EXPORT_SQL, MEMBER_EXPORT_HEADERS, "uyeler.xlsx")
 
     def import_excel(self):
         path,_=QFileDialog.getOpenFileName(self,"Excel'den al",IMPORT_DIR,"Excel (*.xlsx)")
         if not path: return
-        wb=load_workbook(path); ws=wb.active
-        headers=[str(c.value).strip().upper() if c.value is not None else "" for c in ws[1]]
-        expected=["AD","SOYAD","SINIF","ŞUBE","NUMARA","CİNSİYET","TELEFON","KAYIT TARİHİ"]
-        missing=[h for h in expected if h not in headers]
-        if missing:
-            QMessageBox.warning(self,"Hata","Excel başlıkları uygun değil: " + ", ".join(missing)); return
-        idx={h:headers.index(h) for h in expected}
-        count=0
-        with db_conn() as conn:
-            c=conn.cursor()
-            for row in ws.iter_rows(min_row=2,values_only=True):
-                name=(row[idx["AD"]] or "").strip() if row[idx["AD"]] else ""
-                surname=(row[idx["SOYAD"]] or "").strip() if row[idx["SOYAD"]] else ""
-                no=(str(row[idx["NUMARA"]]).strip() if row[idx["NUMARA"]] is not None else "")
-                if not (name and surname and no): continue
-                klass = (row[idx["SINIF"]] or "") if row[idx["SINIF"]] else ""
-                branch = (row[idx["ŞUBE"]] or "") if row[idx["ŞUBE"]] else ""
-                gender = (row[idx["CİNSİYET"]] or "") if row[idx["CİNSİYET"]] else ""
-                phone = (str(row[idx["TELEFON"]]).strip() if row[idx["TELEFON"]] is not None else "")
-                reg = excel_val_to_iso(row[idx["KAYIT TARİHİ"]]) or datetime.date.today().isoformat()
-                try:
-                    c.execute("""INSERT OR IGNORE INTO members(name,surname,class,branch,no,gender,phone,register_date)
-                                 VALUES(?,?,?,?,?,?,?,?)""",(name,surname,klass,branch,no,gender,phone,reg))
-                    count += c.rowcount
-                except Exception as e:
-                    print("Üye satır hata:", e)
-            conn.commit()
-        self.refresh(); QMessageBox.information(self,"Tamam",f"Excel'den {count} kayıt eklendi.")
+        answer = QMessageBox.question(
+            self, "Üye listesi",
+            "Listede bulunan mevcut üyelerin ad, soyad, sınıf, şube, cinsiyet ve telefon "
+            "bilgileri güncellensin mi?\n\nHayır: yalnızca yeni üyeler eklenir.",
+            QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes)
+        if answer == QMessageBox.Cancel: return
+        update = answer == QMessageBox.Yes
+
+        def done(report):
+            for i, e in report.errors:
+                print("Üye satır", i, "hata:", e)
+            catalog_index().reload()
+            self.refresh()
+            QMessageBox.information(self, "Tamam", "Excel'den üye aktarımı tamamlandı.\n" + report.summary())
+
+        run_with_progress(self, "Üye listesi okunuyor...", (self, "import"),
+                          lambda conn, task: sync_members_xlsx(conn, path, update, task), done,
+                          fmt=lambda n: f"{n} satır okundu...")
 
     def refresh(self):
+        """Arama alanını yeniden okur ve ilk sayfayı yükler."""
         q = normalize(self.edSearch.text())
-        with db_conn() as conn:
-            c = conn.cursor()
-            if q:
-                c.execute("""SELECT no, name, surname, class, branch, gender, phone, register_date
-                             FROM members WHERE normalize(name) LIKE ? OR normalize(surname) LIKE ? OR normalize(no) LIKE ?
-                             ORDER BY name, surname ASC""", (f"%{q}%", f"%{q}%", f"%{q}%"))
-            else:
-                c.execute("""SELECT no, name, surname, class, branch, gender, phone, register_date
-                             FROM members ORDER BY name, surname ASC""")
-            rows = c.fetchall()
-        self.tbl.setRowCount(len(rows))
-        for r, row in enumerate(rows):
-            for c_idx, val in enumerate(row):
-                item = QTableWidgetItem(str(val))
-                self.tbl.setItem(r, c_idx, item)
-        self.tbl.resizeColumnsToContents()
+        if q:
+            self.pager.set_filter(*member_search_sql(q))
+        else:
+            self.pager.set_filter()
+        self.load_page("first")
+
+    def reload_page(self):
+        self.load_page("reload")
+
+    def load_page(self, direction, value=None):
+        sql, params = self.pager.build(direction, value)
+        def done(raw):
+            rows = self.pager.accept(direction, raw)
+            if rows is None:
+                self.load_page("reload" if self.pager.first_key is not None else "first")
+                return
+            self.model.set_rows(rows)
+            self.tbl.resizeColumnsToContents()
+            self.pager_bar.update_state(self.pager, len(rows))
+        query_executor().submit((self, "page"), lambda conn: conn.execute(sql, params).fetchall(), done)
 
 # -------------------- Book Details Dialog --------------------
 class BookDetailsDialog(QDialog):
@@ -1061,38 +3932,28 @@ class MemberHistoryWidget(QWidget):
         super().__init__(parent)
         layout = QVBoxLayout(self)
         
-        self.tblHistory = QTableWidget(0, 4)
-        self.tblHistory.setHorizontalHeaderLabels(["Kitap Adı", "Veriliş", "Son Tarih", "Teslim"])
-        self.tblHistory.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tblHistory.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.tblHistory.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.model = RowTableModel(["Kitap Adı", "Veriliş", "Son Tarih", "Teslim"], self,
+                                   none_text="AKTİF", bold_none=True)
+        self.tblHistory = make_table_view(self.model)
         
         layout.addWidget(self.tblHistory)
         
     def load_history(self, member_id):
-        self.tblHistory.setRowCount(0)
         if member_id is None:
+            self.model.set_rows([])
             return
-            
-        with db_conn() as conn:
-            c = conn.cursor()
-            c.execute("""SELECT b.title, l.loan_date, l.due_date, l.return_date
-                         FROM loans l
-                         JOIN books b ON l.book_id = b.id
-                         WHERE l.member_id = ?
-                         ORDER BY l.return_date DESC, l.loan_date DESC""", (member_id,))
-            rows = c.fetchall()
-            
-        self.tblHistory.setRowCount(len(rows))
-        for r, row in enumerate(rows):
-            for c_idx, val in enumerate(row):
-                item = QTableWidgetItem(str(val) if val else "AKTİF")
-                if val is None:
-                    font = item.font()
-                    font.setBold(True)
-                    item.setFont(font)
-                self.tblHistory.setItem(r, c_idx, item)
-        self.tblHistory.resizeColumnsToContents()
+        # Üyenin bütün geçmişi belleğe alınmaz; satırlar kaydırdıkça imleçten okunur
+        self.model.set_query("""SELECT b.title, l.loan_date, l.due_date, l.return_date
+                                FROM loans l
+                                JOIN books b ON l.book_id = b.id
+                                WHERE l.member_id = ?
+                                ORDER BY l.return_date DESC, l.loan_date DESC""", (member_id,),
+                             on_first=self.tblHistory.resizeColumnsToContents)
+
+    def hideEvent(self, event):
+        # Görünmeyen geçmiş WAL anlık görüntüsünü tutmasın
+        self.model.release_cursor()
+        super().hideEvent(event)
 
 # -------------------------------------------------------------------------
 
@@ -1107,6 +3968,7 @@ class LoansTab(QWidget):
         self.selected_member_no = None
         self.selected_book_title = None
         self.active_rows = []
+        self.today = datetime.date.today().isoformat()
         self.build_ui()
         self.reset_loan_form() # Formu başlangıçta varsayılan tarihe ayarla
 
@@ -1172,24 +4034,30 @@ class LoansTab(QWidget):
         main.addLayout(search_layout)
 
         # Tables
-        self.tblActive = QTableWidget(0, 11)
-        self.tblActive.setHorizontalHeaderLabels(["LoanID","Üye No","Üye","Sınıf","Şube","Kitap","Barkod","Raf","Dolap","Veriliş","Son Tarih"])
-        self.tblActive.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tblActive.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.active_model = RowTableModel(["LoanID","Üye No","Üye","Sınıf","Şube","Kitap","Barkod","Raf","Dolap","Veriliş","Son Tarih"],
+                                          self, row_foreground=self.active_row_color)
+        self.tblActive = make_table_view(self.active_model, stretch=False)
         self.btnReturn = QPushButton("Seçiliyi Teslim Al")
         style_primary(self.btnReturn)
 
-        hist_box = QGroupBox("Teslim Edilenler (Son 200)")
-        self.tblHist = QTableWidget(0, 9)
-        self.tblHist.setHorizontalHeaderLabels(["LoanID","Üye No","Üye","Sınıf","Şube","Kitap","Veriliş","Son Tarih","Teslim"])
-        self.tblHist.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tblHist.setEditTriggers(QTableWidget.NoEditTriggers)
+        hist_box = QGroupBox("Teslim Edilenler")
+        self.hist_model = RowTableModel(["LoanID","Üye No","Üye","Sınıf","Şube","Kitap","Veriliş","Son Tarih","Teslim"], self)
+        self.tblHist = make_table_view(self.hist_model, stretch=False)
+        # Teslim tarihine göre yeniden eskiye; tüm yıllar sayfa sayfa gezilebilir
+        self.hist_pager = KeysetPager("""l.id, m.no, m.name || ' ' || m.surname, m.class, m.branch,
+                                         b.title, l.loan_date, l.due_date, l.return_date""",
+                                      """loans l JOIN members m ON l.member_id = m.id
+                                         JOIN books b ON l.book_id = b.id""",
+                                      ("l.return_date", "l.id"), page_size=200, descending=True)
+        self.hist_pager.set_filter("l.return_date IS NOT NULL")
+        self.hist_pager_bar = PagerBar(jump_label="Yıla git:")
 
         main.addWidget(self.tblActive)
         main.addWidget(self.btnReturn)
         main.addWidget(hist_box)
         hist_layout = QVBoxLayout(hist_box)
         hist_layout.addWidget(self.tblHist)
+        hist_layout.addWidget(self.hist_pager_bar)
 
         # Signals
         self.btnLoan.clicked.connect(self.on_loan)
@@ -1201,9 +4069,29 @@ class LoansTab(QWidget):
         self.book_suggest.itemClicked.connect(self.pick_book)
         self.btnShowBookDetails.clicked.connect(self.on_show_book_details)
         self.edActiveSearch.textChanged.connect(self.filter_active_loans)
+        self.hist_pager_bar.navigate.connect(self.load_history_page)
+
+        # İndeks hazır olunca öneriler SQLite'a gitmeden bellekten gelir
+        index = catalog_index()
+        index.load()
+        self.member_pipeline = SuggestionPipeline(
+            "uye", self.fetch_member_suggest, self.narrow_member_suggest,
+            self.show_member_suggest, MEMBER_SUGGEST_LIMIT,
+            local=index.suggest_members, parent=self)
+        self.books_fts = False
+        self.book_pipeline = SuggestionPipeline(
+            "kitap", self.fetch_book_suggest, self.narrow_book_suggest,
+            self.show_book_suggest, BOOK_SUGGEST_LIMIT,
+            local=index.suggest_books, parent=self)
+        SETTINGS.changed.connect(self.on_settings_changed)
 
         self.refresh_tables()
 
+    def on_settings_changed(self, keys):
+        # Varsayılan süre değişince formdaki Son İade tarihi yeni süreye göre kurulur
+        if 'default_loan_days' in keys:
+            self.update_due_date(self.deLoan.date())
+
     # YENİ EKLEME: Varsayılan ödünç verme süresini dinamik olarak ayarlar.
     def reset_loan_form(self):
         default_days = get_default_loan_days()
@@ -1245,18 +4133,15 @@ class LoansTab(QWidget):
 
         self.populate_active_table(filtered)
 
-    def populate_active_table(self, rows):
-        self.tblActive.setRowCount(len(rows))
-        today = datetime.date.today().isoformat()
-        for r, row in enumerate(rows):
-            due_date = row[10]
-            is_overdue = due_date < today
+    def active_row_color(self, row):
+        # Son tarihi geçmiş ödünçler kırmızı gösterilir
+        if row[10] and row[10] < self.today:
+            return QtGui.QColor("red")
+        return None
 
-            for c_idx, val in enumerate(row):
-                item = QTableWidgetItem(str(val))
-                if is_overdue:
-                    item.setForeground(QtGui.QColor("red"))
-                self.tblActive.setItem(r, c_idx, item)
+    def populate_active_table(self, rows):
+        self.today = datetime.date.today().isoformat()
+        self.active_model.set_rows(rows)
         self.tblActive.resizeColumnsToContents()
 
     # --- live search helpers ---
@@ -1266,18 +4151,26 @@ class LoansTab(QWidget):
             return
         self.sel_member_id = None
         self.selected_member_no = None
-        self.member_suggest.clear()
         self.member_history_widget.load_history(None) # Üye bilgisi silindiğinde geçmişi temizle
         if not text:
+            self.member_pipeline.cancel()
+            self.member_suggest.clear()
             self.member_suggest.hide(); return
-        
-        q = normalize(text)
-        with db_conn() as conn:
-            c = conn.cursor()
-            c.execute("""SELECT id,no,name,surname,class,branch FROM members
-                         WHERE normalize(no) LIKE ? OR normalize(name) LIKE ? OR normalize(surname) LIKE ?
-                         ORDER BY no LIMIT 50""", (f"%{q}%",f"%{q}%",f"%{q}%"))
-            rows = c.fetchall()
+        self.member_pipeline.request(text)
+
+    def fetch_member_suggest(self, conn, text):
+        where, params = member_search_sql(text)
+        c = conn.cursor()
+        c.execute(f"""SELECT id,no,name,surname,class,branch FROM members
+                      WHERE {where}
+                      ORDER BY no LIMIT {MEMBER_SUGGEST_LIMIT}""", params)
+        return c.fetchall()
+
+    def narrow_member_suggest(self, rows, prev, text):
+        return [r for r in rows if member_row_matches(r[1:4], text)]
+
+    def show_member_suggest(self, rows):
+        self.member_suggest.clear()
         for mid,no,name,surname,klass,branch in rows:
             item = QtWidgets.QListWidgetItem(f"{no} — {name} {surname}  ({klass}{branch})")
             item.setData(Qt.UserRole, mid)
@@ -1304,18 +4197,33 @@ class LoansTab(QWidget):
         self.sel_book_id = None
         self.selected_book_title = None
         self.btnShowBookDetails.setDisabled(True)
-        self.book_suggest.clear()
         if not text:
+            self.book_pipeline.cancel()
+            self.book_suggest.clear()
             self.book_suggest.hide(); return
-        
-        q = normalize(text)
-        with db_conn() as conn:
-            c = conn.cursor()
-            c.execute("""SELECT id,title,author,adet FROM books
-                         WHERE normalize(title) LIKE ?
-                         ORDER BY title LIMIT 80""", (f"%{q}%",))
-            rows = c.fetchall()
-        for bid,title,author,adet in rows:
+        self.book_pipeline.request(text)
+
+    def fetch_book_suggest(self, conn, text):
+        self.books_fts = books_fts_ready(conn)
+        from_clause, match_clause, params, order_by = book_search_sql(conn, text)
+        c = conn.cursor()
+        c.execute(f"""SELECT b.id,b.title,b.author,b.adet,
+                             b.publisher,b.category,b.barcode FROM {from_clause}
+                      WHERE {match_clause}
+                      ORDER BY {order_by} LIMIT {BOOK_SUGGEST_LIMIT}""", params)
+        return c.fetchall()
+
+    def narrow_book_suggest(self, rows, prev, text):
+        # book_search_sql kelime yoksa FTS yerine LIKE kullanır; kip değiştiyse süzülemez
+        fts = self.books_fts and bool(search_words(text))
+        if fts != (self.books_fts and bool(search_words(prev))):
+            return None
+        return [r for r in rows
+                if book_row_matches((r[1], r[2], r[4], r[5], r[6]), text, fts)]
+
+    def show_book_suggest(self, rows):
+        self.book_suggest.clear()
+        for bid,title,author,adet,*_ in rows:
             item = QtWidgets.QListWidgetItem(f"{title} — {author or ''}  [Adet:{adet}]")
             item.setData(Qt.UserRole, (bid,title))
             self.book_suggest.addItem(item)
@@ -1354,32 +4262,15 @@ class LoansTab(QWidget):
             QMessageBox.warning(self, "Uyarı", "Lütfen bir kitap seçin.")
             return
         
-        loan_limit = get_loan_limit()
-
-        with db_conn() as conn:
-            c = conn.cursor()
-            
-            # Kitabın mevcut adedini kontrol et
-            c.execute("SELECT adet FROM books WHERE id=?", (book_id,))
-            book_adet = c.fetchone()[0]
-            if book_adet <= 0:
-                QMessageBox.warning(self, "Uyarı", "Bu kitabın mevcut kopyası yok.")
-                return
-
-            # Üyenin üzerindeki kitap sayısını kontrol et
-            c.execute("SELECT COUNT(*) FROM loans WHERE member_id=? AND return_date IS NULL", (member_id,))
-            loan_count = c.fetchone()[0]
-            if loan_count >= loan_limit:
-                QMessageBox.warning(self, "Uyarı", f"Bu üye, en fazla {loan_limit} kitap ödünç alabilir.")
-                return
-
-            # Ödünç kaydını ekle
-            c.execute("""INSERT INTO loans(book_id, member_id, loan_date, due_date, return_date)
-                         VALUES(?,?,?,?,?)""", (book_id, member_id, loan_date, due_date, None))
-
-            # Kitabın adedini azalt
-            c.execute("UPDATE books SET adet = adet - 1 WHERE id=?", (book_id,))
-            conn.commit()
+        try:
+            lend_book(db_conn(), book_id, member_id, loan_date, due_date, get_loan_limit())
+        except CirculationError as e:
+            QMessageBox.warning(self, "Uyarı", str(e))
+            return
+        except sqlite3.OperationalError as e:
+            QMessageBox.warning(self, "Uyarı", f"Veritabanı şu anda meşgul, lütfen tekrar deneyin.\n{e}")
+            return
+        catalog_index().update_books([book_id])
 
         # GÜNCELLEME: Ödünç verme işleminden sonra formu sıfırla
         self.reset_loan_form()
@@ -1392,10 +4283,10 @@ class LoansTab(QWidget):
             QMessageBox.information(self, "Bilgi", "Teslim almak için bir ödünç kaydı seçin.")
             return
         
-        selected_row = rows[0].row()
-        loan_id = int(self.tblActive.item(selected_row, 0).text())
-        member_name = self.tblActive.item(selected_row, 2).text()
-        book_title = self.tblActive.item(selected_row, 5).text()
+        selected = self.active_model.row_at(rows[0].row())
+        loan_id = int(selected[0])
+        member_name = selected[2]
+        book_title = selected[5]
 
         confirm_text = (
             f"{member_name} adlı üyenin\n"
@@ -1403,31 +4294,30 @@ class LoansTab(QWidget):
         )
 
         if QMessageBox.question(self, "Onay", confirm_text) == QMessageBox.Yes:
-            with db_conn() as conn:
-                c = conn.cursor()
-
-                # İlgili kitabın ID'sini bul
-                c.execute("SELECT book_id FROM loans WHERE id=?", (loan_id,))
-                book_id = c.fetchone()[0]
-
-                # Teslim tarihini güncelle
-                return_date = datetime.date.today().isoformat()
-                c.execute("UPDATE loans SET return_date=? WHERE id=?", (return_date, loan_id))
-
-                # Kitabın adedini artır
-                c.execute("UPDATE books SET adet = adet + 1 WHERE id=?", (book_id,))
-                conn.commit()
+            try:
+                book_id = return_loan(db_conn(), loan_id, datetime.date.today().isoformat())
+            except CirculationError as e:
+                QMessageBox.warning(self, "Uyarı", str(e))
+                self.refresh_tables()
+                return
+            except sqlite3.OperationalError as e:
+                QMessageBox.warning(self, "Uyarı", f"Veritabanı şu anda meşgul, lütfen tekrar deneyin.\n{e}")
+                return
+            catalog_index().update_books([book_id])
 
             self.refresh_tables()
             self.edActiveSearch.clear()
             QMessageBox.information(self, "Başarılı", "Kitap teslim alındı.")
 
     def refresh_tables(self):
+        # Adetler ve kayıtlar değişmiş olabilir; öneri önbelleğini bırak
+        self.member_pipeline.invalidate()
+        self.book_pipeline.invalidate()
         self.refresh_active_loans()
         self.refresh_loan_history()
 
     def refresh_active_loans(self):
-        with db_conn() as conn:
+        def fetch(conn):
             c = conn.cursor()
             c.execute("""SELECT
                             l.id, m.no, m.name || ' ' || m.surname, m.class, m.branch,
@@ -1442,36 +4332,34 @@ class LoansTab(QWidget):
                             l.return_date IS NULL
                          ORDER BY
                             l.due_date""")
-            rows = c.fetchall()
+            return c.fetchall()
+        query_executor().submit((self, "active"), fetch, self.set_active_rows)
 
+    def set_active_rows(self, rows):
         self.active_rows = rows
         self.apply_active_filter()
 
     def refresh_loan_history(self):
-        with db_conn() as conn:
-            c = conn.cursor()
-            c.execute("""SELECT
-                            l.id, m.no, m.name || ' ' || m.surname, m.class, m.branch,
-                            b.title, l.loan_date, l.due_date, l.return_date
-                         FROM
-                            loans l
-                         JOIN
-                            members m ON l.member_id = m.id
-                         JOIN
-                            books b ON l.book_id = b.id
-                         WHERE
-                            l.return_date IS NOT NULL
-                         ORDER BY
-                            l.return_date DESC
-                         LIMIT 200""")
-            rows = c.fetchall()
-        
-        self.tblHist.setRowCount(len(rows))
-        for r, row in enumerate(rows):
-            for c_idx, val in enumerate(row):
-                item = QTableWidgetItem(str(val))
-                self.tblHist.setItem(r, c_idx, item)
-        self.tblHist.resizeColumnsToContents()
+        def fetch(conn):
+            return conn.execute("SELECT MIN(return_date) FROM loans WHERE return_date IS NOT NULL").fetchone()[0]
+        def done(first):
+            this_year = datetime.date.today().year
+            first_year = int(first[:4]) if first and first[:4].isdigit() else this_year
+            self.hist_pager_bar.set_jump_items([(str(y), f"{y}-12-31") for y in range(this_year, first_year - 1, -1)])
+        query_executor().submit((self, "history_years"), fetch, done)
+        self.load_history_page("first")
+
+    def load_history_page(self, direction, value=None):
+        sql, params = self.hist_pager.build(direction, value)
+        def done(raw):
+            rows = self.hist_pager.accept(direction, raw)
+            if rows is None:
+                self.load_history_page("reload" if self.hist_pager.first_key is not None else "first")
+                return
+            self.hist_model.set_rows(rows)
+            self.tblHist.resizeColumnsToContents()
+            self.hist_pager_bar.update_state(self.hist_pager, len(rows))
+        query_executor().submit((self, "history_page"), lambda conn: conn.execute(sql, params).fetchall(), done)
 
 # -------------------- Reports Tab --------------------
 class ReportsTab(QWidget):
@@ -1562,6 +4450,8 @@ class ReportsTab(QWidget):
         path, _ = QFileDialog.getSaveFileName(self, "PDF'e Aktar", os.path.join(REPORT_DIR, f"{report_type}_raporu.pdf"), "PDF (*.pdf)")
         if not path: return
 
+        A4, cm = pdf_pagesizes.A4, pdf_units.cm
+        DEFAULT_FONT = pdf_font()
         c = pdfcanvas.Canvas(path, pagesize=A4)
         c.setTitle("Kütüphane Yönetim Sistemi Raporu")
         c.setAuthor("Kütüphane Yönetim Sistemi")
@@ -1689,20 +4579,24 @@ class ReportsTab(QWidget):
         self.refresh_most_borrowed()
 
     def refresh_stats(self):
-        with db_conn() as conn:
+        def fetch(conn):
             c = conn.cursor()
             total_books = c.execute("SELECT COUNT(*) FROM books").fetchone()[0]
             total_members = c.execute("SELECT COUNT(*) FROM members").fetchone()[0]
             active_loans = c.execute("SELECT COUNT(*) FROM loans WHERE return_date IS NULL").fetchone()[0]
-        
+            return total_books, total_members, active_loans
+        query_executor().submit((self, "stats"), fetch, self.show_stats)
+
+    def show_stats(self, result):
+        total_books, total_members, active_loans = result
         self.lblTotalBooks.setText(f"Toplam Kitap: {total_books}")
         self.lblTotalMembers.setText(f"Toplam Üye: {total_members}")
         self.lblActiveLoans.setText(f"Ödünçte Kitap: {active_loans}")
 
     def refresh_overdue_books(self):
-        with db_conn() as conn:
+        today = datetime.date.today().isoformat()
+        def fetch(conn):
             c = conn.cursor()
-            today = datetime.date.today().isoformat()
             c.execute("""SELECT
                             m.no, m.name || ' ' || m.surname, b.title, l.loan_date, l.due_date,
                             CAST((JULIANDAY(?) - JULIANDAY(l.due_date)) AS INTEGER)
@@ -1716,8 +4610,10 @@ class ReportsTab(QWidget):
                             l.return_date IS NULL AND l.due_date < ?
                          ORDER BY
                             l.due_date ASC""", (today, today))
-            rows = c.fetchall()
-        
+            return c.fetchall()
+        query_executor().submit((self, "overdue"), fetch, self.show_overdue)
+
+    def show_overdue(self, rows):
         self.tblOverdue.setRowCount(len(rows))
         for r, row in enumerate(rows):
             for c_idx, val in enumerate(row):
@@ -1726,7 +4622,7 @@ class ReportsTab(QWidget):
         self.tblOverdue.resizeColumnsToContents()
 
     def refresh_most_borrowed(self):
-        with db_conn() as conn:
+        def fetch(conn):
             c = conn.cursor()
             c.execute("""SELECT
                             b.title, b.author, COUNT(l.id)
@@ -1739,8 +4635,10 @@ class ReportsTab(QWidget):
                          ORDER BY
                             COUNT(l.id) DESC
                          LIMIT 10""")
-            rows = c.fetchall()
-        
+            return c.fetchall()
+        query_executor().submit((self, "most_borrowed"), fetch, self.show_most_borrowed)
+
+    def show_most_borrowed(self, rows):
         self.tblMostBorrowed.setRowCount(len(rows))
         for r, row in enumerate(rows):
             for c_idx, val in enumerate(row):
@@ -1749,6 +4647,96 @@ class ReportsTab(QWidget):
         self.tblMostBorrowed.resizeColumnsToContents()
 
 # -------------------- Settings Tab --------------------
+class BackupDialog(QDialog):
+    """Yedek kataloğunu listeler; seçili yedek doğrulanabilir ya da geri yüklenebilir."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Yedekler")
+        self.resize(720, 420)
+        layout = QVBoxLayout(self)
+        self.tblBackups = QTableWidget(0, 5)
+        self.tblBackups.setHorizontalHeaderLabels(["Tarih", "Tür", "Boyut", "Doğrulama", "Kimlik"])
+        self.tblBackups.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tblBackups.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tblBackups.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.btnVerify = QPushButton("Doğrula")
+        self.btnRestore = QPushButton("Geri Yükle")
+        style_primary(self.btnRestore)
+        self.btnClose = QPushButton("Kapat")
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(self.btnVerify)
+        btn_layout.addWidget(self.btnRestore)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.btnClose)
+        layout.addWidget(self.tblBackups)
+        layout.addLayout(btn_layout)
+        self.btnVerify.clicked.connect(self.verify_selected)
+        self.btnRestore.clicked.connect(self.restore_selected)
+        self.btnClose.clicked.connect(self.accept)
+        self.refresh()
+
+    def refresh(self):
+        query_executor().submit((self, "list"), lambda conn: backup_catalog().entries_of(), self.show_entries)
+
+    def show_entries(self, entries):
+        self.tblBackups.setRowCount(len(entries))
+        for r, e in enumerate(entries):
+            values = [e["created"].replace("T", " "), BACKUP_KINDS.get(e["kind"], e["kind"]),
+                      f"{e['size'] / 1024 / 1024:.1f} MB",
+                      {None: "—", "ok": "Sağlam"}.get(e["verified"], f"HATALI: {e['verified']}"), e["id"]]
+            for c, val in enumerate(values):
+                self.tblBackups.setItem(r, c, QTableWidgetItem(val))
+        self.tblBackups.resizeColumnsToContents()
+
+    def selected_id(self):
+        row = self.tblBackups.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "Uyarı", "Lütfen bir yedek seçin.")
+            return None
+        return self.tblBackups.item(row, 4).text()
+
+    def verify_selected(self):
+        entry_id = self.selected_id()
+        if entry_id is None:
+            return
+
+        def done(result):
+            ok, message = result
+            self.refresh()
+            if ok:
+                QMessageBox.information(self, "Doğrulama", "Yedek sağlam.")
+            else:
+                QMessageBox.warning(self, "Doğrulama", f"Yedek bozuk:\n{message}")
+
+        run_with_progress(self, "Yedek doğrulanıyor...", (self, "verify"),
+                          lambda conn, task: backup_catalog().verify(entry_id, task), done, total=100)
+
+    def restore_selected(self):
+        entry_id = self.selected_id()
+        if entry_id is None:
+            return
+        if QMessageBox.question(self, "Geri Yükle",
+                                f"Veritabanı '{entry_id}' yedeğindeki haline döndürülecek. Şu anki durum "
+                                "önce otomatik olarak yedeklenir. Diğer terminallerde açık formlar yenilenmelidir. "
+                                "Devam edilsin mi?") != QMessageBox.Yes:
+            return
+
+        def done(safety_id):
+            catalog_index().reload()
+            SETTINGS.reload()
+            app = self.parent().window() if self.parent() else None
+            if app is not None:
+                for tab in app.findChildren(LoansTab):
+                    tab.refresh_tables()
+                for tab in app.findChildren(BooksTab) + app.findChildren(MembersTab):
+                    tab.refresh()
+            self.refresh()
+            QMessageBox.information(self, "Geri Yükle",
+                                    f"Yedek geri yüklendi.\nÖnceki durum şu yedekte saklandı: {safety_id}")
+
+        run_with_progress(self, "Yedek geri yükleniyor...", (self, "restore"),
+                          lambda conn, task: backup_catalog().restore_into(conn, entry_id, task), done, total=100)
+
 class SettingsTab(QWidget):
     def __init__(self, user_role, user_id, parent=None):
         super().__init__(parent)
@@ -1760,6 +4748,7 @@ class SettingsTab(QWidget):
         if self.user_role != 'admin':
             self.user_management_box.hide()
             self.settings_box.hide()
+            self.db_profile_box.hide()
     
     def clear_user_form(self):
         self.edNewUser.clear()
@@ -1800,9 +4789,11 @@ class SettingsTab(QWidget):
         info_label = QLabel("Uygulama her açıldığında otomatik yedekleme yapılır. İsterseniz şimdi manuel olarak da yedek alabilirsiniz.")
         self.btnBackup = QPushButton("Şimdi Yedekle")
         style_primary(self.btnBackup)
+        self.btnBackupList = QPushButton("Yedekler / Geri Yükle")
         
         backup_layout.addWidget(info_label)
         backup_layout.addWidget(self.btnBackup)
+        backup_layout.addWidget(self.btnBackupList)
         
         self.user_management_box = QGroupBox("Kullanıcı Yönetimi")
         user_layout = QVBoxLayout(self.user_management_box)
@@ -1853,25 +4844,78 @@ class SettingsTab(QWidget):
         self.spDefaultLoanDays = QSpinBox()
         self.spDefaultLoanDays.setRange(1, 365)
         
+        # Excel'den gelen barkodsuz kitaplar için otomatik barkod biçimi
+        self.edBarcodePrefix = QLineEdit()
+        self.edBarcodePrefix.setMaxLength(6)
+        self.cbBarcodeCheck = QComboBox()
+        for key, label in BARCODE_CHECK_FORMATS.items():
+            self.cbBarcodeCheck.addItem(label, key)
+
         self.btnSaveSettings = QPushButton("Ayarları Kaydet")
         style_primary(self.btnSaveSettings)
         settings_layout.addRow("Ödünç Alma Sınırı:", self.spLoanLimit)
         # YENİ EKLEME: Ödünç verme süresi ayar satırı
         settings_layout.addRow("Varsayılan Ödünç Süresi (gün):", self.spDefaultLoanDays)
+        settings_layout.addRow("Otomatik Barkod Öneki:", self.edBarcodePrefix)
+        settings_layout.addRow("Barkod Kontrol Hanesi:", self.cbBarcodeCheck)
         settings_layout.addRow(self.btnSaveSettings)
 
+        # Veritabanı bağlantı profili (PRAGMA'lar); her bağlantı açılışında uygulanır
+        self.db_profile_box = QGroupBox("Veritabanı Performansı")
+        profile_layout = QFormLayout(self.db_profile_box)
+        self.cbJournalMode = QComboBox()
+        self.cbJournalMode.addItem("WAL (yerel disk, önerilen)", "wal")
+        self.cbJournalMode.addItem("DELETE (ağ paylaşımındaki veritabanı)", "delete")
+        self.cbSynchronous = QComboBox()
+        self.cbSynchronous.addItem("NORMAL", "normal")
+        self.cbSynchronous.addItem("FULL (elektrik kesintisine karşı en güvenli)", "full")
+        self.cbTempStore = QComboBox()
+        self.cbTempStore.addItem("Bellek", "memory")
+        self.cbTempStore.addItem("Dosya", "file")
+        self.spCacheMb = QSpinBox()
+        self.spCacheMb.setRange(2, 1024)
+        self.spCacheMb.setSuffix(" MB")
+        self.spMmapMb = QSpinBox()
+        self.spMmapMb.setRange(0, 4096)
+        self.spMmapMb.setSuffix(" MB")
+        self.spBusyTimeout = QSpinBox()
+        self.spBusyTimeout.setRange(100, 60000)
+        self.spBusyTimeout.setSingleStep(500)
+        self.spBusyTimeout.setSuffix(" ms")
+        self.spCheckpointPages = QSpinBox()
+        self.spCheckpointPages.setRange(100, 100000)
+        self.spCheckpointPages.setSingleStep(100)
+        self.spCheckpointInterval = QSpinBox()
+        self.spCheckpointInterval.setRange(0, 86400)
+        self.spCheckpointInterval.setSuffix(" sn")
+        self.spCheckpointInterval.setSpecialValueText("Kapalı")
+        self.btnSaveDbProfile = QPushButton("Profili Kaydet")
+        style_primary(self.btnSaveDbProfile)
+        profile_layout.addRow("Günlük Kipi:", self.cbJournalMode)
+        profile_layout.addRow("Eşitleme (synchronous):", self.cbSynchronous)
+        profile_layout.addRow("Geçici Tablolar:", self.cbTempStore)
+        profile_layout.addRow("Sayfa Önbelleği:", self.spCacheMb)
+        profile_layout.addRow("Bellek Eşleme (mmap):", self.spMmapMb)
+        profile_layout.addRow("Kilit Bekleme Süresi:", self.spBusyTimeout)
+        profile_layout.addRow("Otomatik Checkpoint (sayfa):", self.spCheckpointPages)
+        profile_layout.addRow("Periyodik Checkpoint:", self.spCheckpointInterval)
+        profile_layout.addRow(self.btnSaveDbProfile)
+
 
         main.addWidget(backup_box)
         main.addWidget(self.user_management_box)
         main.addWidget(self.settings_box)
+        main.addWidget(self.db_profile_box)
         main.addStretch()
 
         self.btnBackup.clicked.connect(self.backup_now)
+        self.btnBackupList.clicked.connect(self.open_backups)
         self.btnAddUser.clicked.connect(self.add_new_user)
         self.btnUpdateUser.clicked.connect(self.update_selected_user)
         self.btnDeleteUser.clicked.connect(self.delete_selected_user)
         self.tblUsers.itemSelectionChanged.connect(self.fill_user_form)
         self.btnSaveSettings.clicked.connect(self.on_save_settings)
+        self.btnSaveDbProfile.clicked.connect(self.on_save_db_profile)
 
     def load_settings(self):
         limit = get_loan_limit()
@@ -1879,27 +4923,61 @@ class SettingsTab(QWidget):
         # YENİ EKLEME: Varsayılan ödünç süresini yükle
         default_days = get_default_loan_days()
         self.spDefaultLoanDays.setValue(default_days)
+        self.edBarcodePrefix.setText(get_setting('barcode_prefix', 'K'))
+        idx = self.cbBarcodeCheck.findData(get_setting('barcode_check', 'none'))
+        self.cbBarcodeCheck.setCurrentIndex(max(idx, 0))
+        self.load_db_profile()
+
+    def load_db_profile(self):
+        profile = parse_db_profile({k: get_setting(k, v) for k, v in DB_PROFILE_DEFAULTS.items()})
+        for combo, key in ((self.cbJournalMode, "db_journal_mode"), (self.cbSynchronous, "db_synchronous"),
+                           (self.cbTempStore, "db_temp_store")):
+            combo.setCurrentIndex(max(combo.findData(profile[key]), 0))
+        self.spCacheMb.setValue(int(profile["db_cache_mb"]))
+        self.spMmapMb.setValue(int(profile["db_mmap_mb"]))
+        self.spBusyTimeout.setValue(int(profile["db_busy_timeout_ms"]))
+        self.spCheckpointPages.setValue(int(profile["db_checkpoint_pages"]))
+        self.spCheckpointInterval.setValue(int(profile["db_checkpoint_interval_s"]))
+
+    def on_save_db_profile(self):
+        values = {
+            "db_journal_mode": self.cbJournalMode.currentData(),
+            "db_synchronous": self.cbSynchronous.currentData(),
+            "db_temp_store": self.cbTempStore.currentData(),
+            "db_cache_mb": self.spCacheMb.value(),
+            "db_mmap_mb": self.spMmapMb.value(),
+            "db_busy_timeout_ms": self.spBusyTimeout.value(),
+            "db_checkpoint_pages": self.spCheckpointPages.value(),
+            "db_checkpoint_interval_s": self.spCheckpointInterval.value(),
+        }
+        try:
+            SETTINGS.set_many(values)  # profil ve denetim noktası zamanlayıcısı LibraryApp'te yenilenir
+            QMessageBox.information(self, "Başarılı",
+                                    "Veritabanı profili kaydedildi.\n"
+                                    "Günlük kipi değişikliği, tüm terminaller kapatılıp açıldığında geçerli olur.")
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"Profil kaydedilirken bir hata oluştu:\n{e}")
 
     def on_save_settings(self):
         new_limit = self.spLoanLimit.value()
         new_loan_days = self.spDefaultLoanDays.value() # YENİ EKLEME
         try:
-            with db_conn() as conn:
-                c = conn.cursor()
-                c.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", ('loan_limit', str(new_limit)))
-                c.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", ('default_loan_days', str(new_loan_days))) # YENİ EKLEME
-                conn.commit()
+            SETTINGS.set_many({
+                'loan_limit': new_limit,
+                'default_loan_days': new_loan_days, # YENİ EKLEME
+                'barcode_prefix': self.edBarcodePrefix.text().strip(),
+                'barcode_check': self.cbBarcodeCheck.currentData(),
+            })
             QMessageBox.information(self, "Başarılı", "Ayarlar başarıyla güncellendi.")
         except Exception as e:
             QMessageBox.critical(self, "Hata", f"Ayarlar kaydedilirken bir hata oluştu:\n{e}")
 
     def refresh_user_table(self):
         self.clear_user_form() # Formu temizle ve butonları sıfırla
-        with db_conn() as conn:
-            c = conn.cursor()
-            c.execute("SELECT id, username, role FROM users")
-            rows = c.fetchall()
-        
+        fetch = lambda conn: conn.execute("SELECT id, username, role FROM users").fetchall()
+        query_executor().submit((self, "users"), fetch, self.show_users)
+
+    def show_users(self, rows):
         self.tblUsers.setRowCount(len(rows))
         for r_idx, row in enumerate(rows):
             for c_idx, val in enumerate(row):
@@ -1908,13 +4986,29 @@ class SettingsTab(QWidget):
         self.tblUsers.resizeColumnsToContents()
 
     def backup_now(self):
-        try:
-            ts = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            dst = os.path.join(BACKUP_DIR, f"{ts}_kutuphane.db")
-            shutil.copy2(DB_PATH, dst)
-            QMessageBox.information(self, "Başarılı", f"Yedekleme başarılı!\nDosya: {dst}")
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Yedekleme sırasında bir hata oluştu:\n{e}")
+        ensure_dirs()
+        dst = backup_file_name()
+
+        def work(conn, task):
+            backup_database(conn, dst, task)
+            catalog = backup_catalog()
+            entry = catalog.add("dosya", os.path.basename(dst), os.path.getsize(dst), None)
+            result = catalog.verify(entry["id"])
+            prune_backups()
+            return result
+
+        def done(result):
+            ok, message = result
+            if ok:
+                QMessageBox.information(self, "Başarılı", f"Yedekleme başarılı!\nDosya: {dst}")
+            else:
+                QMessageBox.warning(self, "Uyarı", f"Yedek alındı ancak doğrulanamadı:\n{message}\nDosya: {dst}")
+
+        run_with_progress(self, "Veritabanı yedekleniyor...", (self, "backup"), work, done,
+                          total=100, fmt=lambda pct: f"Veritabanı yedekleniyor... %{pct}")
+
+    def open_backups(self):
+        BackupDialog(self).exec_()
 
     def add_new_user(self):
         username = self.edNewUser.text().strip()
@@ -2054,6 +5148,14 @@ class LoginDialog(QDialog):
 
 # -------------------- Main Window --------------------
 class LibraryApp(QMainWindow):
+    """
+    Ana pencere. Sekmeler ilk açıldıklarında kurulur: Ödünç İşlemleri hemen,
+    diğerleri pencere göründükten sonra olay döngüsü boşaldıkça birer birer
+    arka planda ısıtılır. Pencerenin ilk kez etkileşime hazır olduğu an
+    perf.log'a yazılır.
+    """
+    WARMUP_DELAY_MS = 150
+
     def __init__(self, user_role, user_id):
         super().__init__()
         self.user_role = user_role
@@ -2065,30 +5167,155 @@ class LibraryApp(QMainWindow):
         self.tabs = QTabWidget()
         
         # Sekme sırası değiştirildi
-        self.tabs.addTab(LoansTab(self.user_role), "Ödünç İşlemleri")
-        self.tabs.addTab(BooksTab(self.user_role), "Kitaplar")
-        self.tabs.addTab(MembersTab(self.user_role), "Üyeler")
-        self.tabs.addTab(ReportsTab(self.user_role), "Raporlar")
+        self.tab_factories = [
+            ("Ödünç İşlemleri", lambda: LoansTab(self.user_role)),
+            ("Kitaplar", lambda: BooksTab(self.user_role)),
+            ("Üyeler", lambda: MembersTab(self.user_role)),
+            ("Raporlar", lambda: ReportsTab(self.user_role)),
+        ]
         
         # GÜNCELLEME: Sadece yönetici rolündeki kullanıcılar için "Ayarlar" sekmesini ekle
         if self.user_role == 'admin':
-            self.tabs.addTab(SettingsTab(self.user_role, self.user_id), "Ayarlar")
+            self.tab_factories.append(("Ayarlar", lambda: SettingsTab(self.user_role, self.user_id)))
+
+        # Her sekme önce boş bir kap; asıl sekme ilk gösterimde (ya da ısıtmada) içine kurulur
+        self.tab_widgets = [None] * len(self.tab_factories)
+        for title, _ in self.tab_factories:
+            holder = QWidget()
+            holder_layout = QVBoxLayout(holder)
+            holder_layout.setContentsMargins(0, 0, 0, 0)
+            self.tabs.addTab(holder, title)
+        self.ensure_tab(0)
+        self.tabs.currentChanged.connect(self.ensure_tab)
+        self._warm_queue = None
         
         layout = QVBoxLayout(self.central_widget)
         layout.addWidget(self.tabs)
 
+        # WAL dosyası uzun oturumlarda büyümesin diye arka planda PASSIVE checkpoint
+        self.checkpoint_timer = QtCore.QTimer(self)
+        self.checkpoint_timer.timeout.connect(self.run_checkpoint)
+        self.start_checkpoint_timer()
+        self.settings_timer = QtCore.QTimer(self)
+        self.settings_timer.timeout.connect(self.reload_settings)
+        self.settings_timer.start(SETTINGS_RELOAD_MS)
+        SETTINGS.changed.connect(self.on_settings_changed)
+
+    def ensure_tab(self, index):
+        """index'teki sekmeyi henüz kurulmadıysa kurar ve döndürür."""
+        if index < 0:
+            return None
+        if self.tab_widgets[index] is not None:
+            return self.tab_widgets[index]
+        t0 = time.perf_counter()
+        title, factory = self.tab_factories[index]
+        widget = factory()
+        self.tabs.widget(index).layout().addWidget(widget)
+        self.tab_widgets[index] = widget
+        perf_log("sekme kuruldu %s: %.1f ms", title, (time.perf_counter() - t0) * 1000)
+        return widget
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._warm_queue is None:
+            self._warm_queue = [i for i, w in enumerate(self.tab_widgets) if w is None]
+            # Sıfır gecikmeli zamanlayıcı, pencere çizilip olay döngüsü boşalınca çalışır
+            QtCore.QTimer.singleShot(0, self.first_interactive)
+
+    def first_interactive(self):
+        STARTUP.report()
+        QtCore.QTimer.singleShot(self.WARMUP_DELAY_MS, self.warm_next_tab)
+
+    def warm_next_tab(self):
+        # Her adımda tek sekme: aradaki tuş/tıklama olayları bekletilmez
+        while self._warm_queue and self.tab_widgets[self._warm_queue[0]] is not None:
+            self._warm_queue.pop(0)
+        if not self._warm_queue:
+            perf_log("tüm sekmeler hazır: %.0f ms", (time.perf_counter() - APP_START) * 1000)
+            return
+        self.ensure_tab(self._warm_queue.pop(0))
+        QtCore.QTimer.singleShot(self.WARMUP_DELAY_MS, self.warm_next_tab)
+
+    def start_checkpoint_timer(self):
+        profile = parse_db_profile({k: get_setting(k, v) for k, v in DB_PROFILE_DEFAULTS.items()})
+        interval = int(profile["db_checkpoint_interval_s"])
+        self.checkpoint_timer.stop()
+        if interval and profile["db_journal_mode"] == "wal":
+            self.checkpoint_timer.start(interval * 1000)
+
+    def run_checkpoint(self):
+        query_executor().submit((self, "checkpoint"), lambda conn: DB_MANAGER.checkpoint(conn, "PASSIVE"))
+
+    def reload_settings(self):
+        # Diğer terminallerin kaydettiği ayarlar; değişiklik varsa SETTINGS.changed yayınlanır
+        query_executor().submit((self, "settings"), lambda conn: SETTINGS.reload())
+
+    def on_settings_changed(self, keys):
+        if keys & DB_PROFILE_DEFAULTS.keys():
+            DB_MANAGER.reload_profile()
+            self.start_checkpoint_timer()
+
+# Modül gövdesinin (içe aktarmalar ve tanımlar) bittiği an
+MODULE_READY_MS = (time.perf_counter() - APP_START) * 1000
+
+def startup_probe():
+    """
+    build.py --olc için: giriş ve yedekleme olmadan ana pencereyi açar,
+    ilk etkileşimde süreleri tek satır JSON olarak stdout'a yazıp çıkar.
+    """
+    with STARTUP.phase("şema kontrolü"):
+        init_db()
+    with STARTUP.phase("Qt başlatma"):
+        app = QApplication(sys.argv)
+    with STARTUP.phase("ana pencere"):
+        win = LibraryApp("staff", 0)
+        win.show()
+
+    def done():
+        # first_interactive ile aynı turda, ondan sonra çalışır
+        result = {"modul_ms": round(MODULE_READY_MS, 1), "ilk_etkilesim_ms": round(STARTUP.report(), 1),
+                  "asamalar": {name: round(ms, 1) for name, ms, _ in STARTUP.phases}}
+        print("STARTUP_PROBE " + json.dumps(result, ensure_ascii=False), flush=True)
+        app.quit()
+
+    QtCore.QTimer.singleShot(0, done)
+    app.aboutToQuit.connect(query_executor().shutdown)
+    app.aboutToQuit.connect(DB_MANAGER.close_all)
+    return app.exec_()
+
 if __name__ == "__main__":
-    init_db()
-    auto_backup()
-    app = QApplication(sys.argv)
+    # Toplu içe aktarma süreç havuzu için (PyInstaller EXE)
+    multiprocessing.freeze_support()
+    setup_perf_log()
+    if "--startup-probe" in sys.argv:
+        sys.exit(startup_probe())
+    # Şema güncelse yedek arka planda, kullanıcı giriş bilgilerini yazarken
+    # alınır. Geçiş gerekiyorsa veritabanının geçiş öncesi hali önce yedeklenir.
+    backup_thread = None
+    if schema_is_current():
+        backup_thread = auto_backup()
+    else:
+        auto_backup(background=False)
+    with STARTUP.phase("şema kontrolü"):
+        init_db()
+    with STARTUP.phase("Qt başlatma"):
+        app = QApplication(sys.argv)
     
     # Giriş ekranı ekle
-    login = LoginDialog()
-    if login.exec_() == QDialog.Accepted:
+    with STARTUP.phase("giriş penceresi"):
+        login = LoginDialog()
+    with STARTUP.phase("kullanıcı girişi", waiting=True):
+        accepted = login.exec_() == QDialog.Accepted
+    if accepted:
         user_id = login.user_id
         user_role = login.user_role
-        ex = LibraryApp(user_role, user_id)
-        ex.show()
+        with STARTUP.phase("ana pencere"):
+            ex = LibraryApp(user_role, user_id)
+            ex.show()
+        app.aboutToQuit.connect(query_executor().shutdown)
+        if backup_thread is not None:
+            app.aboutToQuit.connect(backup_thread.join)
+        app.aboutToQuit.connect(DB_MANAGER.close_all)
         sys.exit(app.exec_())
     else:
         sys.exit(0)
\ No newline at end of file
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+normalize() mikro ölçümü ve eşdeğerlik kontrolü.
+
+Eski (NFKD + karakter filtresi + regex) uygulama ile kutuphane.normalize
+aynı derlem üzerinde karşılaştırılır: önce çıktıların birebir aynı olduğu
+doğrulanır, sonra çağrı başına süreler yazdırılır. Derlem; yerleşik Türkçe
+örnekler, TURKISH_HEADER_MAP başlıkları ve (varsa) veritabanındaki kitap ve
+üye alanlarından oluşur.
+
+Kullanım:  python tools/bench_normalize.py [--db yol] [--n tekrar]
+"""
+import os, sys, re, time, random, sqlite3, argparse, unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import kutuphane
+
+
+def normalize_legacy(s):
+    if s is None: return ""
+    t = str(s).strip().lower()
+    t = unicodedata.normalize("NFKD", t)
+    t = ''.join(ch for ch in t if not unicodedata.combining(ch))
+    t = re.sub(r"\s+", " ", t)
+    return t
+
+
+SAMPLES = [
+    "Çalıkuşu", "Reşat Nuri Güntekin", "İnce Memed", "Yaşar Kemal", "Kürk Mantolu Madonna",
+    "Sabahattin Ali", "Tutunamayanlar", "Oğuz Atay", "ISPARTA", "Işıl", "ĞÜŞİÖÇ ğüşıöç",
+    "  Çok   boşluklu\tmetin \n", "9-A", "10/B", "Müdür Yardımcısı", "Âşık Veysel", "Kâğıt",
+    "ﬁligran", "x²", "ＡＢＣ", "a b", "é", "Ελληνικά", "Привет", "漢字", "🙂 kitap",
+    "Harry Potter ve Felsefe Taşı", "1203", 1203, 12.5, None, "",
+]
+
+
+def build_corpus(db_path):
+    corpus = list(SAMPLES) + list(kutuphane.TURKISH_HEADER_MAP)
+    if db_path and os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        for sql in ("SELECT title, author, publisher, category FROM books",
+                    "SELECT name, surname, class, branch, no FROM members"):
+            try:
+                for row in conn.execute(sql):
+                    corpus.extend(row)
+            except sqlite3.Error as e:
+                print("Derlem okunamadı:", e)
+        conn.close()
+    rnd = random.Random(42)
+    alphabet = "abcçdefgğhıijklmnoöprsştuüvyzABCÇDEFGĞHIİJKLMNOÖPRSŞTUÜVYZâîû \t0123456789-"
+    corpus += ["".join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 40))) for _ in range(2000)]
+    return corpus
+
+
+def per_call_ns(fn, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for v in corpus:
+            fn(v)
+    return (time.perf_counter() - start) / (repeat * len(corpus)) * 1e9
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", default=kutuphane.DB_PATH)
+    ap.add_argument("--n", type=int, default=20)
+    args = ap.parse_args()
+
+    corpus = build_corpus(args.db)
+    mismatches = [v for v in corpus if normalize_legacy(v) != kutuphane.normalize(v)]
+    if mismatches:
+        for v in mismatches[:20]:
+            print(f"FARK: {v!r}: {normalize_legacy(v)!r} != {kutuphane.normalize(v)!r}")
+        sys.exit(1)
+    print(f"{len(corpus)} değer, çıktılar birebir aynı.")
+
+    def uncached(v):
+        return "" if v is None else kutuphane._normalize_str.__wrapped__(str(v))
+
+    legacy = per_call_ns(normalize_legacy, corpus, args.n)
+    fast = per_call_ns(uncached, corpus, args.n)
+    kutuphane._normalize_str.cache_clear()
+    memo = per_call_ns(kutuphane.normalize, corpus, args.n)
+    print(f"eski          : {legacy:8.0f} ns/çağrı")
+    print(f"yeni (önbelleksiz): {fast:8.0f} ns/çağrı  ({legacy / fast:.1f}x)")
+    print(f"yeni (önbellekli) : {memo:8.0f} ns/çağrı  ({legacy / memo:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
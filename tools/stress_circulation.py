@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Ödünç servisi eşzamanlılık testi.
+
+Geçici bir veritabanında aynı kitabın `--copies` kopyası için `--workers`
+ayrı süreç (ayrı masa terminali gibi, her biri kendi bağlantısıyla) aynı anda
+kutuphane.lend_book çağırır. Sonra aynı ödünç kaydını bütün süreçler aynı
+anda teslim almaya çalışır. Beklenen:
+
+  * tam `copies` ödünç başarılı, kalanlar NoCopyAvailable ile reddedilir,
+  * adet hiçbir zaman eksiye düşmez, açık ödünç sayısı kopya sayısına eşittir,
+  * bir ödünç yalnızca bir kez teslim alınır, adet bir artar,
+  * hiçbir süreç 'database is locked' ile düşmez.
+
+Kullanım:  python tools/stress_circulation.py [--workers 16] [--copies 1] [--rounds 20]
+"""
+import os, sys, time, sqlite3, tempfile, argparse, multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import kutuphane
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=5.0)
+    conn.create_function("normalize", 1, kutuphane.normalize)
+    return conn
+
+
+def lender(db_path, member_id, ready, start, results):
+    conn = connect(db_path)
+    ready.put(member_id)
+    start.wait()
+    try:
+        kutuphane.lend_book(conn, 1, member_id, "2024-01-01", "2024-01-15", loan_limit=3)
+        results.put(("ok", member_id))
+    except kutuphane.CirculationError as e:
+        results.put((type(e).__name__, member_id))
+    except sqlite3.Error as e:
+        results.put(("db:" + str(e), member_id))
+    finally:
+        conn.close()
+
+
+def returner(db_path, loan_id, ready, start, results):
+    conn = connect(db_path)
+    ready.put(loan_id)
+    start.wait()
+    try:
+        kutuphane.return_loan(conn, loan_id, "2024-01-10")
+        results.put(("ok", loan_id))
+    except kutuphane.CirculationError as e:
+        results.put((type(e).__name__, loan_id))
+    except sqlite3.Error as e:
+        results.put(("db:" + str(e), loan_id))
+    finally:
+        conn.close()
+
+
+def setup_db(db_path, workers, copies):
+    kutuphane.DB_PATH = db_path
+    kutuphane.init_db()
+    conn = kutuphane.db_conn()
+    conn.execute("DELETE FROM loans")
+    conn.execute("DELETE FROM books")
+    conn.execute("DELETE FROM members")
+    conn.execute("INSERT INTO books(id, title, barcode, adet) VALUES(1, 'Son Kopya', 'S1', ?)", (copies,))
+    conn.executemany("INSERT INTO members(id, name, surname, no) VALUES(?, 'Ad', 'Soyad', ?)",
+                     [(i, str(i)) for i in range(1, workers + 1)])
+    conn.commit()
+
+
+def run_phase(ctx, target, args_list):
+    ready, start, results = ctx.Queue(), ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=target, args=args + (ready, start, results)) for args in args_list]
+    for p in procs:
+        p.start()
+    for _ in procs:  # hepsi bağlantısını açınca aynı anda başlat
+        ready.get()
+    t0 = time.perf_counter()
+    start.set()
+    out = [results.get() for _ in procs]
+    elapsed = time.perf_counter() - t0
+    for p in procs:
+        p.join()
+    return out, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--copies", type=int, default=1)
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    tmp = tempfile.mkdtemp()
+    for name in ["DB_DIR", "BACKUP_DIR", "EXPORT_DIR", "IMPORT_DIR", "REPORT_DIR"]:
+        setattr(kutuphane, name, os.path.join(tmp, name.lower()))
+    db_path = os.path.join(kutuphane.DB_DIR, "stres.db")
+
+    failures = 0
+    for rnd in range(1, args.rounds + 1):
+        setup_db(db_path, args.workers, args.copies)
+        lend, t_lend = run_phase(ctx, lender, [(db_path, m) for m in range(1, args.workers + 1)])
+        conn = kutuphane.db_conn()
+        adet = conn.execute("SELECT adet FROM books WHERE id=1").fetchone()[0]
+        open_loans = conn.execute("SELECT id FROM loans WHERE return_date IS NULL").fetchall()
+        ok = sum(1 for r, _ in lend if r == "ok")
+        errors = [r for r, _ in lend if r.startswith("db:")]
+
+        loan_id = open_loans[0][0] if open_loans else None
+        ret, t_ret = run_phase(ctx, returner, [(db_path, loan_id)] * args.workers) if loan_id else ([], 0)
+        adet_after = conn.execute("SELECT adet FROM books WHERE id=1").fetchone()[0]
+        ret_ok = sum(1 for r, _ in ret if r == "ok")
+        errors += [r for r, _ in ret if r.startswith("db:")]
+
+        good = (ok == args.copies and adet == 0 and len(open_loans) == args.copies
+                and ret_ok == 1 and adet_after == 1 and not errors)
+        failures += not good
+        print(f"tur {rnd:3d}: ödünç {ok}/{args.workers} ({t_lend * 1000:.0f} ms), adet={adet}, "
+              f"açık={len(open_loans)} | iade {ret_ok}/{len(ret)} ({t_ret * 1000:.0f} ms), "
+              f"adet={adet_after} {'TAMAM' if good else 'HATA'} {errors[:2] if errors else ''}")
+    kutuphane.DB_MANAGER.close_all()
+    print(f"{args.rounds} turda {failures} hata.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Yedek kataloğu (yedek/katalog.json) ve artımlı yedek deposu için komut satırı aracı.
+
+  list                      katalogdaki yedekleri boyut ve doğrulama durumuyla listeler
+  verify <kimlik>           yedeği sha256 ve PRAGMA integrity_check ile doğrular
+  restore <kimlik> <hedef>  depo yedeğini <hedef> dosyasına kurar (sha256 ile doğrulanır)
+  prune                     saklama politikasını uygular, sahipsiz parçaları siler
+
+Çalışan uygulamanın veritabanının üzerine doğrudan kurmayın; önce ayrı bir
+dosyaya kurup uygulama kapalıyken yerine koyun.
+
+Kullanım:  python tools/yedek_deposu.py list
+           python tools/yedek_deposu.py restore 2024-01-05_08-30-00_1234 geri.db
+"""
+import os, sys, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import kutuphane
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    verify = sub.add_parser("verify")
+    verify.add_argument("snapshot")
+    restore = sub.add_parser("restore")
+    restore.add_argument("snapshot")
+    restore.add_argument("target")
+    sub.add_parser("prune")
+    args = ap.parse_args()
+
+    catalog = kutuphane.backup_catalog()
+    store = catalog.store
+    if args.cmd == "list":
+        for e in catalog.entries_of():
+            print(f"{e['id']:32s} {e['kind']:6s} {e['size'] / 1024 / 1024:8.1f} MB  {e['verified'] or '-'}")
+    elif args.cmd == "verify":
+        ok, message = catalog.verify(args.snapshot)
+        print("Sağlam." if ok else f"HATALI: {message}")
+        sys.exit(0 if ok else 1)
+    elif args.cmd == "restore":
+        if os.path.abspath(args.target) == os.path.abspath(kutuphane.DB_PATH):
+            sys.exit("Çalışan veritabanının üzerine kurulmaz; başka bir hedef seçin.")
+        store.restore(args.snapshot, args.target)
+        print("Yedek kuruldu:", args.target)
+    elif args.cmd == "prune":
+        removed = catalog.prune()
+        # Katalog dışı kalmış (yarım yazılmış yedeklerden artan) parçalar için tam tarama
+        orphans = store.collect_garbage()
+        print(f"{len(removed)} yedek, {orphans} sahipsiz parça silindi.")
+
+
+if __name__ == "__main__":
+    main()